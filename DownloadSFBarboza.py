@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
-from app.gui import run_app
+import sys
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Com argumentos: linha de comando sem interface gráfica (python DownloadSFBarboza.py --help)
+        from app.cli import main
+        sys.exit(main())
+    from app.gui import run_app
     run_app()
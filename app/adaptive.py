@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Ajuste adaptativo de `concurrent_fragment_downloads` (e das tentativas) por host, a partir
+da vazão medida no progress hook do yt-dlp. Sobe a concorrência enquanto a vazão melhora,
+volta um passo quando deixa de compensar e reduz à metade quando detecta estrangulamento
+(vazão despenca em relação à melhor já vista). Os valores ficam salvos entre execuções.
+"""
+import os, json, threading, time
+from urllib.parse import urlparse
+from .util import app_data_dir
+
+MIN_N, MAX_N, DEFAULT_N = 1, 16, 3
+GAIN = 1.05          # melhora mínima (5%) para continuar subindo
+THROTTLE_RATIO = 0.3 # abaixo de 30% da melhor vazão = estrangulamento
+HOLD_ITEMS = 5       # downloads mantidos no valor estável antes de sondar de novo
+BASE_RETRIES, BASE_FRAG_RETRIES = 5, 10
+
+def host_key(url):
+    """Domínio registrável da URL de mídia (rr3---sn-x.googlevideo.com → googlevideo.com)."""
+    host = (urlparse(url or "").hostname or "").lower()
+    parts = host.split(".")
+    return ".".join(parts[-2:]) if len(parts) >= 2 else host
+
+def media_host(info):
+    """Host da mídia escolhida num info_dict resolvido (busca de 1 resultado, vídeo ou formatos separados)."""
+    if not isinstance(info, dict):
+        return ""
+    entries = info.get("entries")
+    if isinstance(entries, list) and entries and isinstance(entries[0], dict):
+        info = entries[0]
+    for f in (info.get("requested_formats") or []) + [info]:
+        if f.get("url"):
+            return host_key(f["url"])
+    return host_key(info.get("webpage_url") or "")
+
+class FragmentTuner:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), "adaptive.json")
+        self._lock = threading.Lock(); self.hosts = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for h, st in (json.load(f) or {}).items():
+                    self.hosts[h] = {"n": int(st.get("n", DEFAULT_N)), "best": float(st.get("best", 0) or 0),
+                                     "throttled": float(st.get("throttled", 0) or 0)}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _state(self, host):
+        st = self.hosts.setdefault(host or "", {"n": DEFAULT_N, "best": 0.0, "throttled": 0.0})
+        st.setdefault("ema", {}); st.setdefault("prev", None); st.setdefault("hold", 0)
+        return st
+
+    def concurrency(self, host):
+        with self._lock:
+            return self._state(host)["n"]
+
+    def retries(self, host):
+        """(retries, fragment_retries, recente_estrangulamento); mais tentativas se o host estrangulou na última hora."""
+        with self._lock:
+            recent = time.time() - self._state(host)["throttled"] < 3600
+        return (BASE_RETRIES * 2, BASE_FRAG_RETRIES * 2, True) if recent else (BASE_RETRIES, BASE_FRAG_RETRIES, False)
+
+    def report(self, host, n, bps):
+        """Registra a vazão média (bytes/s) de um download fragmentado feito com `n` conexões; devolve o próximo n."""
+        if not bps or bps <= 0:
+            return self.concurrency(host)
+        with self._lock:
+            st = self._state(host); ema = st["ema"]
+            if bps < THROTTLE_RATIO * st["best"] and n > MIN_N:
+                # Estrangulamento: metade das conexões e espera antes de voltar a sondar
+                # (a amostra não entra na média, para não penalizar o valor estável)
+                st["n"] = max(MIN_N, n // 2); st["hold"] = HOLD_ITEMS; st["prev"] = None
+                st["throttled"] = time.time()
+                return st["n"]
+            ema[n] = bps if n not in ema else 0.5 * ema[n] + 0.5 * bps
+            st["best"] = max(st["best"], ema[n])
+            if st["hold"] > 0:
+                st["hold"] -= 1
+            elif st["prev"] is not None and ema[n] < ema.get(st["prev"], 0) * GAIN:
+                # Subir não compensou: volta ao valor anterior e mantém por alguns downloads
+                st["n"] = st["prev"]; st["prev"] = None; st["hold"] = HOLD_ITEMS
+            elif n < MAX_N:
+                st["prev"] = n; st["n"] = n + 1
+            return st["n"]
+
+    def throttled(self, host):
+        with self._lock:
+            st = self._state(host)
+            st["n"] = max(MIN_N, st["n"] // 2); st["hold"] = HOLD_ITEMS; st["prev"] = None; st["throttled"] = time.time()
+            return st["n"]
+
+    def save(self):
+        with self._lock:
+            data = {h: {"n": st["n"], "best": round(st["best"]), "throttled": st["throttled"]} for h, st in self.hosts.items() if h}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def summary(self):
+        with self._lock:
+            return " | ".join("%s: n=%s (melhor %.1f MB/s)" % (h, st["n"], st["best"] / 1048576.0)
+                              for h, st in sorted(self.hosts.items()) if h) or "-"
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_fragment_tuner():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FragmentTuner()
+        return _shared
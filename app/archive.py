@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Histórico de downloads indexado (SQLite) que substitui o baixados.txt de cada pasta.
+Um único banco compartilhado por todos os destinos (áudio, vídeo, USB) e por vários
+processos (WAL + busy timeout). Cada registro guarda modo, pasta, arquivo, tamanho e data.
+"""
+import os, sqlite3, threading, time
+from .util import app_data_dir
+
+LEGACY_NAME = "baixados.txt"
+
+def _norm_dir(outdir):
+    return os.path.normcase(os.path.abspath(outdir or ""))
+
+class ArchiveStore:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), "archive.sqlite3")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=30000")
+        self._db.execute("CREATE TABLE IF NOT EXISTS downloads (archive_id TEXT NOT NULL, mode TEXT NOT NULL,"
+                         " outdir TEXT NOT NULL, filepath TEXT, size INTEGER, ts REAL NOT NULL,"
+                         " PRIMARY KEY (archive_id, mode, outdir)) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS imports (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, count INTEGER)")
+
+    def contains(self, archive_id, mode, outdir):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM downloads WHERE archive_id=? AND mode=? AND outdir=?",
+                                    (archive_id, mode, _norm_dir(outdir))).fetchone() is not None
+
+    def add(self, archive_id, mode, outdir, filepath=None, size=None):
+        if not archive_id:
+            return
+        if filepath and size is None:
+            try: size = os.path.getsize(filepath)
+            except OSError: size = None
+        with self._lock:
+            self._db.execute("INSERT INTO downloads (archive_id, mode, outdir, filepath, size, ts) VALUES (?,?,?,?,?,?)"
+                             " ON CONFLICT(archive_id, mode, outdir) DO UPDATE SET"
+                             " filepath=COALESCE(excluded.filepath, filepath), size=COALESCE(excluded.size, size), ts=excluded.ts",
+                             (archive_id, mode, _norm_dir(outdir), filepath, size, time.time()))
+
+    def remove(self, archive_id, mode, outdir):
+        with self._lock:
+            return self._db.execute("DELETE FROM downloads WHERE archive_id=? AND mode=? AND outdir=?",
+                                    (archive_id, mode, _norm_dir(outdir))).rowcount
+
+    def import_txt(self, path, mode, outdir):
+        """Importa um baixados.txt (uma linha 'extrator id' por download). Retorna quantos eram novos."""
+        now = time.time(); d = _norm_dir(outdir)
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            rows = [(line.strip(), mode, d, now) for line in f if line.strip()]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT OR IGNORE INTO downloads (archive_id, mode, outdir, ts) VALUES (?,?,?,?)", rows)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK"); raise  # sem isso a conexão compartilhada fica presa na transação
+            return self._db.total_changes - before
+
+    def import_legacy(self, outdir, mode):
+        """Importa o baixados.txt da pasta se ele mudou desde a última importação."""
+        path = os.path.join(outdir, LEGACY_NAME)
+        if not os.path.isfile(path):
+            return 0
+        st = os.stat(path)
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime FROM imports WHERE path=?", (_norm_dir(path),)).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime:
+            return 0
+        n = self.import_txt(path, mode, outdir)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO imports (path, size, mtime, count) VALUES (?,?,?,?)",
+                             (_norm_dir(path), st.st_size, st.st_mtime, n))
+        return n
+
+    def export_txt(self, path, mode, outdir):
+        """Exporta os IDs de (modo, pasta) no formato baixados.txt. Retorna a quantidade."""
+        with self._lock:
+            rows = self._db.execute("SELECT archive_id FROM downloads WHERE mode=? AND outdir=? ORDER BY ts",
+                                    (mode, _norm_dir(outdir))).fetchall()
+        with open(path, "w", encoding="utf-8") as f:
+            for (aid,) in rows:
+                f.write(aid + "\n")
+        return len(rows)
+
+    def count(self, mode=None, outdir=None):
+        sql, args = "SELECT COUNT(*) FROM downloads WHERE 1=1", []
+        if mode: sql += " AND mode=?"; args.append(mode)
+        if outdir: sql += " AND outdir=?"; args.append(_norm_dir(outdir))
+        with self._lock:
+            return self._db.execute(sql, args).fetchone()[0]
+
+    def view(self, mode, outdir, record=True):
+        return ArchiveView(self, mode, outdir, record)
+
+class ArchiveView:
+    """Adaptador para a opção download_archive do yt-dlp (aceita objetos com `in` e `add`).
+    Com record=False o yt-dlp só consulta; o registro é feito depois do pós-processamento."""
+    def __init__(self, store, mode, outdir, record=True):
+        self.store = store; self.mode = mode; self.outdir = outdir; self.record = record
+
+    def __contains__(self, archive_id):
+        return self.store.contains(archive_id, self.mode, self.outdir)
+
+    def add(self, archive_id):
+        if self.record:
+            self.store.add(archive_id, self.mode, self.outdir)
+
+    def __bool__(self):
+        return True
+
+    def __len__(self):
+        return self.store.count(self.mode, self.outdir)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_archive_store():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ArchiveStore()
+        return _shared
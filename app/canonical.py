@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Identificação canônica de entradas da fila (IDs de vídeo/playlist do YouTube, consultas
+normalizadas) e deduplicação da fila antes de qualquer acesso à rede.
+"""
+import re, unicodedata
+from urllib.parse import urlparse, parse_qs
+
+_YT_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YT_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com", "youtube-nocookie.com", "www.youtube-nocookie.com")
+
+def youtube_video_id(s):
+    """ID do vídeo para links youtu.be / watch?v= / shorts / embed / live, senão None."""
+    s = (s or "").strip()
+    if not s.lower().startswith(("http://", "https://", "www.", "youtu", "m.youtube", "music.youtube")):
+        return None
+    u = urlparse(s if "://" in s else "https://" + s)
+    host = (u.hostname or "").lower()
+    vid = None
+    if host in ("youtu.be", "www.youtu.be"):
+        vid = u.path.strip("/").split("/", 1)[0]
+    elif host in _YT_HOSTS:
+        if u.path == "/watch":
+            vid = (parse_qs(u.query).get("v") or [None])[0]
+        else:
+            parts = u.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                vid = parts[1]
+    return vid if vid and _YT_ID.match(vid) else None
+
+_SEARCH_PREFIX = re.compile(r"^ytsearch(\d*|all|date):", re.I)
+_FEAT_BRACKET = re.compile(r"[\(\[]\s*(?:feat|ft|featuring)\b\.?[^\)\]]*[\)\]]", re.I)
+_FEAT = re.compile(r"\b(?:feat|ft|featuring)\b\.?.*?(?=\s-\s|\s+official\b|$)", re.I)
+
+def search_count(s):
+    """Quantidade de resultados de uma consulta ytsearchN: (None se não for busca)."""
+    m = _SEARCH_PREFIX.match((s or "").strip())
+    if not m:
+        return None
+    n = m.group(1)
+    return int(n) if n.isdigit() else (1 if n == "" else None)
+
+def normalize_query(s):
+    """Normaliza consultas de busca: sem prefixo ytsearchN:, caixa, acentos, "feat." e pontuação.
+    Um "official" solto no final (fila de áudio) é descartado; "official video" é mantido."""
+    s = _SEARCH_PREFIX.sub("", (s or "").strip())
+    s = unicodedata.normalize("NFKD", s)
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).lower()
+    s = _FEAT.sub(" ", _FEAT_BRACKET.sub(" ", s))
+    s = re.sub(r"[^\w\s]", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    if s.endswith(" official"):
+        s = s[:-len(" official")]
+    return s
+
+def pair_key(artist, title, video=False):
+    """Chave normalizada para um par (artista, música) — a mesma de 'ytsearch1:<artista> - <música> official'."""
+    return normalize_query("%s - %s official%s" % (artist, title, " video" if video else ""))
+
+_YT_LIST = re.compile(r"^[A-Za-z0-9_-]{10,}$")
+_TRACKING_PREFIX = "utm_"
+_TRACKING = {"feature", "fbclid", "gclid"}
+_YT_TRACKING = {"t", "start", "si"}   # marcação de tempo/compartilhamento: só em links do YouTube
+
+def _is_tracking(name, youtube):
+    name = name.lower()
+    return name.startswith(_TRACKING_PREFIX) or name in _TRACKING or (youtube and name in _YT_TRACKING)
+
+def youtube_playlist_id(s):
+    """ID da playlist (parâmetro list=) de links do YouTube, senão None."""
+    s = (s or "").strip()
+    if not s.lower().startswith(("http://", "https://", "www.", "youtu", "m.youtube", "music.youtube")):
+        return None
+    u = urlparse(s if "://" in s else "https://" + s)
+    if (u.hostname or "").lower() not in _YT_HOSTS + ("youtu.be", "www.youtu.be"):
+        return None
+    lid = (parse_qs(u.query).get("list") or [None])[0]
+    return lid if lid and _YT_LIST.match(lid) else None
+
+def canonical_key(s):
+    """Chave estável de uma entrada da fila:
+    yt:<id> (vídeo), pl:<id> (playlist; a fila baixa a lista inteira), ytsearchN:<consulta normalizada>,
+    url:<URL sem fragmento/parâmetros de rastreio> ou txt:<texto normalizado>."""
+    s = (s or "").strip()
+    if not s:
+        return None
+    lid = youtube_playlist_id(s)
+    if lid:
+        return "pl:" + lid
+    vid = youtube_video_id(s)
+    if vid:
+        return "yt:" + vid
+    m = _SEARCH_PREFIX.match(s)
+    if m:
+        return "ytsearch%s:%s" % (m.group(1).lower(), normalize_query(s))
+    if s.lower().startswith(("http://", "https://")):
+        u = urlparse(s)
+        yt = (u.hostname or "").lower() in _YT_HOSTS + ("youtu.be", "www.youtu.be")
+        q = "&".join(sorted(kv for kv in u.query.split("&") if kv and not _is_tracking(kv.split("=", 1)[0], yt)))
+        return "url:%s://%s%s%s" % (u.scheme.lower(), (u.netloc or "").lower(), u.path.rstrip("/") or "/", ("?" + q) if q else "")
+    return "txt:" + normalize_query(s)
+
+def dedupe(items, seen=None):
+    """Remove entradas repetidas (mesma chave canônica), mantendo a primeira ocorrência.
+    `seen` (set de chaves) permite deduplicar contra itens já presentes; é atualizado.
+    Retorna (itens_únicos, removidos)."""
+    seen = set() if seen is None else seen
+    out = []; removed = 0
+    for it in items:
+        k = canonical_key(it)
+        if k is None or k in seen:
+            removed += 1; continue
+        seen.add(k); out.append(it)
+    return out, removed
+
+if __name__ == "__main__":
+    # Checagem rápida: python -m app.canonical
+    assert canonical_key("https://example.com/v?track=1") != canonical_key("https://example.com/v?track=2")
+    assert dedupe(["https://a.com/x?type=a", "https://a.com/x?type=b",
+                   "https://a.com/x?signature=1", "https://a.com/x?signature=2"])[1] == 0
+    assert canonical_key("https://a.com/x?id=1&utm_source=z&fbclid=q") == canonical_key("https://a.com/x?id=1")
+    assert canonical_key("https://a.com/x?start=10") != canonical_key("https://a.com/x")
+    assert canonical_key("https://www.youtube.com/@canal/videos?si=abc") == canonical_key("https://www.youtube.com/@canal/videos")
+    assert canonical_key("https://youtu.be/dQw4w9WgXcQ?t=42") == canonical_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    print("ok")
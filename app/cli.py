@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Linha de comando sem interface gráfica (não importa o Tk): roda o DownloadWorker com as
+mesmas opções da aba Qualidade, lendo a fila de arquivos .txt ou da entrada padrão.
+
+    python -m app.cli audio lista.txt -o ~/Musicas
+    cat urls.txt | python -m app.cli video - -q video_mode=convert -q parallel_items=2
+    python -m app.cli resume --retry-failed
+    python DownloadSFBarboza.py audio lista.txt          (mesmo efeito; sem argumentos abre a GUI)
+
+Progresso em JSON (uma linha por evento, no stdout):
+    {"ev": "start", "mode", "outdir", "items", "journal", "log"}
+    {"ev": "progress", "pct", "speed", "eta", "stage", "title", "finished", "total"}
+    {"ev": "end", "rc", "ok", "err", "files", "outdir", "stopped", "dur_s", "report"}
+Avisos e erros do log vão para o stderr (tudo com --verbose); o log completo fica em --log-dir.
+
+Códigos de saída: 0 tudo certo | 1 algum item falhou | 2 uso/entrada inválida ou fila vazia |
+3 execução não pôde rodar (yt-dlp/ffmpeg ausente, erro geral) | 130 interrompido (Ctrl+C / SIGTERM).
+"""
+import os, sys, json, time, signal, argparse, itertools
+from .constants import DEFAULT_QUALITY
+from .util import default_user_dir
+
+EXIT_OK, EXIT_FAILED_ITEMS, EXIT_USAGE, EXIT_ERROR, EXIT_INTERRUPTED = 0, 1, 2, 3, 130
+
+class _StderrLog:
+    """Espelho do log no stderr (no lugar do painel da GUI): só WARN/ERRO, ou tudo com --verbose."""
+    def __init__(self, verbose=False):
+        self.levels = None if verbose else ("WARN", "ERRO")
+
+    def write(self, line, level="INFO"):
+        if self.levels is None or level in self.levels:
+            try: print(line, file=sys.stderr, flush=True)
+            except Exception: pass
+
+def _parse_value(key, raw):
+    default = DEFAULT_QUALITY[key]
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "sim", "on")
+    return type(default)(raw)
+
+def quality_from_args(pairs):
+    """DEFAULT_QUALITY com as sobreposições KEY=VALOR (tipo do valor padrão)."""
+    q = dict(DEFAULT_QUALITY)
+    for pair in pairs or []:
+        key, sep, raw = pair.partition("=")
+        key = key.strip()
+        if not sep or key not in DEFAULT_QUALITY:
+            raise ValueError("opção inválida: %r (chaves: %s)" % (pair, ", ".join(sorted(DEFAULT_QUALITY))))
+        try:
+            q[key] = _parse_value(key, raw)
+        except ValueError:
+            raise ValueError("valor inválido para %s: %r" % (key, raw))
+    return q
+
+def _stdin_items():
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            yield line
+
+def iter_items(sources):
+    """Itens de cada arquivo (streaming), com "-" para a entrada padrão."""
+    from .journal import items_from_file
+    return itertools.chain.from_iterable(_stdin_items() if s == "-" else items_from_file(s) for s in sources)
+
+class _Output:
+    def __init__(self, fmt):
+        self.fmt = fmt; self._last_len = 0
+
+    def event(self, ev, **fields):
+        if self.fmt == "json":
+            print(json.dumps(dict(ev=ev, **fields), ensure_ascii=False, default=str), flush=True)
+        elif self.fmt == "text":
+            if ev == "progress":
+                line = "%5.1f%% | %d/%d | %s | %s" % (fields["pct"] or 0, fields["finished"], fields["total"],
+                                                    fields["stage"] or "", (fields["title"] or "")[:60])
+                sys.stderr.write("\r" + line.ljust(self._last_len)); sys.stderr.flush(); self._last_len = len(line)
+            else:
+                if self._last_len: sys.stderr.write("\n"); self._last_len = 0
+                print("%s: %s" % (ev, ", ".join("%s=%s" % kv for kv in fields.items() if kv[0] != "report")), file=sys.stderr, flush=True)
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="downloadsfb", description="DownloadSFB sem interface gráfica (yt-dlp + ffmpeg)")
+    ap.add_argument("mode", choices=("audio", "video", "resume"), help="fila de áudio, de vídeo ou retomar o último job interrompido")
+    ap.add_argument("sources", nargs="*", metavar="ARQUIVO", help='listas .txt (uma entrada por linha); "-" ou nada = entrada padrão')
+    ap.add_argument("-o", "--outdir", help="pasta de destino (padrão: Documentos/DownloadSFB-Audio|Video)")
+    ap.add_argument("--log-dir", default=default_user_dir("Logs"), help="pasta do log da sessão (padrão: %(default)s)")
+    ap.add_argument("-q", "--quality", action="append", metavar="CHAVE=VALOR",
+                    help="opção da aba Qualidade (repetível): %s" % ", ".join(sorted(DEFAULT_QUALITY)))
+    ap.add_argument("--retry-failed", action="store_true", help="ao retomar, repetir também os itens que falharam")
+    ap.add_argument("--no-journal", action="store_true", help="não gravar diário do job (fila só em memória, sem retomada)")
+    ap.add_argument("--progress", choices=("json", "text", "none"), default="json", help="formato do progresso (padrão: json no stdout)")
+    ap.add_argument("--interval", type=float, default=1.0, help="segundos entre eventos de progresso (padrão: %(default)s)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="ecoar o log inteiro no stderr")
+    ap.add_argument("--debug", action="store_true", help="log detalhado (DEBUG, inclui verbose do yt-dlp)")
+    ap.add_argument("--profile", action="store_true", help="perfilar a execução (cProfile + tracemalloc na pasta de logs)")
+    return ap
+
+def main(argv=None):
+    ap = build_parser(); args = ap.parse_args(argv)
+    try:
+        q = quality_from_args(args.quality)
+    except ValueError as e:
+        ap.error(str(e))
+    q["log_debug"] = q["log_debug"] or args.debug; q["profile"] = q["profile"] or args.profile
+    out = _Output(args.progress)
+
+    from .logging_utils import setup_logger
+    from .journal import JobJournal, latest_unfinished
+    from .progress_bus import ProgressBus
+    from .worker import DownloadWorker
+    logger, log_path = setup_logger(args.log_dir, None, name="downloadsfb-cli")
+    logger.text_handler = _StderrLog(args.verbose); logger.debug_enabled = bool(q["log_debug"])
+
+    job = None; items = None
+    if args.mode == "resume":
+        job = latest_unfinished()
+        if job is None:
+            print("Nenhum job interrompido encontrado.", file=sys.stderr); logger.close(); return EXIT_USAGE
+        mode, outdir = job.mode, args.outdir or job.outdir
+        q["retry_failed"] = args.retry_failed
+        c = job.counts()  # também preenche job.total
+        logger.info("Retomando job %s (%s → %s): %s itens, %s concluídos, %s falhas.", job.header.get("id"), mode, outdir,
+                    job.total, c["done"] + c["skipped"], c["failed"])
+    else:
+        mode = args.mode; outdir = args.outdir or default_user_dir("Audio" if mode == "audio" else "Video")
+        sources = args.sources or ["-"]
+        if sources == ["-"] and sys.stdin.isatty():
+            ap.error("nenhuma lista informada (passe arquivos .txt ou envie a fila pela entrada padrão)")
+        try:
+            if args.no_journal:
+                items = list(iter_items(sources))
+            else:
+                job = JobJournal.create(mode, outdir, iter_items(sources))
+                if job.duplicates: logger.info("[Fila] %s entradas duplicadas/vazias removidas.", job.duplicates)
+        except OSError as e:
+            print("Erro lendo a fila: %s" % e, file=sys.stderr); logger.close(); return EXIT_USAGE
+        n = job.total if job is not None else len(items)
+        if not n:
+            if job is not None: job.finish(); job.close()
+            print("Fila vazia.", file=sys.stderr); logger.close(); return EXIT_USAGE
+        logger.info("Iniciando %s com %s itens (CLI).", mode, n)
+
+    bus = ProgressBus(); result = {}
+    def _done(m, files, ok, err, od):
+        result.update(files=files, ok=ok, err=err, outdir=od)
+    worker = DownloadWorker(mode, items, outdir, logger, bus, q, _done, journal=job)
+
+    stopping = []
+    def _on_signal(signum, frame):
+        if stopping:
+            logger.warning("Segundo sinal recebido: encerrando sem esperar."); logger.close(); os._exit(EXIT_INTERRUPTED)
+        stopping.append(signum); logger.warning("Sinal %s recebido: parando após os itens em andamento…", signum)
+        worker.stop()
+    for sig in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+        if sig is not None:
+            try: signal.signal(sig, _on_signal)
+            except (ValueError, OSError): pass
+
+    t0 = time.monotonic()
+    out.event("start", mode=mode, outdir=outdir, items=job.total if job is not None else len(items),
+              journal=job.path if job is not None else None, log=log_path)
+    worker.start()
+    while worker.is_alive():
+        worker.join(max(0.05, args.interval))
+        snap = bus.drain()
+        if snap is not None and args.progress != "none":
+            pct, speed, eta, stage, title = snap
+            out.event("progress", pct=round(pct or 0.0, 1), speed=round(speed or 0.0), eta=eta, stage=stage, title=title,
+                      finished=bus.finished, total=bus.total)
+
+    ok, err = result.get("ok", 0), result.get("err", 0)
+    if stopping: rc = EXIT_INTERRUPTED
+    elif worker.rc: rc = EXIT_ERROR
+    elif err: rc = EXIT_FAILED_ITEMS
+    else: rc = EXIT_OK
+    report = worker.report
+    if report: report = {k: report[k] for k in ("items", "results", "skips", "errors", "bytes", "items_per_h", "mb_per_s", "stages") if k in report}
+    out.event("end", rc=rc, ok=ok, err=err, files=len(result.get("files") or []), outdir=outdir,
+              stopped=bool(stopping), dur_s=round(time.monotonic() - t0, 2), report=report)
+    logger.close()
+    return rc
+
+if __name__ == "__main__":
+    sys.exit(main())
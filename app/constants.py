@@ -5,6 +5,21 @@ Constantes usadas pela GUI e buscas.
 
 DONATION_EMAIL = "sfbarboza82@hotmail.com"
 
+# Opções de qualidade/execução passadas ao DownloadWorker (valores iniciais da aba Qualidade e da CLI)
+DEFAULT_QUALITY = {
+    "audio_bitrate_k": 320, "audio_sr": 44100, "audio_channels": 2,
+    "video_mode": "compat", "video_codec": "h264", "video_max_h": 480, "video_fps": 30,
+    "video_crf": 23, "video_preset": "medium", "video_audio_k": 192,
+    "parallel_items": 3, "resolve_workers": 2, "encode_workers": 1,
+    "info_cache_ttl_h": 24, "rate_limit_kbps": 0, "rate_limit_rps": 0.0,
+    "log_debug": False, "profile": False,
+}
+
+# Cache das respostas do MusicBrainz (app/mb_cache.py): validade em horas (0 = desligado) e se
+# respostas vencidas aparecem na hora enquanto são revalidadas em segundo plano
+MB_CACHE_TTL_H = 72
+MB_CACHE_STALE_OK = True
+
 GENERAL_CATEGORIES = [
     "Documentários",
     "Tutoriais",
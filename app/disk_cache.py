@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistente chave → JSON em SQLite, com TTL e despejo LRU limitado por tamanho.
+Pode ser compartilhado por várias threads (e processos, via WAL).
+"""
+import json, sqlite3, threading, time
+
+class DiskCache:
+    def __init__(self, path, ttl=24 * 3600, max_bytes=256 * 1024 * 1024, grace=0):
+        # grace: por quanto tempo além do TTL a entrada ainda serve (ex.: resposta vencida mostrada na hora)
+        self.path = path; self.ttl = ttl; self.max_bytes = max_bytes; self.grace = grace
+        self.hits = 0; self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                         " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+        self._total = self._sum()  # total em bytes, mantido por set/delete sem somar a tabela a cada gravação
+        self._purge_due = True     # no primeiro set, quando o chamador já ajustou o TTL (get_info_cache(ttl_h))
+
+    def _horizon(self):
+        """Idade (s) a partir da qual a entrada não serve mais, ou None sem TTL."""
+        return self.ttl + self.grace if (self.ttl or self.grace) else None
+
+    def _sum(self):
+        return self._db.execute("SELECT COALESCE(SUM(size),0) FROM entries").fetchone()[0]
+
+    def get_entry(self, key):
+        """Retorna (valor, idade_em_segundos) sem aplicar TTL, ou (None, None)."""
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM entries WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None, None
+            now = time.time(); h = self._horizon()
+            if h is None or now - row[1] <= h:  # vencida: não vale a escrita, sai no próximo purge/despejo
+                self._db.execute("UPDATE entries SET accessed=? WHERE key=?", (now, key))
+        return json.loads(row[0]), now - row[1]
+
+    def get(self, key, max_age=None):
+        """Valor ainda dentro do TTL (ou de `max_age`), senão None. Conta acertos/erros."""
+        value, age = self.get_entry(key)
+        limit = self.ttl if max_age is None else max_age
+        if value is None or (limit and age > limit):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+        size = len(data.encode("utf-8")); now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?,?,?,?,?)",
+                             (key, data, size, now, now))
+            self._total += size - (old[0] if old else 0)
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            old = self._db.execute("SELECT size FROM entries WHERE key=?", (key,)).fetchone()
+            self._db.execute("DELETE FROM entries WHERE key=?", (key,))
+            if old: self._total -= old[0]
+
+    def _evict(self):
+        if self._purge_due:
+            self._purge_due = False; self._purge()
+        if not self.max_bytes or self._total <= self.max_bytes:
+            return
+        self._total = total = self._sum()  # outros processos podem ter gravado no mesmo arquivo (WAL)
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        for key, size in self._db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE key=?", (key,)); total -= size
+        self._total = total
+
+    def _purge(self):
+        h = self._horizon()
+        if h is None:
+            return 0
+        n = self._db.execute("DELETE FROM entries WHERE created < ?", (time.time() - h,)).rowcount
+        if n: self._total = self._sum()
+        return n
+
+    def purge_expired(self):
+        """Remove as entradas além do TTL (+ tolerância); feito também no primeiro set após abrir o cache."""
+        with self._lock:
+            self._purge_due = False
+            return self._purge()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries"); self._total = 0
+
+    def stats(self):
+        with self._lock:
+            n, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size),0) FROM entries").fetchone()
+        return {"entries": n, "bytes": size, "hits": self.hits, "misses": self.misses}
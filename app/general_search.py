@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from .util import seconds_to_hms
 from .logging_utils import YTDLPLogger
+from .info_cache import get_info_cache
+from .ratelimit import get_rate_limiter
 
 OFFICIAL_HINTS = ["official", "official video", "official audio", "music video"]
 OFFICIAL_CHANNEL_HINTS = ["vevo", " - topic", "warner", "umg", "sony music", "rhino", "atlantic records",
@@ -28,18 +30,30 @@ def search_youtube(logger, query, limit=10):
     logger.info("Buscando YouTube: %s", query)
     opts = {"skip_download": True, "quiet": True, "noplaylist": True, "extract_flat": False, "logger": YTDLPLogger(logger)}
     results = []
+    key = f"ytsearch{limit}:{query}"
     try:
-        with yt_dlp.YoutubeDL(opts) as ydl:
-            info = ydl.extract_info(f"ytsearch{limit}:{query}", download=False)
-            entries = info.get("entries") if isinstance(info, dict) else []
-            if entries:
-                for e in entries:
-                    title = e.get("title") or "-"
-                    channel = e.get("uploader") or e.get("channel") or "-"
-                    duration = seconds_to_hms(e.get("duration"))
-                    url = e.get("webpage_url") or e.get("url") or ""
-                    vc = e.get("view_count") or 0
-                    results.append((title, channel, duration, url, f"ytsearch1:{title} {channel}", vc, official_score(title, channel)))
+        try:
+            cache = get_info_cache()
+        except Exception as e:
+            logger.warning("[Cache] indisponível: %s", e); cache = None
+        info = cache.get(key) if cache is not None else None
+        if info is not None:
+            logger.info("[Cache] busca reaproveitada: %s", query)
+        else:
+            get_rate_limiter().acquire_request()
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(key, download=False)
+            if isinstance(info, dict) and cache is not None:
+                cache.put(key, info)
+        entries = info.get("entries") if isinstance(info, dict) else []
+        if entries:
+            for e in entries:
+                title = e.get("title") or "-"
+                channel = e.get("uploader") or e.get("channel") or "-"
+                duration = seconds_to_hms(e.get("duration"))
+                url = e.get("webpage_url") or e.get("url") or ""
+                vc = e.get("view_count") or 0
+                results.append((title, channel, duration, url, f"ytsearch1:{title} {channel}", vc, official_score(title, channel)))
     except Exception as e:
         logger.exception("Falha na busca geral: %s", e)
     results.sort(key=lambda r: (r[6], r[5]), reverse=True)
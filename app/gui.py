@@ -3,13 +3,16 @@ import os, time, webbrowser, threading, sys, subprocess
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
-from .constants import DONATION_EMAIL, GENERAL_CATEGORIES, CATEGORY_EXPANSIONS
-from .util import resource_path, bundled_ffmpeg_path, bundled_ffprobe_path, bundled_ffplay_path
+from .constants import DONATION_EMAIL, GENERAL_CATEGORIES, CATEGORY_EXPANSIONS, DEFAULT_QUALITY, MB_CACHE_TTL_H, MB_CACHE_STALE_OK
+from .util import resource_path, bundled_ffmpeg_path, bundled_ffprobe_path, bundled_ffplay_path, default_user_dir
 from .logging_utils import setup_logger
-from .mb_api import mb_search_artists_by_genre, mb_search_recordings_by_artist, mb_search_recordings_by_title
-from .general_search import search_youtube
-from .worker import DownloadWorker
-from . import storage
+from .canonical import canonical_key, dedupe, pair_key
+from .journal import JobJournal, latest_unfinished
+from .ratelimit import get_rate_limiter
+from .progress_bus import ProgressBus, FPS as PROGRESS_FPS
+from . import profiling
+# mb_api (requests), general_search, worker, query_index, archive e storage (ctypes) são importados
+# nos métodos que os usam, para a janela abrir sem carregá-los
 
 CHECKED = "✓"
 UNCHECKED = ""
@@ -35,31 +38,45 @@ class App(tk.Tk):
         self.checked_mb = set()
         self.checked_gen = set()
 
-        user_docs = os.path.join(os.path.expanduser("~"), "Documents")
-        self.audio_out = tk.StringVar(value=os.path.join(user_docs, "DownloadSFB-Audio"))
-        self.video_out = tk.StringVar(value=os.path.join(user_docs, "DownloadSFB-Video"))
-        self.log_dir = tk.StringVar(value=os.path.join(user_docs, "DownloadSFB-Logs"))
-
-        self.audio_bitrate_k = tk.IntVar(value=320)
-        self.audio_sr = tk.IntVar(value=44100)
-        self.audio_channels = tk.IntVar(value=2)
-        self.video_mode = tk.StringVar(value="compat")
-        self.video_codec = tk.StringVar(value="h264")
-        self.video_max_h = tk.IntVar(value=480)
-        self.video_fps = tk.IntVar(value=30)
-        self.video_crf = tk.IntVar(value=23)
-        self.video_preset = tk.StringVar(value="medium")
-        self.video_audio_k = tk.IntVar(value=192)
+        self.audio_out = tk.StringVar(value=default_user_dir("Audio"))
+        self.video_out = tk.StringVar(value=default_user_dir("Video"))
+        self.log_dir = tk.StringVar(value=default_user_dir("Logs"))
+
+        dq = DEFAULT_QUALITY  # mesmos padrões da CLI (app/cli.py)
+        self.audio_bitrate_k = tk.IntVar(value=dq["audio_bitrate_k"])
+        self.audio_sr = tk.IntVar(value=dq["audio_sr"])
+        self.audio_channels = tk.IntVar(value=dq["audio_channels"])
+        self.video_mode = tk.StringVar(value=dq["video_mode"])
+        self.video_codec = tk.StringVar(value=dq["video_codec"])
+        self.video_max_h = tk.IntVar(value=dq["video_max_h"])
+        self.video_fps = tk.IntVar(value=dq["video_fps"])
+        self.video_crf = tk.IntVar(value=dq["video_crf"])
+        self.video_preset = tk.StringVar(value=dq["video_preset"])
+        self.video_audio_k = tk.IntVar(value=dq["video_audio_k"])
+        self.parallel_items = tk.IntVar(value=dq["parallel_items"])
+        self.resolve_workers = tk.IntVar(value=dq["resolve_workers"])
+        self.encode_workers = tk.IntVar(value=dq["encode_workers"])
+        self.info_cache_ttl_h = tk.IntVar(value=dq["info_cache_ttl_h"])
+        self.rate_limit_kbps = tk.IntVar(value=dq["rate_limit_kbps"])
+        self.rate_limit_rps = tk.DoubleVar(value=dq["rate_limit_rps"])
+        self.log_debug = tk.BooleanVar(value=dq["log_debug"])
+        self.profile_run = tk.BooleanVar(value=dq["profile"] or profiling.enabled())  # também por DOWNLOADSFB_PROFILE=1
 
         self.mb_limit_artists = tk.IntVar(value=10)
         self.mb_limit_tracks = tk.IntVar(value=10)
+        self.mb_cache_ttl_h = tk.IntVar(value=MB_CACHE_TTL_H)
+        self.mb_cache_stale = tk.BooleanVar(value=MB_CACHE_STALE_OK)
+        self._mb_search = None  # busca MusicBrainz em andamento (evento de parada + totais)
+        self._mb_shown = set()  # chaves (pair_key) já na tabela na busca atual
         self.auto_open_folder = tk.BooleanVar(value=True)
         self.last_downloaded_files = []
+        # Workers publicam no barramento; o loop do Tk drena e redesenha em taxa fixa
+        self.progress_bus = ProgressBus()
 
         self._build_ui()
         self.logger, self.log_path = setup_logger(self.log_dir.get(), self.txt_log, name="downloadsfb")
-        self.logger.info("ffmpeg: %s", bundled_ffmpeg_path())
-        self.logger.info("ffprobe: %s", bundled_ffprobe_path())
+        # Localizar/validar ffmpeg e ffprobe (PATH, processo -version) fica fora do caminho da janela
+        threading.Thread(target=self._check_tools, daemon=True).start()
         
         # Watchdog para liberar worker e manter UI pronta entre execuções
         def _watchdog():
@@ -80,11 +97,27 @@ class App(tk.Tk):
                             self.lbl_status.configure(text="Aguardando…")
             except Exception:
                 pass
+            try:
+                self.lbl_rate.configure(text=get_rate_limiter().summary())
+            except Exception:
+                pass
             self.after(1000, _watchdog)
         self.after(1500, _watchdog)
+        self.after(1000 // PROGRESS_FPS, self._drain_progress)
         self.logger.info("Aplicativo iniciado. Pastas padrão: Áudio=%s | Vídeo=%s | Logs=%s",
                          self.audio_out.get(), self.video_out.get(), self.log_dir.get())
 
+    def _check_tools(self):
+        for name, path in (("ffmpeg", bundled_ffmpeg_path()), ("ffprobe", bundled_ffprobe_path())):
+            if not os.path.isfile(path):
+                self.logger.warning("%s não encontrado: %s", name, path); continue
+            try:
+                kw = {"creationflags": 0x08000000} if os.name == "nt" else {}  # CREATE_NO_WINDOW
+                out = subprocess.run([path, "-version"], capture_output=True, text=True, timeout=15, **kw).stdout
+                self.logger.info("%s: %s (%s)", name, path, (out.splitlines() or ["?"])[0])
+            except Exception as e:
+                self.logger.warning("%s: %s não executou (%s)", name, path, e)
+
     def _build_ui(self):
         frm_paths = ttk.LabelFrame(self, text="Pastas de Saída e Logs")
         frm_paths.pack(fill="x", padx=10, pady=8)
@@ -101,18 +134,61 @@ class App(tk.Tk):
         self.nb = ttk.Notebook(self)
         self.nb.pack(fill="both", expand=True, padx=10, pady=8)
 
-        tab_search = ttk.Frame(self.nb)
-        self.nb.add(tab_search, text="🎵 Música (Gênero/Artista/Título)")
+        # Abas construídas na primeira exibição (ou no primeiro acesso a um widget delas, ver __getattr__);
+        # a de Música (aberta ao iniciar) e a de Downloads (painel de log) são montadas já
+        self._tabs = {}
+        for key, text, build in (("music", "🎵 Música (Gênero/Artista/Título)", self._build_music_tab),
+                                 ("general", "📺 YouTube Pesquisar (Categorias)", self._build_general_tab),
+                                 ("queues", "🧺 Filas com TXT e URL (Áudio/Vídeo)", self._build_queues_tab),
+                                 ("quality", "⚙️ Qualidade & Perfis", self._build_quality_tab),
+                                 ("donate", "❤️ Doações (PIX/PayPal)", self._build_donation_tab),
+                                 ("run", "⬇️ Downloads & Status", self._build_run_tab)):
+            frame = ttk.Frame(self.nb); self.nb.add(frame, text=text)
+            self._tabs[key] = [frame, build, False]
+        self._ensure_tab("music"); self._ensure_tab("run")
+        self.nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    # Atributos criados pelas abas montadas sob demanda → aba que os cria
+    _LAZY_ATTRS = {
+        "general_query_var": "general", "general_category_var": "general", "general_limit_var": "general",
+        "pg_gen": "general", "lbl_gen": "general", "tree_general": "general",
+        "single_url_var": "queues", "txt_urls": "queues", "lst_audio": "queues", "lst_video": "queues",
+    }
+
+    def __getattr__(self, attr):
+        # Só é chamado quando o atributo não existe: monta a aba dona do widget e tenta de novo
+        tab = App._LAZY_ATTRS.get(attr)
+        tabs = self.__dict__.get("_tabs")
+        if tab is not None and tabs is not None and not tabs[tab][2]:
+            self._ensure_tab(tab)
+            return self.__dict__[attr]
+        return super().__getattr__(attr)
+
+    def _ensure_tab(self, key):
+        entry = self._tabs[key]
+        if not entry[2]:
+            entry[2] = True  # antes de construir: acessos durante a construção não recursam
+            entry[1](entry[0])
+
+    def _on_tab_changed(self, e=None):
+        try:
+            sel = self.nb.select()
+            for key, (frame, _, built) in self._tabs.items():
+                if not built and str(frame) == str(sel):
+                    self._ensure_tab(key)
+        except Exception:
+            pass
 
+    def _build_music_tab(self, tab_search):
         frm_genre = ttk.LabelFrame(tab_search, text="Por gênero/estilo (ex.: grunge, classic rock)")
         frm_genre.pack(fill="x", padx=8, pady=6)
         self.genre_var = tk.StringVar()
         ttk.Entry(frm_genre, textvariable=self.genre_var, width=40).pack(side="left", padx=6, pady=6)
         ttk.Button(frm_genre, text="Buscar artistas por gênero", command=self.search_by_genre).pack(side="left", padx=6)
         ttk.Label(frm_genre, text="Artistas:").pack(side="left", padx=(12,4))
-        tk.Spinbox(frm_genre, from_=1, to=50, textvariable=self.mb_limit_artists, width=4).pack(side="left", padx=4)
+        tk.Spinbox(frm_genre, from_=1, to=1000, textvariable=self.mb_limit_artists, width=4).pack(side="left", padx=4)
         ttk.Label(frm_genre, text="Músicas/artista:").pack(side="left", padx=(12,4))
-        tk.Spinbox(frm_genre, from_=1, to=50, textvariable=self.mb_limit_tracks, width=4).pack(side="left", padx=4)
+        tk.Spinbox(frm_genre, from_=1, to=1000, textvariable=self.mb_limit_tracks, width=4).pack(side="left", padx=4)
 
         frm_artist = ttk.LabelFrame(tab_search, text="Por banda/artista/grupo (ex.: Nirvana, Pink Floyd)")
         frm_artist.pack(fill="x", padx=8, pady=6)
@@ -120,7 +196,7 @@ class App(tk.Tk):
         ttk.Entry(frm_artist, textvariable=self.artist_var, width=40).pack(side="left", padx=6, pady=6)
         ttk.Button(frm_artist, text="Buscar músicas do artista", command=self.search_by_artist).pack(side="left", padx=6)
         ttk.Label(frm_artist, text="Músicas:").pack(side="left", padx=(12,4))
-        tk.Spinbox(frm_artist, from_=1, to=50, textvariable=self.mb_limit_tracks, width=4).pack(side="left", padx=4)
+        tk.Spinbox(frm_artist, from_=1, to=1000, textvariable=self.mb_limit_tracks, width=4).pack(side="left", padx=4)
 
         frm_title = ttk.LabelFrame(tab_search, text="Por nome de música (ex.: Smells Like Teen Spirit)")
         frm_title.pack(fill="x", padx=8, pady=6)
@@ -128,14 +204,15 @@ class App(tk.Tk):
         ttk.Entry(frm_title, textvariable=self.title_var, width=40).pack(side="left", padx=6, pady=6)
         ttk.Button(frm_title, text="Buscar por nome", command=self.search_by_title).pack(side="left", padx=6)
         ttk.Label(frm_title, text="Músicas:").pack(side="left", padx=(12,4))
-        tk.Spinbox(frm_title, from_=1, to=50, textvariable=self.mb_limit_tracks, width=4).pack(side="left", padx=4)
+        tk.Spinbox(frm_title, from_=1, to=1000, textvariable=self.mb_limit_tracks, width=4).pack(side="left", padx=4)
 
         pr_mb = ttk.LabelFrame(tab_search, text="Progresso da busca (MusicBrainz)")
         pr_mb.pack(fill="x", padx=8, pady=(2,8))
         self.pg_mb = ttk.Progressbar(pr_mb, mode="indeterminate")
         self.pg_mb.pack(fill="x", padx=8, pady=6)
         self.lbl_mb = ttk.Label(pr_mb, text="Parado")
-        self.lbl_mb.pack(fill="x", padx=8, pady=(0,6))
+        self.lbl_mb.pack(side="left", fill="x", expand=True, padx=8, pady=(0,6))
+        ttk.Button(pr_mb, text="Cancelar busca", command=self.cancel_mb_search).pack(side="right", padx=8, pady=(0,6))
 
         cnt_mb = ttk.Frame(tab_search)
         cnt_mb.pack(fill="both", expand=True, padx=8, pady=6)
@@ -167,11 +244,9 @@ class App(tk.Tk):
         ttk.Button(row1, text="Adicionar SELECIONADOS → Áudio", command=self.add_selected_to_audio).pack(side="left", padx=4)
         ttk.Button(row1, text="Adicionar SELECIONADOS → Vídeo", command=self.add_selected_to_video).pack(side="left", padx=4)
         ttk.Separator(row1, orient="vertical").pack(side="left", fill="y", padx=8)
-        ttk.Button(row1, text="Limpar", command=lambda: [self.tree.delete(*self.tree.get_children()), self.checked_mb.clear()]).pack(side="left", padx=4)
-
-        tab_general = ttk.Frame(self.nb)
-        self.nb.add(tab_general, text="📺 YouTube Pesquisar (Categorias)")
+        ttk.Button(row1, text="Limpar", command=lambda: [self.tree.delete(*self.tree.get_children()), self.checked_mb.clear(), self._mb_shown.clear()]).pack(side="left", padx=4)
 
+    def _build_general_tab(self, tab_general):
         top_general = ttk.LabelFrame(tab_general, text="Buscar por categoria")
         top_general.pack(fill="x", padx=8, pady=6)
         self.general_query_var = tk.StringVar()
@@ -224,9 +299,7 @@ class App(tk.Tk):
         ttk.Separator(btns_general, orient="vertical").pack(side="left", fill="y", padx=8)
         ttk.Button(btns_general, text="Limpar", command=lambda: [self.tree_general.delete(*self.tree_general.get_children()), self.checked_gen.clear()]).pack(side="left", padx=12)
 
-        tab_queues = ttk.Frame(self.nb)
-        self.nb.add(tab_queues, text="🧺 Filas com TXT e URL (Áudio/Vídeo)")
-
+    def _build_queues_tab(self, tab_queues):
         # --- Bloco: Adicionar URLs/Lista rapidamente ---
         add_box = ttk.LabelFrame(tab_queues, text="Adicionar URL(s) diretamente")
         add_box.pack(fill="x", padx=8, pady=(8,2))
@@ -266,8 +339,7 @@ class App(tk.Tk):
         ttk.Button(btns_q, text="Exportar Áudio → .txt", command=lambda: self.export_txt(self.lst_audio, "lista_audio.txt")).pack(side="left", padx=10)
         ttk.Button(btns_q, text="Exportar Vídeo → .txt", command=lambda: self.export_txt(self.lst_video, "lista_video.txt")).pack(side="left", padx=4)
 
-        tab_quality = ttk.Frame(self.nb)
-        self.nb.add(tab_quality, text="⚙️ Qualidade & Perfis")
+    def _build_quality_tab(self, tab_quality):
         q_audio = ttk.LabelFrame(tab_quality, text="Áudio (MP3)")
         q_video = ttk.LabelFrame(tab_quality, text="Vídeo (MP4/H.264)")
         q_audio.pack(fill="x", padx=8, pady=(10,6))
@@ -295,6 +367,39 @@ class App(tk.Tk):
         ttk.Label(q_video, text="AAC (kbps):").grid(row=2, column=4, padx=6, pady=6, sticky="w")
         ttk.Combobox(q_video, textvariable=self.video_audio_k, values=[128,160,192,256], width=10, state="readonly").grid(row=2, column=5, padx=4, pady=6, sticky="w")
 
+        q_run = ttk.LabelFrame(tab_quality, text="Execução")
+        q_run.pack(fill="x", padx=8, pady=6)
+        ttk.Label(q_run, text="Downloads simultâneos:").grid(row=0, column=0, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=1, to=8, textvariable=self.parallel_items, width=4).grid(row=0, column=1, padx=4, pady=6, sticky="w")
+        ttk.Label(q_run, text="Resoluções simultâneas:").grid(row=0, column=2, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=1, to=8, textvariable=self.resolve_workers, width=4).grid(row=0, column=3, padx=4, pady=6, sticky="w")
+        ttk.Label(q_run, text="Conversões simultâneas:").grid(row=0, column=4, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=1, to=8, textvariable=self.encode_workers, width=4).grid(row=0, column=5, padx=4, pady=6, sticky="w")
+        ttk.Label(q_run, text="Cache de metadados (h, 0 = desligado):").grid(row=1, column=0, columnspan=2, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=0, to=720, textvariable=self.info_cache_ttl_h, width=5).grid(row=1, column=2, padx=4, pady=6, sticky="w")
+        ttk.Label(q_run, text="Cache MusicBrainz (h, 0 = desligado):").grid(row=1, column=3, columnspan=2, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=0, to=8760, textvariable=self.mb_cache_ttl_h, width=5).grid(row=1, column=5, padx=4, pady=6, sticky="w")
+        ttk.Checkbutton(q_run, text="Mostrar resultado vencido e atualizar em segundo plano", variable=self.mb_cache_stale).grid(row=4, column=0, columnspan=4, padx=6, pady=6, sticky="w")
+        ttk.Button(q_run, text="Estatísticas dos caches", command=self.show_cache_stats).grid(row=4, column=4, columnspan=2, padx=6, pady=6, sticky="w")
+        ttk.Label(q_run, text="Limite de banda (KB/s, 0 = sem limite):").grid(row=2, column=0, columnspan=2, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=0, to=1000000, increment=128, textvariable=self.rate_limit_kbps, width=8).grid(row=2, column=2, padx=4, pady=6, sticky="w")
+        ttk.Label(q_run, text="Requisições/s (0 = sem limite):").grid(row=2, column=3, columnspan=2, padx=6, pady=6, sticky="w")
+        tk.Spinbox(q_run, from_=0, to=50, increment=0.5, textvariable=self.rate_limit_rps, width=5).grid(row=2, column=5, padx=4, pady=6, sticky="w")
+        ttk.Checkbutton(q_run, text="Log detalhado (DEBUG, inclui saída verbose do yt-dlp)", variable=self.log_debug,
+                        command=self._apply_log_debug).grid(row=3, column=0, columnspan=4, padx=6, pady=6, sticky="w")
+        ttk.Checkbutton(q_run, text="Perfilar execução (cProfile + memória, na pasta de logs)", variable=self.profile_run,
+                        command=lambda: profiling.set_enabled(self.profile_run.get())).grid(row=3, column=4, columnspan=2, padx=6, pady=6, sticky="w")
+        # Os limites valem para o processo inteiro e podem ser alterados durante a execução
+        for var in (self.rate_limit_kbps, self.rate_limit_rps):
+            var.trace_add("write", lambda *_: self._apply_rate_limits())
+
+        q_arch = ttk.LabelFrame(tab_quality, text="Histórico de downloads")
+        q_arch.pack(fill="x", padx=8, pady=6)
+        ttk.Button(q_arch, text="Importar baixados.txt (Áudio)", command=lambda: self.import_archive("audio")).pack(side="left", padx=6, pady=6)
+        ttk.Button(q_arch, text="Importar baixados.txt (Vídeo)", command=lambda: self.import_archive("video")).pack(side="left", padx=6, pady=6)
+        ttk.Button(q_arch, text="Exportar (Áudio)", command=lambda: self.export_archive("audio")).pack(side="left", padx=6, pady=6)
+        ttk.Button(q_arch, text="Exportar (Vídeo)", command=lambda: self.export_archive("video")).pack(side="left", padx=6, pady=6)
+
         profile_frame = ttk.LabelFrame(tab_quality, text="Perfis rápidos")
         profile_frame.pack(fill="x", padx=8, pady=(6,10))
         ttk.Button(profile_frame, text="Aplicar perfil • Pioneer AVIC", command=self.apply_pioneer_profile).pack(side="left", padx=8, pady=6)
@@ -304,18 +409,17 @@ class App(tk.Tk):
         actions.pack(fill="x", padx=8, pady=(0,10))
         ttk.Checkbutton(actions, text="Abrir pasta automaticamente ao terminar", variable=self.auto_open_folder).pack(side="left", padx=8, pady=6)
 
-        self.nb.add(self._build_donation_tab(self.nb), text="❤️ Doações (PIX/PayPal)")
-
-        tab_run = ttk.Frame(self.nb)
-        self.nb.add(tab_run, text="⬇️ Downloads & Status")
+    def _build_run_tab(self, tab_run):
         top_run = ttk.Frame(tab_run); top_run.pack(fill="x", padx=8, pady=6)
         ttk.Button(top_run, text="Iniciar Download Áudio", command=self.start_audio).pack(side="left", padx=4)
         ttk.Button(top_run, text="Iniciar Download Vídeo", command=self.start_video).pack(side="left", padx=4)
+        ttk.Button(top_run, text="Retomar último job", command=self.resume_job).pack(side="left", padx=4)
         ttk.Button(top_run, text="Parar", command=self.stop_worker).pack(side="left", padx=12)
         ttk.Button(top_run, text="Reiniciar sessão", command=self.reset_session).pack(side="left", padx=12)
         ttk.Button(top_run, text="Reiniciar processo", command=lambda: self.reset_all(confirm=True)).pack(side="left", padx=6)
         ttk.Button(top_run, text="Abrir pasta Áudio", command=self.open_audio_folder).pack(side="left", padx=12)
         ttk.Button(top_run, text="Abrir pasta Vídeo", command=self.open_video_folder).pack(side="left", padx=6)
+        ttk.Button(top_run, text="Relatório da última execução", command=lambda: self.show_run_report(True)).pack(side="left", padx=6)
         ttk.Button(top_run, text="Abrir pasta de Logs", command=self.open_logs).pack(side="left", padx=12)
         ttk.Button(top_run, text="Reproduzir último arquivo (player interno)", command=self.play_last_downloaded).pack(side="left", padx=12)
 
@@ -325,17 +429,29 @@ class App(tk.Tk):
         self.progress.pack(fill="x", padx=8, pady=6)
         self.lbl_status = ttk.Label(prog_frame, text="Aguardando…")
         self.lbl_status.pack(fill="x", padx=8, pady=(0,8))
+        self.lbl_rate = ttk.Label(prog_frame, text="")
+        self.lbl_rate.pack(fill="x", padx=8, pady=(0,8))
 
         log_frame = ttk.LabelFrame(tab_run, text="Log ao vivo")
         log_frame.pack(fill="both", expand=True, padx=8, pady=6)
+        log_bar = ttk.Frame(log_frame); log_bar.pack(side="top", fill="x", padx=4, pady=(2,4))
+        self.log_levels = {lv: tk.BooleanVar(value=True) for lv in ("DEBUG", "INFO", "WARN", "ERRO")}
+        for lv, var in self.log_levels.items():
+            ttk.Checkbutton(log_bar, text=lv, variable=var, command=self.apply_log_filter).pack(side="left", padx=4)
+        ttk.Label(log_bar, text="Buscar:").pack(side="left", padx=(12,4))
+        self.log_search_var = tk.StringVar()
+        ent_log = ttk.Entry(log_bar, textvariable=self.log_search_var, width=30); ent_log.pack(side="left")
+        ent_log.bind("<Return>", lambda e: self.apply_log_filter())
+        ttk.Button(log_bar, text="Filtrar", command=self.apply_log_filter).pack(side="left", padx=4)
+        ttk.Button(log_bar, text="Limpar painel", command=self.clear_log_view).pack(side="left", padx=4)
+        ttk.Label(log_bar, text="(painel mostra as últimas linhas; histórico completo no arquivo de log)").pack(side="left", padx=8)
         self.txt_log = tk.Text(log_frame, height=12, state="disabled")
         self.txt_log.pack(side="left", fill="both", expand=True)
         log_sb = ttk.Scrollbar(log_frame, orient="vertical", command=self.txt_log.yview)
         self.txt_log.configure(yscrollcommand=log_sb.set)
         log_sb.pack(side="right", fill="y")
 
-    def _build_donation_tab(self, nb):
-        tab_donate = ttk.Frame(nb)
+    def _build_donation_tab(self, tab_donate):
         donate_frame = ttk.LabelFrame(tab_donate, text="Contribua para o projeto ❤️")
         donate_frame.pack(fill="x", padx=10, pady=10)
         ttk.Label(donate_frame, text="Qualquer valor ajuda a manter e evoluir a ferramenta. Obrigado!").pack(anchor="w", padx=8, pady=(6,2))
@@ -350,7 +466,6 @@ class App(tk.Tk):
         ttk.Button(btns_pp, text="Copiar e-mail do PayPal", command=lambda: self.copy_to_clipboard("sfbarboza82@hotmail.com", "E-mail do PayPal copiado!")).pack(side="left", padx=6)
         ttk.Button(btns_pp, text="Abrir PayPal.com", command=lambda: webbrowser.open("https://www.paypal.com/")).pack(side="left", padx=6)
         ttk.Label(tab_donate, text="No PayPal, escolha “Enviar dinheiro” e cole o e-mail acima.").pack(anchor="w", padx=12, pady=(0,10))
-        return tab_donate
 
     def copy_to_clipboard(self, text, msg_ok="Copiado!"):
         try:
@@ -389,6 +504,30 @@ class App(tk.Tk):
         win.transient(self); win.grab_set(); self.wait_window(win)
         return res["choice"]
 
+    def import_archive(self, mode):
+        outdir = self.audio_out.get() if mode == "audio" else self.video_out.get()
+        p = filedialog.askopenfilename(title="Importar baixados.txt", initialdir=outdir, filetypes=[("Texto","*.txt")])
+        if not p: return
+        try:
+            from .archive import get_archive_store
+            n = get_archive_store().import_txt(p, mode, outdir)
+            self.logger.info("[Histórico] %s novos registros importados de %s", n, p)
+            messagebox.showinfo("Histórico", "%d novos registros importados para:\n%s" % (n, outdir))
+        except Exception as e:
+            messagebox.showerror("Erro", "Falha ao importar histórico:\n%s" % e)
+
+    def export_archive(self, mode):
+        outdir = self.audio_out.get() if mode == "audio" else self.video_out.get()
+        p = filedialog.asksaveasfilename(title="Exportar histórico como baixados.txt", initialdir=outdir,
+                                         initialfile="baixados.txt", defaultextension=".txt", filetypes=[("Texto","*.txt")])
+        if not p: return
+        try:
+            from .archive import get_archive_store
+            n = get_archive_store().export_txt(p, mode, outdir)
+            messagebox.showinfo("Exportado", "%d registros salvos em:\n%s" % (n, p))
+        except Exception as e:
+            messagebox.showerror("Erro", "Falha ao exportar histórico:\n%s" % e)
+
     def browse_audio_out(self):
         p = filedialog.askdirectory(title="Selecionar pasta de saída (Áudio)")
         if p:
@@ -401,7 +540,10 @@ class App(tk.Tk):
         p = filedialog.askdirectory(title="Selecionar pasta de Logs")
         if p:
             self.log_dir.set(p)
+            try: self.logger.close()
+            except Exception: pass
             self.logger, self.log_path = setup_logger(self.log_dir.get(), self.txt_log, name="downloadsfb")
+            self._apply_log_debug()
             self.logger.info("Pasta de logs alterada para %s", self.log_dir.get())
 
     def apply_pioneer_profile(self):
@@ -461,11 +603,74 @@ class App(tk.Tk):
             self.tree_general.set(iid, "mark", UNCHECKED)
         self.checked_gen.clear()
 
-    def _insert_mb_pairs(self, pairs):
-        for artist, title in pairs:
+    def _insert_mb_pairs(self, rows, ctx=None):
+        """Insere (artista, música, já_no_índice) na tabela, pulando músicas já mostradas nesta busca
+        (self._mb_shown). Com `ctx` (busca em andamento, uma chamada por página) só acumula os totais."""
+        known = added = 0
+        for artist, title, indexed in rows:
+            key = pair_key(artist, title)
+            if key in self._mb_shown: continue
+            self._mb_shown.add(key); added += 1; known += bool(indexed)
             ytq = "ytsearch1:%s - %s official" % (artist, title)
             self.tree.insert("", "end", values=(UNCHECKED, artist, title, ytq))
-        self.logger.info("%s resultados adicionados (MusicBrainz).", len(pairs))
+        if ctx is None:
+            self.logger.info("%s resultados adicionados (MusicBrainz); %s já resolvidos no índice.", added, known)
+        else:
+            ctx["added"] += added; ctx["known"] += known
+
+    @staticmethod
+    def _mb_indexed(pairs):
+        """Pares com a marca "já resolvido no índice de consultas" (SQLite: chamado na thread da busca)."""
+        try:
+            from .query_index import get_query_index
+            idx = get_query_index()
+        except Exception:
+            idx = None
+        return [(a, t, idx is not None and bool(idx.lookup_pair(a, t, touch=False))) for a, t in pairs]
+
+    def _setup_mb_cache(self):
+        """Aplica TTL/vencidos da aba Qualidade ao cache do MusicBrainz (chamado na thread da busca)."""
+        from .mb_api import configure_cache
+        try:
+            ttl_h = int(self.mb_cache_ttl_h.get() or 0)
+        except (tk.TclError, ValueError):
+            ttl_h = MB_CACHE_TTL_H
+        if configure_cache(ttl_h, self.mb_cache_stale.get()) is None and ttl_h > 0:
+            self.logger.warning("[Cache] cache do MusicBrainz indisponível; consultando só a rede.")
+
+    def _start_mb_search(self, text):
+        """Nova busca no MusicBrainz: cancela a anterior (se ainda rodando) e devolve o contexto
+        da nova (evento de parada + totais), usado pelas páginas que chegam da thread."""
+        prev = getattr(self, "_mb_search", None)
+        if prev is not None: prev["stop"].set()
+        ctx = self._mb_search = {"stop": threading.Event(), "added": 0, "known": 0, "t0": time.monotonic()}
+        self._mb_shown = set()
+        self.pg_mb.start(10); self.lbl_mb.config(text=text)
+        return ctx
+
+    def _mb_page(self, ctx, pairs, text=None):
+        """Chamado na thread da busca a cada página: insere no loop do Tk e atualiza o rótulo."""
+        rows = self._mb_indexed(pairs) if pairs else None
+        def _apply():
+            if ctx["stop"].is_set(): return
+            if rows: self._insert_mb_pairs(rows, ctx)
+            if text and self._mb_search is ctx: self.lbl_mb.config(text=text % ctx)
+        self.after(0, _apply)
+
+    def _finish_mb_search(self, ctx, what):
+        def _apply():
+            cancelled = ctx["stop"].is_set()
+            self.logger.info("%s resultados adicionados (MusicBrainz, %s em %.1fs)%s; %s já resolvidos no índice.", ctx["added"], what,
+                             time.monotonic() - ctx["t0"], " — busca cancelada" if cancelled else "", ctx["known"])
+            if self._mb_search is ctx:
+                self._mb_search = None
+                self.pg_mb.stop(); self.lbl_mb.config(text="Cancelado" if cancelled else "Parado")
+        self.after(0, _apply)
+
+    def cancel_mb_search(self):
+        ctx = getattr(self, "_mb_search", None)
+        if ctx is not None and not ctx["stop"].is_set():
+            ctx["stop"].set(); self.lbl_mb.config(text="Cancelando…")
 
     def search_by_genre(self):
         genre = self.genre_var.get().strip()
@@ -473,24 +678,33 @@ class App(tk.Tk):
             messagebox.showwarning("Atenção","Informe um gênero (ex.: grunge)")
             return
         self.logger.info("Buscando artistas por gênero: %s", genre)
-        self.pg_mb.start(10); self.lbl_mb.config(text="Buscando artistas…")
+        ctx = self._start_mb_search("Buscando artistas…"); stop = ctx["stop"]
         def _task():
             try:
-                arts = mb_search_artists_by_genre(genre, limit=int(self.mb_limit_artists.get() or 10))
-                all_pairs = []
-                for i, a in enumerate(arts, start=1):
-                    self.lbl_mb.after(0, lambda i=i, a=a: self.lbl_mb.config(text="Coletando músicas de %s (%d/%d)…" % (a, i, len(arts))))
-                    pairs = mb_search_recordings_by_artist(a, limit=int(self.mb_limit_tracks.get() or 3))
-                    all_pairs.extend(pairs); time.sleep(0.5)
-                self.after(0, lambda: self._insert_mb_pairs(all_pairs))
+                from .mb_api import iter_artists_by_genre, iter_recordings_by_artists, get_mb_client  # requests: carregado na thread
+                self._setup_mb_cache(); st0 = get_mb_client().stats()
+                arts = []; ids = set()
+                for page in iter_artists_by_genre(genre, int(self.mb_limit_artists.get() or 10), stop, with_ids=True):
+                    for a in page:
+                        if (a[1] or a[0]) not in ids: ids.add(a[1] or a[0]); arts.append(a)  # mesmo MBID repetido entre páginas
+                    self._mb_page(ctx, None, "Buscando artistas… %d" % len(arts))
+                # as músicas de cada artista entram na tabela conforme as páginas chegam
+                for a, page in iter_recordings_by_artists(arts, int(self.mb_limit_tracks.get() or 3), stop):
+                    if isinstance(page, Exception):
+                        self.logger.warning("[MusicBrainz] falha nas músicas de %s: %s", a[0], page); continue
+                    self._mb_page(ctx, page, "Coletando músicas de %d artistas… %%(added)d até agora (%s)" % (len(arts), a[0].replace("%", "%%")))
+                st = get_mb_client().stats()
+                self.logger.info("[MusicBrainz] %s artistas: %s requisições, %s novas tentativas, %s do cache.", len(arts),
+                                 st["requests"] - st0["requests"], st["retries"] - st0["retries"],
+                                 st.get("cache_hits", 0) - st0.get("cache_hits", 0))
             except Exception as e:
                 try:
                     self.logger.exception("Busca por gênero falhou: %s", e)
                 except Exception:
                     pass
             finally:
-                self.pg_mb.stop(); self.lbl_mb.config(text="Parado")
-        threading.Thread(target=_task, daemon=True).start()
+                self._finish_mb_search(ctx, "gênero " + genre)
+        threading.Thread(target=profiling.profiled(_task, "busca-genero", self.log_dir.get(), self.logger), daemon=True).start()
 
     def search_by_artist(self):
         artist = self.artist_var.get().strip()
@@ -498,19 +712,21 @@ class App(tk.Tk):
             messagebox.showwarning("Atenção","Informe um artista/banda")
             return
         self.logger.info("Buscando músicas do artista: %s", artist)
-        self.pg_mb.start(10); self.lbl_mb.config(text="Buscando…")
+        ctx = self._start_mb_search("Buscando…")
         def _task():
             try:
-                recs = mb_search_recordings_by_artist(artist, limit=int(self.mb_limit_tracks.get() or 10))
-                self.after(0, lambda: self._insert_mb_pairs(recs))
+                from .mb_api import iter_artist_recordings
+                self._setup_mb_cache()
+                for page in iter_artist_recordings(artist, int(self.mb_limit_tracks.get() or 10), ctx["stop"]):
+                    self._mb_page(ctx, page, "Buscando… %(added)d músicas")
             except Exception as e:
                 try:
                     self.logger.exception("Busca por artista falhou: %s", e)
                 except Exception:
                     pass
             finally:
-                self.pg_mb.stop(); self.lbl_mb.config(text="Parado")
-        threading.Thread(target=_task, daemon=True).start()
+                self._finish_mb_search(ctx, "artista " + artist)
+        threading.Thread(target=profiling.profiled(_task, "busca-artista", self.log_dir.get(), self.logger), daemon=True).start()
 
     def search_by_title(self):
         title = self.title_var.get().strip()
@@ -518,19 +734,21 @@ class App(tk.Tk):
             messagebox.showwarning("Atenção","Informe o nome da música")
             return
         self.logger.info("Buscando por nome de música: %s", title)
-        self.pg_mb.start(10); self.lbl_mb.config(text="Buscando…")
+        ctx = self._start_mb_search("Buscando…")
         def _task():
             try:
-                recs = mb_search_recordings_by_title(title, limit=int(self.mb_limit_tracks.get() or 12))
-                self.after(0, lambda: self._insert_mb_pairs(recs))
+                from .mb_api import iter_recordings_by_title
+                self._setup_mb_cache()
+                for page in iter_recordings_by_title(title, int(self.mb_limit_tracks.get() or 12), ctx["stop"]):
+                    self._mb_page(ctx, page, "Buscando… %(added)d músicas")
             except Exception as e:
                 try:
                     self.logger.exception("Busca por título falhou: %s", e)
                 except Exception:
                     pass
             finally:
-                self.pg_mb.stop(); self.lbl_mb.config(text="Parado")
-        threading.Thread(target=_task, daemon=True).start()
+                self._finish_mb_search(ctx, "título " + title)
+        threading.Thread(target=profiling.profiled(_task, "busca-titulo", self.log_dir.get(), self.logger), daemon=True).start()
 
     def search_general(self):
         terms = self.general_query_var.get().strip()
@@ -545,6 +763,7 @@ class App(tk.Tk):
         self.logger.info("Preparando busca geral: %s", self.last_general_query)
         self.pg_gen.start(10); self.lbl_gen.config(text="Consultando YouTube…")
         def _task():
+            from .general_search import search_youtube
             results = search_youtube(self.logger, q + " official", limit=limit)
             def _insert():
                 self.tree_general.delete(*self.tree_general.get_children())
@@ -554,16 +773,22 @@ class App(tk.Tk):
                 self.logger.info("%s resultados gerais adicionados.", len(results))
             self.after(0, _insert)
             self.pg_gen.stop(); self.lbl_gen.config(text="Parado")
-        threading.Thread(target=_task, daemon=True).start()
+        threading.Thread(target=profiling.profiled(_task, "busca-geral", self.log_dir.get(), self.logger), daemon=True).start()
 
-    def _show_added_message(self, titulo, items):
-        if not items:
+    def _show_added_message(self, titulo, items, duplicates=0):
+        if not items and not duplicates:
             return
         n = len(items)
         preview = "\n".join("• " + s for s in items[:20])
         suffix = "" if n <= 20 else "\n… e mais %d itens." % (n - 20)
+        if duplicates:
+            suffix += "\n\n%d duplicados ignorados (já na fila ou repetidos)." % duplicates
         messagebox.showinfo(titulo, "Foram adicionados %d itens:\n\n%s%s" % (n, preview, suffix))
 
+    def _queue_keys(self, listbox):
+        """Chaves canônicas dos itens já presentes na fila (para deduplicar novas entradas)."""
+        return {canonical_key(listbox.get(i)) for i in range(listbox.size())}
+
     def add_marked_mb_to_audio(self):
         added = []
         for iid in self.tree.get_children():
@@ -646,15 +871,13 @@ class App(tk.Tk):
         p = filedialog.askopenfilename(title="Selecionar lista .txt", filetypes=[("Texto","*.txt")])
         if not p:
             return
-        cnt = 0
-        added = []
         with open(p, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                q = line.strip()
-                if q:
-                    listbox.insert("end", q); cnt += 1; added.append(q)
-        self.logger.info("%s itens importados de %s", cnt, os.path.basename(p))
-        self._show_added_message("Itens importados de %s" % os.path.basename(p), added)
+            lines = [line.strip() for line in f if line.strip()]
+        added, dup = dedupe(lines, self._queue_keys(listbox))
+        for q in added:
+            listbox.insert("end", q)
+        self.logger.info("%s itens importados de %s (%s duplicados ignorados)", len(added), os.path.basename(p), dup)
+        self._show_added_message("Itens importados de %s" % os.path.basename(p), added, dup)
     def _normalize_lines(self, text: str):
         parts = []
         for raw in text.replace("\r","\n").split("\n"):
@@ -702,11 +925,12 @@ class App(tk.Tk):
         if not items:
             messagebox.showwarning("Atenção","Cole uma lista (uma por linha).")
             return
+        items, dup = dedupe(items, self._queue_keys(listbox))
         for it in items:
             listbox.insert("end", it)
-        self.logger.info("%s itens adicionados à fila.", len(items))
+        self.logger.info("%s itens adicionados à fila (%s duplicados ignorados).", len(items), dup)
         try:
-            self._show_added_message("Lista adicionada", items)
+            self._show_added_message("Lista adicionada", items, dup)
         except Exception:
             pass
 
@@ -739,6 +963,7 @@ class App(tk.Tk):
 
 
     def _prepare_removable_destination(self, mode):
+        from . import storage
         try:
             drives = storage.list_removable_drives()
         except Exception as e:
@@ -824,10 +1049,19 @@ class App(tk.Tk):
             spd = ("%.2f MB/s" % (speed/1024.0/1024.0)) if speed else "-"
             eta_s = ("%ds" % int(eta)) if eta else "-"
             self.lbl_status.configure(text="%s: %5.1f%% | %s | ETA %s | %s" % (stage, pct, spd, eta_s, (title or "")[:80]))
-            self.update_idletasks()
         except Exception:
             pass
 
+    def _drain_progress(self):
+        """Consolida os eventos publicados pelos workers desde o último quadro (thread do Tk)."""
+        try:
+            snap = self.progress_bus.drain()
+            if snap is not None:
+                self.set_progress(*snap)
+        except Exception:
+            pass
+        self.after(1000 // PROGRESS_FPS, self._drain_progress)
+
     def _quality_dict(self):
         return {
             "audio_bitrate_k": self.audio_bitrate_k.get(),
@@ -840,8 +1074,36 @@ class App(tk.Tk):
             "video_crf": self.video_crf.get(),
             "video_preset": self.video_preset.get(),
             "video_audio_k": self.video_audio_k.get(),
+            "parallel_items": self.parallel_items.get(),
+            "resolve_workers": self.resolve_workers.get(),
+            "encode_workers": self.encode_workers.get(),
+            "info_cache_ttl_h": self.info_cache_ttl_h.get(),
+            "rate_limit_kbps": self.rate_limit_kbps.get(),
+            "rate_limit_rps": self.rate_limit_rps.get(),
+            "log_debug": self.log_debug.get(),
+            "profile": self.profile_run.get(),
         }
 
+    def _apply_log_debug(self):
+        try: self.logger.debug_enabled = bool(self.log_debug.get())
+        except Exception: pass
+
+    def apply_log_filter(self):
+        h = getattr(self.logger, "text_handler", None)
+        if h is None: return
+        levels = [lv for lv, var in self.log_levels.items() if var.get()]
+        h.set_filter(None if len(levels) == len(self.log_levels) else levels, self.log_search_var.get())
+
+    def clear_log_view(self):
+        h = getattr(self.logger, "text_handler", None)
+        if h is not None: h.clear()
+
+    def _apply_rate_limits(self):
+        try:
+            get_rate_limiter().set_limits(float(self.rate_limit_kbps.get() or 0) * 1024, float(self.rate_limit_rps.get() or 0))
+        except (tk.TclError, ValueError):
+            pass  # campo em edição (vazio/inválido)
+
     def open_folder(self, path):
         try:
             os.makedirs(path, exist_ok=True)
@@ -861,7 +1123,7 @@ class App(tk.Tk):
         self.open_folder(self.video_out.get())
 
     def open_logs(self):
-
+        self.open_folder(self.log_dir.get())
 
     def reset_session(self):
         """Reinicia o estado da interface para permitir um novo processo sem reabrir o app.
@@ -909,79 +1171,6 @@ class App(tk.Tk):
         except Exception:
             pass
 
-        self.open_folder(self.log_dir.get())
-
-    
-
-        def _show():
-            if files:
-                try:
-                    self.last_downloaded_files.extend(files)
-                except Exception:
-                    pass
-                try:
-                    preview = "\\n".join("• " + (os.path.relpath(f, outdir) if (f or "").startswith(outdir) else os.path.basename(f)) for f in files[:20])
-                except Exception:
-                    preview = "\\n".join("• " + os.path.basename(f) for f in files[:20])
-                suffix = "" if len(files) <= 20 else "\\n… e mais %d arquivos." % (len(files) - 20)
-                messagebox.showinfo(tr("Concluído — %s") % mode.upper(),
-                                    (tr("Sucesso: %d | Falhas: %d") + "\\n" + tr("Pasta: %s") + "\\n\\n" + tr("Arquivos baixados (%d):") + "\\n\\n%s%s")
-                                    % (ok, err, outdir, len(files), preview, suffix))
-                messagebox.showinfo(tr("Concluído — %s") % mode.upper(),
-                                    (tr("Sucesso: %d | Falhas: %d") + "
-" + tr("Nenhum arquivo listado.")) % (ok, err))
-            try:
-                if self.auto_open_folder.get() or messagebox.askyesno(tr("Concluído — %s") % mode.upper(), tr("Deseja abrir a pasta dos arquivos agora?")):
-                    try:
-                        os.startfile(outdir)
-                    except Exception:
-                        webbrowser.open(outdir)
-            except Exception:
-                pass
-        try:
-            def _reset():
-            try:
-                self.reset_session()
-            finally:
-                pass
-        self.after(0, _show)
-        self.after(0, _reset)
-        except Exception:
-            _show()
-        # Limpeza mínima de estado p/ próxima execução
-        try:
-            self.worker = None
-            self.progress["value"] = 0
-            self.lbl_status.configure(text=tr("Aguardando…"))
-        except Exception:
-            pass
-
-        def _show():
-            if files:
-                try:
-                    self.last_downloaded_files.extend(files)
-                except Exception:
-                    pass
-                preview = "\n".join("• " + (os.path.relpath(f, outdir) if f.startswith(outdir) else os.path.basename(f)) for f in files[:20])
-                suffix = "" if len(files) <= 20 else "\n… e mais %d arquivos." % (len(files) - 20)
-                messagebox.showinfo("Concluído — %s" % mode.upper(),
-                                    "Sucesso: %d | Falhas: %d\nPasta: %s\n\nArquivos baixados (%d):\n\n%s%s"
-                                    % (ok, err, outdir, len(files), preview, suffix))
-            else:
-                messagebox.showinfo("Concluído — %s" % mode.upper(), "Sucesso: %d | Falhas: %d\nNenhum arquivo listado." % (ok, err))
-            try:
-                if self.auto_open_folder.get() or messagebox.askyesno("Concluído — %s" % mode.upper(), "Deseja abrir a pasta dos arquivos agora?"):
-                    self.open_folder(outdir)
-            except Exception:
-                pass
-        def _reset():
-            try:
-                self.reset_session()
-            finally:
-                pass
-        self.after(0, _show)
-        self.after(0, _reset)
-
     def play_last_downloaded(self):
         if not self.last_downloaded_files:
             messagebox.showinfo("Player interno","Ainda não há arquivos nesta sessão.")
@@ -1006,13 +1195,16 @@ class App(tk.Tk):
             return
         if getattr(self,"worker",None) and not self.worker.is_alive():
             self.worker = None
-        items = [self.lst_audio.get(i) for i in range(self.lst_audio.size())]
-        if not items:
+        if not self.lst_audio.size():
             messagebox.showwarning("Fila vazia","Adicione itens à fila de Áudio.")
             return
         dest = self._prepare_removable_destination("audio") or self.audio_out.get()
-        self.logger.info("Iniciando Áudio com %s itens.", len(items))
-        self.worker = DownloadWorker("audio", items, dest, self.logger, self.set_progress, self._quality_dict(), self._on_worker_done)
+        items = (self.lst_audio.get(i) for i in range(self.lst_audio.size()))
+        job = self._new_journal("audio", dest, items)
+        self.logger.info("Iniciando Áudio com %s itens.", job.total if job else self.lst_audio.size())
+        from .worker import DownloadWorker
+        self.worker = DownloadWorker("audio", None if job else list(self.lst_audio.get(0, "end")), dest, self.logger,
+                                     self._new_progress_bus(), self._quality_dict(), self._on_worker_done, journal=job)
         self.worker.start()
 
     def start_video(self):
@@ -1021,13 +1213,51 @@ class App(tk.Tk):
             return
         if getattr(self,"worker",None) and not self.worker.is_alive():
             self.worker = None
-        items = [self.lst_video.get(i) for i in range(self.lst_video.size())]
-        if not items:
+        if not self.lst_video.size():
             messagebox.showwarning("Fila vazia","Adicione itens à fila de Vídeo.")
             return
         dest = self._prepare_removable_destination("video") or self.video_out.get()
-        self.logger.info("Iniciando Vídeo com %s itens.", len(items))
-        self.worker = DownloadWorker("video", items, dest, self.logger, self.set_progress, self._quality_dict(), self._on_worker_done)
+        items = (self.lst_video.get(i) for i in range(self.lst_video.size()))
+        job = self._new_journal("video", dest, items)
+        self.logger.info("Iniciando Vídeo com %s itens.", job.total if job else self.lst_video.size())
+        from .worker import DownloadWorker
+        self.worker = DownloadWorker("video", None if job else list(self.lst_video.get(0, "end")), dest, self.logger,
+                                     self._new_progress_bus(), self._quality_dict(), self._on_worker_done, journal=job)
+        self.worker.start()
+
+    def _new_progress_bus(self):
+        self.progress_bus.reset()
+        return self.progress_bus
+
+    def _new_journal(self, mode, dest, items):
+        """Grava a fila num diário de job (retomável); sem diário o worker recebe a lista em memória."""
+        try:
+            job = JobJournal.create(mode, dest, items)
+            if job.duplicates: self.logger.info("[Fila] %s entradas duplicadas/vazias removidas.", job.duplicates)
+            return job
+        except Exception as e:
+            self.logger.warning("[Diário] não foi possível criar o diário do job: %s", e)
+            return None
+
+    def resume_job(self):
+        if getattr(self,"worker",None) and self.worker.is_alive():
+            messagebox.showinfo("Execução","Já existe uma execução em andamento.")
+            return
+        job = latest_unfinished()
+        if job is None:
+            messagebox.showinfo("Retomar","Nenhum job interrompido encontrado.")
+            return
+        c = job.counts()
+        pending = c["pending"] + c["resolved"] + c["downloaded"]
+        ans = messagebox.askyesnocancel("Retomar job",
+            "Job %s (%s → %s)\n\nItens: %d | concluídos: %d | falhas: %d | pendentes: %d\n\nRepetir também os itens que falharam?"
+            % (job.header.get("id"), job.mode, job.outdir, job.total, c["done"] + c["skipped"], c["failed"], pending))
+        if ans is None:
+            job.close(); return
+        q = dict(self._quality_dict(), retry_failed=bool(ans))
+        self.logger.info("Retomando job %s (%s).", job.header.get("id"), job.mode)
+        from .worker import DownloadWorker
+        self.worker = DownloadWorker(job.mode, None, job.outdir, self.logger, self._new_progress_bus(), q, self._on_worker_done, journal=job)
         self.worker.start()
 
     def stop_worker(self):
@@ -1068,7 +1298,7 @@ class App(tk.Tk):
             pass
         # Progresso de buscas
         try:
-            self.pg_mb.stop(); self.lbl_mb.configure(text=tr("Parado"))
+            self.cancel_mb_search(); self.pg_mb.stop(); self.lbl_mb.configure(text=tr("Parado"))
         except Exception:
             pass
         try:
@@ -1077,7 +1307,7 @@ class App(tk.Tk):
             pass
         # Limpar árvores e marcações
         try:
-            self.tree.delete(*self.tree.get_children()); self.checked_mb.clear()
+            self.tree.delete(*self.tree.get_children()); self.checked_mb.clear(); self._mb_shown.clear()
         except Exception:
             pass
         try:
@@ -1101,7 +1331,10 @@ class App(tk.Tk):
             pass
         # Recriar sessão de log
         try:
+            try: self.logger.close()
+            except Exception: pass
             self.logger, self.log_path = setup_logger(self.log_dir.get(), self.txt_log, name="downloadsfb")
+            self._apply_log_debug()
             self.logger.info("Sessão reiniciada. Logs: %s", self.log_path)
         except Exception:
             pass
@@ -1119,95 +1352,81 @@ class App(tk.Tk):
         except Exception:
             pass
 
+    def show_cache_stats(self):
+        """Acertos, consultas à rede e tamanho dos caches em disco (MusicBrainz e metadados do yt-dlp)."""
+        lines = []
+        try:
+            from .mb_cache import get_mb_cache
+            lines.append("MusicBrainz: " + get_mb_cache().summary())
+        except Exception as e:
+            lines.append("MusicBrainz: indisponível (%s)" % e)
+        try:
+            from .info_cache import get_info_cache
+            s = get_info_cache().stats()
+            lines.append("Metadados (yt-dlp): %d entradas, %.1f MB em disco | %d acertos, %d consultas à rede" % (
+                s["entries"], s["bytes"] / 1048576.0, s["hits"], s["misses"]))
+        except Exception as e:
+            lines.append("Metadados (yt-dlp): indisponível (%s)" % e)
+        try:
+            from .mb_local import get_local_index
+            idx = get_local_index()
+            if idx is not None:
+                s = idx.stats()
+                lines.append("Índice local MusicBrainz (offline): %d artistas, %d gravações, %d tags, %.1f MB | importado em %s" % (
+                    s["artists"], s["recordings"], s["tags"], s["bytes"] / 1048576.0, s["imported"] or "-"))
+        except Exception as e:
+            lines.append("Índice local MusicBrainz: indisponível (%s)" % e)
+        for line in lines: self.logger.info("[Cache] %s", line)
+        if messagebox.askyesno("Estatísticas dos caches", "\n\n".join(lines) + "\n\nLimpar o cache do MusicBrainz?", default="no"):
+            try:
+                from .mb_cache import get_mb_cache
+                get_mb_cache().clear(); self.logger.info("[Cache] cache do MusicBrainz limpo.")
+            except Exception as e:
+                self.logger.warning("[Cache] falha ao limpar: %s", e)
+
+    def show_run_report(self, ask=False):
+        """Janela com o relatório de telemetria (vazão, p50/p95 por estágio, itens mais lentos)."""
+        rep = getattr(self, "last_report", None)
+        if not rep:
+            if ask: messagebox.showinfo("Relatório", "Nenhuma execução com telemetria nesta sessão.")
+            return
+        win = tk.Toplevel(self); win.title("Relatório da execução")
+        txt = tk.Text(win, width=100, height=28, font=("Consolas", 10))
+        txt.insert("1.0", rep); txt.configure(state="disabled"); txt.pack(fill="both", expand=True, padx=8, pady=8)
+        ttk.Button(win, text="Fechar", command=win.destroy).pack(pady=(0,8))
+
     def _on_worker_done(self, mode, files, ok, err, outdir):
         """
         Callback do worker ao finalizar. Mantido original no espírito; acrescenta limpeza mínima
         de estado para permitir novos processos sem reiniciar o app.
         """
+        self.last_report = getattr(getattr(self, "worker", None), "report_text", None) or getattr(self, "last_report", None)
         def _show():
             if files:
                 try:
                     self.last_downloaded_files.extend(files)
                 except Exception:
                     pass
-                try:
-                    preview = "\\n".join("• " + (os.path.relpath(f, outdir) if (f or "").startswith(outdir) else os.path.basename(f)) for f in files[:20])
-                except Exception:
-                    preview = "\\n".join("• " + os.path.basename(f) for f in files[:20])
-                suffix = "" if len(files) <= 20 else "\\n… e mais %d arquivos." % (len(files) - 20)
-                messagebox.showinfo(tr("Concluído — %s") % mode.upper(),
-                                    (tr("Sucesso: %d | Falhas: %d") + "\\n" + tr("Pasta: %s") + "\\n\\n" + tr("Arquivos baixados (%d):") + "\\n\\n%s%s")
-                                    % (ok, err, outdir, len(files), preview, suffix))
-            else:
-                messagebox.showinfo(tr("Concluído — %s") % mode.upper(),
-                                    (tr("Sucesso: %d | Falhas: %d") + "\\n" + tr("Nenhum arquivo listado.")) % (ok, err))
-            try:
-                if self.auto_open_folder.get() or messagebox.askyesno(tr("Concluído — %s") % mode.upper(), tr("Deseja abrir a pasta dos arquivos agora?")):
-                    try:
-                        os.startfile(outdir)
-                    except Exception:
-                        webbrowser.open(outdir)
-            except Exception:
-                pass
-        try:
-            def _reset():
-            try:
-                self.reset_session()
-            finally:
-                pass
-        self.after(0, _show)
-        self.after(0, _reset)
-        except Exception:
-            _show()
-        # Limpeza mínima de estado p/ próxima execução
-        try:
-            self.worker = None
-            self.progress["value"] = 0
-            self.lbl_status.configure(text=tr("Aguardando…"))
-        except Exception:
-            pass
-
-        def _show():
-            if files:
-                try:
-                    self.last_downloaded_files.extend(files)
-                except Exception:
-                    pass
-                try:
-                    preview = "\\n".join("• " + (os.path.relpath(f, outdir) if (f or "").startswith(outdir) else os.path.basename(f)) for f in files[:20])
-                except Exception:
-                    preview = "\\n".join("• " + os.path.basename(f) for f in files[:20])
-                suffix = "" if len(files) <= 20 else "\\n… e mais %d arquivos." % (len(files) - 20)
-                messagebox.showinfo(tr("Concluído — %s") % mode.upper(),
-                                    (tr("Sucesso: %d | Falhas: %d") + "\\n" + tr("Pasta: %s") + "\\n\\n" + tr("Arquivos baixados (%d):") + "\\n\\n%s%s")
+                preview = "\n".join("• " + (os.path.relpath(f, outdir) if f.startswith(outdir) else os.path.basename(f)) for f in files[:20])
+                suffix = "" if len(files) <= 20 else "\n… e mais %d arquivos." % (len(files) - 20)
+                messagebox.showinfo("Concluído — %s" % mode.upper(),
+                                    "Sucesso: %d | Falhas: %d\nPasta: %s\n\nArquivos baixados (%d):\n\n%s%s"
                                     % (ok, err, outdir, len(files), preview, suffix))
             else:
-                messagebox.showinfo(tr("Concluído — %s") % mode.upper(),
-                                    tr("Sucesso: %d | Falhas: %d
-Nenhum arquivo listado.") % (ok, err))
+                messagebox.showinfo("Concluído — %s" % mode.upper(), "Sucesso: %d | Falhas: %d\nNenhum arquivo listado." % (ok, err))
             try:
-                if self.auto_open_folder.get() or messagebox.askyesno(tr("Concluído — %s") % mode.upper(), tr("Deseja abrir a pasta dos arquivos agora?")):
-                    try: os.startfile(outdir)
-                    except Exception: webbrowser.open(outdir)
+                if self.auto_open_folder.get() or messagebox.askyesno("Concluído — %s" % mode.upper(), "Deseja abrir a pasta dos arquivos agora?"):
+                    self.open_folder(outdir)
             except Exception:
                 pass
-        try:
-            def _reset():
+            self.show_run_report()
+        def _reset():
             try:
                 self.reset_session()
             finally:
                 pass
         self.after(0, _show)
         self.after(0, _reset)
-        except Exception:
-            _show()
-        # --- Limpeza de estado p/ próxima execução ---
-        try:
-            self.worker = None
-            self.progress["value"] = 0
-            self.lbl_status.configure(text=tr("Aguardando…"))
-        except Exception:
-            pass
 
 
 def run_app():
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistente dos resultados de extract_info (info_dict sanitizado), indexado pelo ID do
+vídeo (links do YouTube) ou pela URL/consulta. Usado pelo worker e pela busca geral.
+"""
+import os, threading, time
+from urllib.parse import urlparse, parse_qs
+from .disk_cache import DiskCache
+from .canonical import youtube_video_id
+from .util import app_data_dir
+
+DEFAULT_TTL_H = 24
+DEFAULT_MAX_MB = 256
+# Margem mínima de validade das URLs de mídia para reaproveitar o info_dict num download
+URL_EXPIRY_MARGIN_S = 15 * 60
+
+_DROP_KEYS = {"requested_downloads", "filepath", "_filename", "filename", "infojson_filename"}
+
+def sanitize_info(obj):
+    """Cópia serializável em JSON, sem chaves privadas (__*) nem resultados de download."""
+    if isinstance(obj, dict):
+        return {k: sanitize_info(v) for k, v in obj.items()
+                if isinstance(k, str) and not k.startswith("__") and k not in _DROP_KEYS}
+    if isinstance(obj, (list, tuple)):
+        return [sanitize_info(v) for v in obj]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return None
+
+def key_for(query):
+    q = (query or "").strip()
+    vid = youtube_video_id(q)
+    if vid and "list" not in parse_qs(urlparse(q).query):
+        return "yt:" + vid
+    return "q:" + q
+
+def _urls_expire_at(info):
+    """Menor `expire=` entre as URLs de mídia (googlevideo), ou None."""
+    out = None
+    for f in (info.get("requested_formats") or []) + (info.get("formats") or []) + [info]:
+        exp = (parse_qs(urlparse(f.get("url") or "").query).get("expire") or [None])[0]
+        try:
+            exp = int(exp) if exp else None
+        except ValueError:
+            exp = None
+        if exp and (out is None or exp < out):
+            out = exp
+    for e in info.get("entries") or []:
+        if isinstance(e, dict):
+            exp = _urls_expire_at(e)
+            if exp and (out is None or exp < out):
+                out = exp
+    return out
+
+class InfoCache:
+    def __init__(self, path=None, ttl_h=DEFAULT_TTL_H, max_mb=DEFAULT_MAX_MB):
+        path = path or os.path.join(app_data_dir(), "info_cache.sqlite3")
+        self.cache = DiskCache(path, ttl=float(ttl_h) * 3600, max_bytes=int(max_mb) * 1024 * 1024)
+
+    @property
+    def ttl_h(self):
+        return self.cache.ttl / 3600.0
+
+    @ttl_h.setter
+    def ttl_h(self, v):
+        self.cache.ttl = float(v) * 3600
+
+    def get(self, query, for_download=False):
+        """info_dict em cache. Com for_download=True, ignora entradas cujas URLs de mídia já expiraram."""
+        info = self.cache.get(key_for(query))
+        if info is not None and for_download:
+            exp = _urls_expire_at(info)
+            if exp and exp < time.time() + URL_EXPIRY_MARGIN_S:
+                return None
+        return info
+
+    def get_by_id(self, video_id):
+        return self.cache.get("yt:" + video_id) if video_id else None
+
+    def put(self, query, info):
+        if not isinstance(info, dict):
+            return
+        clean = sanitize_info(info)
+        self.cache.set(key_for(query), clean)
+        # Entradas de buscas/playlists também ficam acessíveis pelo ID do vídeo
+        for e in clean.get("entries") or []:
+            if isinstance(e, dict) and e.get("id") and (e.get("extractor_key") or "").lower() == "youtube":
+                self.cache.set("yt:" + e["id"], e)
+        if clean.get("id") and (clean.get("extractor_key") or "").lower() == "youtube" and not key_for(query).startswith("yt:"):
+            self.cache.set("yt:" + clean["id"], clean)
+
+    def invalidate(self, query):
+        self.cache.delete(key_for(query))
+
+    def stats(self):
+        return self.cache.stats()
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_info_cache(ttl_h=None):
+    """Instância compartilhada do cache; `ttl_h` (se informado) ajusta o TTL."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = InfoCache(ttl_h=DEFAULT_TTL_H if ttl_h is None else ttl_h)
+        elif ttl_h is not None:
+            _shared.ttl_h = ttl_h
+        return _shared
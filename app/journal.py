@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Diário de trabalho (append-only, JSONL) para filas grandes: registra os itens do job e
+o estado de cada um (pendente, resolvido, baixado, concluído, falhou, ignorado), para
+retomar exatamente de onde parou após parada ou travamento.
+
+Formato (uma linha JSON por evento):
+    {"ev": "job", "id": ..., "mode": ..., "outdir": ..., "created": ...}
+    {"ev": "item", "i": 1, "q": "<entrada da fila>"}
+    {"ev": "st", "i": 1, "s": "resolved" | "downloaded" | "done" | "failed" | "skipped", "err": ...}
+    {"ev": "end", "ts": ...}
+"""
+import os, json, itertools, threading, time
+from .canonical import canonical_key
+from .util import app_data_dir
+
+PENDING = "pending"; RESOLVED = "resolved"; DOWNLOADED = "downloaded"
+DONE = "done"; FAILED = "failed"; SKIPPED = "skipped"
+FINISHED = (DONE, SKIPPED)
+
+def jobs_dir():
+    d = app_data_dir("jobs")
+    os.makedirs(d, exist_ok=True)
+    return d
+
+def items_from_file(path):
+    """Lê uma lista .txt linha a linha (sem carregar o arquivo inteiro)."""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line
+
+def _iter_lines(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # última linha truncada por travamento
+
+class JobJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._f = open(path, "a", encoding="utf-8")
+        self.header = next(_iter_lines(path), None) or {}
+        self.total = None
+
+    @classmethod
+    def create(cls, mode, outdir, items, directory=None):
+        """Cria o diário gravando os itens em streaming; entradas duplicadas (chave canônica) são descartadas."""
+        base = time.strftime("%Y%m%d-%H%M%S") + "-" + mode; d = directory or jobs_dir()
+        for k in itertools.count():
+            # "x": dois jobs do mesmo modo no mesmo segundo (ex.: cron) não truncam um ao outro
+            jid = base if not k else "%s-%d" % (base, k)
+            path = os.path.join(d, jid + ".jsonl")
+            try:
+                f = open(path, "x", encoding="utf-8"); break
+            except FileExistsError:
+                continue
+        seen = set(); n = dup = 0
+        with f:
+            f.write(json.dumps({"ev": "job", "id": jid, "mode": mode, "outdir": outdir, "created": time.time()}) + "\n")
+            for q in items:
+                k = canonical_key(q)
+                if k is None or k in seen:
+                    dup += 1; continue
+                seen.add(k); n += 1
+                f.write(json.dumps({"ev": "item", "i": n, "q": q}, ensure_ascii=False) + "\n")
+        j = cls(path); j.total = n; j.duplicates = dup
+        return j
+
+    @property
+    def mode(self): return self.header.get("mode")
+
+    @property
+    def outdir(self): return self.header.get("outdir")
+
+    def mark(self, i, state, err=None):
+        rec = {"ev": "st", "i": i, "s": state}
+        if err: rec["err"] = str(err)[:300]
+        with self._lock:
+            if self._f.closed: return
+            self._f.write(json.dumps(rec, ensure_ascii=False) + "\n"); self._f.flush()
+
+    def finish(self):
+        with self._lock:
+            if not self._f.closed:
+                self._f.write(json.dumps({"ev": "end", "ts": time.time()}) + "\n"); self._f.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._f.closed:
+                try: os.fsync(self._f.fileno())
+                except OSError: pass
+                self._f.close()
+
+    def states(self):
+        """Último estado de cada item já processado ({índice: estado}); itens pendentes não aparecem."""
+        out = {}
+        for rec in _iter_lines(self.path):
+            if rec.get("ev") == "st":
+                out[rec["i"]] = rec["s"]
+        return out
+
+    def iter_pending(self, retry_failed=False, states=None):
+        """Gera (índice, entrada) dos itens não concluídos, lendo o diário em streaming."""
+        states = self.states() if states is None else states
+        skip = FINISHED if retry_failed else FINISHED + (FAILED,)
+        for rec in _iter_lines(self.path):
+            if rec.get("ev") == "item" and states.get(rec["i"]) not in skip:
+                yield rec["i"], rec["q"]
+
+    def counts(self, states=None):
+        states = self.states() if states is None else states
+        c = {PENDING: 0, RESOLVED: 0, DOWNLOADED: 0, DONE: 0, FAILED: 0, SKIPPED: 0}
+        n = 0
+        for rec in _iter_lines(self.path):
+            if rec.get("ev") == "item":
+                n += 1; c[states.get(rec["i"], PENDING)] += 1
+        self.total = n
+        return c
+
+    def is_finished(self):
+        last = None
+        for rec in _iter_lines(self.path):
+            last = rec
+        return bool(last) and last.get("ev") == "end"
+
+def latest_unfinished(mode=None, directory=None):
+    """Diário mais recente (do modo informado) que não chegou ao fim, ou None. Execuções concluídas
+    com falhas não recebem o fim (ver DownloadWorker), então também aparecem aqui para repetição."""
+    d = directory or jobs_dir()
+    for name in sorted(os.listdir(d), key=lambda n: n[:-6], reverse=True):
+        if not name.endswith(".jsonl"):
+            continue
+        path = os.path.join(d, name)
+        head = next(_iter_lines(path), None) or {}
+        if head.get("ev") != "job" or (mode and head.get("mode") != mode):
+            continue
+        j = JobJournal(path)
+        if not j.is_finished():
+            return j
+        j.close()
+    return None
@@ -1,39 +1,225 @@
 # -*- coding: utf-8 -*-
-import os
+import os, re, threading, queue, time, atexit
+from collections import deque
 from datetime import datetime
-import tkinter as tk
+
+LOG_MAX_BYTES = 10 * 1024 * 1024   # rotação do arquivo de sessão
+LOG_BACKUPS = 5                    # session_x.log.1 … .5
+FLUSH_LINES = 256                  # grava em lote a cada N linhas…
+FLUSH_SECONDS = 1.0                # …ou a cada N segundos
+
+_FLUSH = object(); _CLOSE = object()
+
+class AsyncFileWriter(threading.Thread):
+    """Escritor em segundo plano: mantém o arquivo aberto, grava em lotes (por tamanho ou tempo)
+    e rotaciona por tamanho. As threads chamadoras só enfileiram a linha."""
+    def __init__(self, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS,
+                 flush_lines=FLUSH_LINES, flush_s=FLUSH_SECONDS):
+        super().__init__(daemon=True, name="log-writer")
+        self.path = path; self.max_bytes = max_bytes; self.backups = backups
+        self.flush_lines = flush_lines; self.flush_s = flush_s
+        self.q = queue.SimpleQueue(); self.closed = False; self._f = None; self._size = 0
+        self._done = threading.Event()
+
+    def write(self, line):
+        self.q.put(line)
+
+    def flush(self):
+        self.q.put(_FLUSH)
+
+    def close(self, timeout=5.0):
+        if not self.closed:
+            self.closed = True; self.q.put(_CLOSE); self._done.wait(timeout)
+
+    def _open(self):
+        self._f = open(self.path, "a", encoding="utf-8")
+        try: self._size = os.path.getsize(self.path)
+        except OSError: self._size = 0
+
+    def _rotate(self):
+        self._f.close()
+        for k in range(self.backups - 1, 0, -1):
+            src = "%s.%d" % (self.path, k)
+            if os.path.exists(src): os.replace(src, "%s.%d" % (self.path, k + 1))
+        os.replace(self.path, self.path + ".1")
+        self._open()
+
+    def _write_batch(self, batch):
+        data = "\n".join(batch) + "\n"
+        self._f.write(data); self._f.flush()
+        self._size += len(data.encode("utf-8", "ignore"))
+        if self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+
+    def _drain_direct(self):
+        """Sem o arquivo aberto: tenta gravar direto o que já estava na fila (melhor esforço)."""
+        lines = []
+        while True:
+            try: item = self.q.get_nowait()
+            except queue.Empty: break
+            if isinstance(item, str): lines.append(item)
+        if lines:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f: f.write("\n".join(lines) + "\n")
+            except Exception:
+                pass
+
+    def run(self):
+        batch = []; last = time.monotonic()
+        try:
+            self._open()
+        except Exception:
+            # closed antes de sair: o Logger passa a gravar direto e a fila não cresce sem consumidor
+            self.closed = True; self._drain_direct(); self._done.set()
+            return
+        try:
+            while True:
+                try:
+                    item = self.q.get(timeout=self.flush_s)
+                except queue.Empty:
+                    item = None
+                if isinstance(item, str):
+                    batch.append(item)
+                if batch and (item is _FLUSH or item is _CLOSE or item is None or len(batch) >= self.flush_lines
+                              or time.monotonic() - last >= self.flush_s):
+                    try: self._write_batch(batch)
+                    except Exception: pass
+                    batch = []; last = time.monotonic()
+                if item is _CLOSE:
+                    break
+        except Exception:
+            pass
+        finally:
+            try:
+                if self._f: self._f.close()
+            except Exception:
+                pass
+            self.closed = True; self._done.set()
+
+LOG_VIEW_LINES = 5000     # linhas mantidas no painel de log (o histórico completo fica no arquivo)
+LOG_VIEW_MS = 200         # intervalo de atualização do painel
 
 class TextHandler:
-    def __init__(self, textbox: tk.Text):
-        self.textbox = textbox
+    """Visão em anel do log para o tk.Text: guarda só as últimas LOG_VIEW_LINES linhas,
+    recebe linhas de qualquer thread numa fila e as insere em lote pelo loop do Tk,
+    com filtro por nível e por texto."""
+    def __init__(self, textbox: "tk.Text", max_lines=LOG_VIEW_LINES):
+        self.textbox = textbox; self.max_lines = max_lines
+        self.ring = deque(maxlen=max_lines)   # (nível, linha)
+        self._pending = deque(maxlen=max_lines)  # o que exceder nem chegaria a ser exibido
+        self.levels = None                    # None = todos
+        self.search = ""
+        self._scheduled = False
+        try:
+            textbox.tag_configure("match", background="#fff2a8")
+            textbox.tag_configure("ERRO", foreground="#b00020")
+            textbox.tag_configure("WARN", foreground="#a15c00")
+            textbox.tag_configure("DEBUG", foreground="#808080")
+        except Exception:
+            pass
+        self._schedule()
+
+    @classmethod
+    def for_widget(cls, textbox):
+        """Um único handler por widget (sessões recriadas reaproveitam a mesma visão)."""
+        h = getattr(textbox, "_ring_handler", None)
+        if h is None:
+            h = cls(textbox); textbox._ring_handler = h
+        return h
+
+    def write(self, line: str, level: str = "INFO"):
+        self._pending.append((level, line.rstrip()))
+
+    def _schedule(self):
+        try:
+            self.textbox.after(LOG_VIEW_MS, self._drain)
+        except Exception:
+            pass
+
+    def _visible(self, level, line):
+        return (self.levels is None or level in self.levels) and (not self.search or self.search in line.lower())
 
-    def write(self, line: str):
+    def _drain(self):
         try:
-            if not self.textbox or not self.textbox.winfo_exists():
+            if not self.textbox.winfo_exists():
                 return
-            self.textbox.configure(state="normal")
-            self.textbox.insert("end", line.rstrip() + "\n")
-            self.textbox.see("end")
-            self.textbox.configure(state="disabled")
+            batch = []
+            while self._pending:
+                item = self._pending.popleft()
+                self.ring.append(item); batch.append(item)
+            batch = [it for it in batch[-self.max_lines:] if self._visible(*it)]
+            if batch:
+                self._insert(batch)
         except Exception:
             pass
+        self._schedule()
+
+    def _insert(self, batch):
+        tb = self.textbox
+        at_end = tb.yview()[1] >= 0.999
+        tb.configure(state="normal")
+        for level, line in batch:
+            start = tb.index("end-1c")
+            tb.insert("end", line + "\n", (level,) if level in ("ERRO", "WARN", "DEBUG") else ())
+            if self.search:
+                self._highlight(start)
+        excess = int(tb.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            tb.delete("1.0", "%d.0" % (excess + 1))
+        tb.configure(state="disabled")
+        if at_end:
+            tb.see("end")
+
+    def _highlight(self, start):
+        tb = self.textbox; pos = start
+        while True:
+            pos = tb.search(self.search, pos, stopindex="end", nocase=True)
+            if not pos:
+                break
+            end = "%s+%dc" % (pos, len(self.search))
+            tb.tag_add("match", pos, end); pos = end
+
+    def set_filter(self, levels=None, search=None):
+        """Reaplica filtro de nível (conjunto, ou None para todos) e busca (texto) sobre o anel."""
+        self.levels = set(levels) if levels is not None else None
+        if search is not None:
+            self.search = search.strip().lower()
+        tb = self.textbox
+        tb.configure(state="normal"); tb.delete("1.0", "end"); tb.configure(state="disabled")
+        self._insert([it for it in self.ring if self._visible(*it)])
+
+    def clear(self):
+        self.ring.clear(); self._pending.clear()
+        self.set_filter(self.levels)
 
 class Logger:
-    def __init__(self, log_path: str, textbox: tk.Text = None, name: str = "app"):
+    def __init__(self, log_path: str, textbox: "tk.Text" = None, name: str = "app"):
         self.name = name
         self.log_path = log_path
-        self.text_handler = TextHandler(textbox) if textbox else None
+        self.debug_enabled = False  # DEBUG só é gravado quando habilitado
+        self.text_handler = TextHandler.for_widget(textbox) if textbox else None
+        self._writer = AsyncFileWriter(log_path); self._writer.start()
+        atexit.register(self.close)
 
     def _emit(self, level: str, msg: str):
         ts = datetime.now().strftime("%H:%M:%S")
         line = f"{ts} | {level:>6} | {msg}"
-        try:
-            with open(self.log_path, "a", encoding="utf-8") as f:
-                f.write(line + "\n")
-        except Exception:
-            pass
+        if not self._writer.closed:
+            self._writer.write(line)
+            if level == "ERRO": self._writer.flush()
+        else:
+            # Logger já fechado (sessão reiniciada): grava direto, como antes
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except Exception:
+                pass
         if self.text_handler:
-            self.text_handler.write(line)
+            self.text_handler.write(line, level)
+
+    def debug(self, msg, *args):
+        if self.debug_enabled:
+            self._emit("DEBUG", (msg % args) if args else str(msg))
 
     def info(self, msg, *args):
         self._emit("INFO", (msg % args) if args else str(msg))
@@ -47,29 +233,84 @@ class Logger:
     def exception(self, msg, *args):
         self._emit("ERRO", (msg % args) if args else str(msg))
 
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        """Grava o que estiver na fila e fecha o arquivo."""
+        self._writer.close()
+        atexit.unregister(self.close)
+
+# Categorias de mensagens do yt-dlp; as amostradas mantêm a primeira linha e depois no
+# máximo uma a cada SAMPLE_SECONDS, informando quantas foram suprimidas.
+YTDLP_ROUTES = [
+    ("debug", re.compile(r"^\[debug\] "), "DEBUG", False),
+    ("progresso", re.compile(r"^\[download\]\s+\d+(?:\.\d+)?%|^\[download\]\s+.*\bETA\b"), "INFO", True),
+    ("fragmentos", re.compile(r"fragment|Retrying \(|Got error|^\[(?:hlsnative|dashsegments)\]", re.I), None, True),
+]
+SAMPLE_SECONDS = 10.0
+
+def _to_str(msg):
+    try:
+        return msg.decode("utf-8","ignore") if isinstance(msg, (bytes,bytearray)) else str(msg)
+    except Exception:
+        return str(msg)
+
 class YTDLPLogger:
-    def __init__(self, logger: Logger):
-        self.l = logger
+    """Encaminha as mensagens do yt-dlp ao Logger no nível adequado, com amostragem das
+    linhas repetitivas (progresso, fragmentos). `routes` segue o formato de YTDLP_ROUTES:
+    (categoria, regex, nível ou None para manter o do yt-dlp, amostrar?)."""
+    def __init__(self, logger: Logger, routes=None, sample_s=SAMPLE_SECONDS):
+        self.l = logger; self.routes = YTDLP_ROUTES if routes is None else routes; self.sample_s = sample_s
+        self._lock = threading.Lock(); self._seen = {}   # categoria → [último envio, suprimidas desde então, total suprimidas]
+
+    def _route(self, level, s):
+        s = s.rstrip()
+        if not s:
+            return
+        for cat, rx, lv, sample in self.routes:
+            if rx.search(s):
+                level = lv or level
+                if sample and level != "ERRO":  # erros nunca são suprimidos
+                    s = self._sample(cat, s)
+                break
+        if s is None:
+            return
+        if level == "DEBUG": self.l.debug("[yt-dlp] %s", s)
+        elif level == "WARN": self.l.warning("[yt-dlp] %s", s)
+        elif level == "ERRO": self.l.error("[yt-dlp] %s", s)
+        else: self.l.info("[yt-dlp] %s", s)
+
+    def _sample(self, cat, s):
+        now = time.monotonic()
+        with self._lock:
+            st = self._seen.setdefault(cat, [None, 0, 0])
+            if st[0] is not None and now - st[0] < self.sample_s:
+                st[1] += 1; st[2] += 1
+                return None
+            n = st[1]; st[0] = now; st[1] = 0
+        return s + (" (+%d linhas de %s suprimidas)" % (n, cat) if n else "")
+
+    def suppressed(self):
+        with self._lock:
+            return {cat: st[2] for cat, st in self._seen.items() if st[2]}
+
+    def summary(self):
+        sup = self.suppressed()
+        if sup:
+            self.l.info("[yt-dlp] linhas suprimidas por amostragem: %s", ", ".join("%s=%d" % kv for kv in sorted(sup.items())))
+
     def debug(self, msg):
-        try:
-            s = msg.decode("utf-8","ignore") if isinstance(msg, (bytes,bytearray)) else str(msg)
-        except Exception:
-            s = str(msg)
-        self.l.info("[yt-dlp] %s", s)
+        # O yt-dlp também entrega mensagens informativas por debug() (sem o prefixo "[debug] ")
+        self._route("INFO", _to_str(msg))
+    def info(self, msg):
+        self._route("INFO", _to_str(msg))
     def warning(self, msg):
-        try:
-            s = msg.decode("utf-8","ignore") if isinstance(msg, (bytes,bytearray)) else str(msg)
-        except Exception:
-            s = str(msg)
-        self.l.warning("[yt-dlp] %s", s)
+        self._route("WARN", _to_str(msg))
     def error(self, msg):
-        try:
-            s = msg.decode("utf-8","ignore") if isinstance(msg, (bytes,bytearray)) else str(msg)
-        except Exception:
-            s = str(msg)
-        self.l.error("[yt-dlp] %s", s)
+        self._route("ERRO", _to_str(msg))
 
-def setup_logger(log_dir: str, textbox: tk.Text, name: str = "app"):
+def setup_logger(log_dir: str, textbox: "tk.Text", name: str = "app"):
     os.makedirs(log_dir, exist_ok=True)
     ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     log_path = os.path.join(log_dir, f"session_{ts}.log")
@@ -1,44 +1,329 @@
 # -*- coding: utf-8 -*-
+"""
+Cliente MusicBrainz: uma Session com pool keep-alive (sem novo handshake TLS por consulta) e um
+agendador que espaça o início das requisições no limite publicado (1 req/s por IP), deixando
+até MB_WORKERS em voo ao mesmo tempo para sobrepor a latência. 503/429 respeitam Retry-After
+(e atrasam toda a fila); falhas de rede e 5xx são repetidas com backoff exponencial e jitter.
+As respostas passam pelo cache em disco de mb_cache.py (TTL, revalidação condicional); com o
+índice offline de mb_local.py importado, as consultas são respondidas dele antes da rede.
+"""
+import re, time, queue, random, threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
 import requests
+from requests.adapters import HTTPAdapter
+from .ratelimit import get_rate_limiter
+from .mb_cache import get_mb_cache, key_for
+from .canonical import normalize_query
+from .mb_local import get_local_index
 
 MB_BASE = "https://musicbrainz.org/ws/2"
 MB_HEADERS = {"User-Agent": "YT-DLP-DownGUI/1.5 (contact: sfbarboza82@hotmail.com)"}
 MB_TIMEOUT = 15
+MB_RATE = 1.0          # requisições/s (limite publicado do MusicBrainz por IP)
+MB_WORKERS = 4         # requisições simultâneas em voo (início ainda espaçado por MB_RATE)
+MB_RETRIES = 4
+MB_BACKOFF_S = 1.0     # base do backoff exponencial (com jitter) para rede/5xx
+MB_RETRY_AFTER_MAX_S = 60.0
+_RETRY_STATUS = (429, 500, 502, 503, 504)
+MB_PAGE_MAX = 100      # maior `limit` aceito pela busca do MusicBrainz; além disso, páginas por `offset`
+_DONE = object()
+# Versões que só entram se a música não tiver gravação "limpa" (título/desambiguação)
+_VARIANT = re.compile(r"\b(live|ao vivo|en vivo|demo|remix|mix|edit|version|vers[aã]o|acoustic|ac[uú]stic[oa]|instrumental|"
+                      r"karaoke|remaster(ed)?|mono|session|rehearsal|take|bootleg|unplugged|reprise)\b", re.I)
+_TITLE_EXTRA = re.compile(r"\s*[\(\[][^\)\]]*[\)\]]|\s+-\s+.*$")   # "(Live)", "[Demo]", " - 2011 Remaster"
+
+class _Pacer:
+    """Reserva o próximo horário de início livre (intervalo 1/rate); `hold` adia todos os horários."""
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock(); self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic(); slot = max(now, self._next); self._next = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+        return slot - now
+
+    def hold(self, seconds):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+def _retry_after(r):
+    """Segundos pedidos no Retry-After (número ou data HTTP), ou None."""
+    v = (r.headers.get("Retry-After") or "").strip()
+    if not v:
+        return None
+    try:
+        return max(0.0, float(v))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(v).timestamp() - time.time())
+    except Exception:
+        return None
+
+class MBClient:
+    def __init__(self, rate=MB_RATE, workers=MB_WORKERS):
+        self.session = requests.Session(); self.session.headers.update(MB_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount("https://", adapter); self.session.mount("http://", adapter)
+        self.pacer = _Pacer(rate); self.workers = workers
+        self._lock = threading.Lock(); self.requests = 0; self.retries = 0; self.waited_s = 0.0
+        self._refreshing = set()
+        try:
+            self.cache = get_mb_cache()
+        except Exception:
+            self.cache = None  # sem cache em disco (pasta de dados/SQLite indisponível): só rede
+
+    def _count(self, retried=False, waited=0.0):
+        with self._lock:
+            self.requests += 1; self.retries += int(retried); self.waited_s += waited
+
+    def _request(self, path, params, headers=None):
+        """GET em MB_BASE/path no ritmo do agendador, contabilizado no limitador global; a resposta
+        (2xx ou 304) já conferida com raise_for_status."""
+        lim = get_rate_limiter(); attempt = 0
+        while True:
+            waited = self.pacer.wait() + lim.acquire_request()
+            self._count(attempt > 0, waited)
+            try:
+                r = self.session.get(f"{MB_BASE}/{path}", params=params, headers=headers, timeout=MB_TIMEOUT)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= MB_RETRIES: raise
+                delay = None
+            else:
+                lim.acquire_bytes(len(r.content))
+                if r.status_code not in _RETRY_STATUS or attempt >= MB_RETRIES:
+                    r.raise_for_status()
+                    return r
+                delay = _retry_after(r)
+            if delay is not None:
+                delay = min(delay, MB_RETRY_AFTER_MAX_S) + random.uniform(0, 0.5)
+                self.pacer.hold(delay)  # o servidor pediu pausa: vale para todas as consultas na fila
+            else:
+                delay = random.uniform(0.5, 1.5) * MB_BACKOFF_S * (2 ** attempt)
+            attempt += 1
+            time.sleep(delay)
+
+    def _fetch(self, key, path, params, entry=None, revalidation=False):
+        r = self._request(path, params, self.cache.validators(entry) if self.cache is not None else None)
+        if r.status_code == 304 and entry is not None:
+            self.cache.renew(key, entry, revalidation)
+            return entry["data"]
+        data = r.json()
+        if self.cache is not None:
+            self.cache.store(key, data, r, revalidation)
+        return data
+
+    def _revalidate(self, key, path, params, entry):
+        with self._lock:
+            if key in self._refreshing: return
+            self._refreshing.add(key)
+        def _run():
+            try:
+                self._fetch(key, path, params, entry, revalidation=True)
+            except Exception:
+                pass  # segue valendo a entrada vencida; a próxima consulta tenta de novo
+            finally:
+                with self._lock: self._refreshing.discard(key)
+        threading.Thread(target=_run, name="mb-revalidate", daemon=True).start()
+
+    def get(self, path, params):
+        """JSON de MB_BASE/path: do cache se válido (ou vencido com stale_ok, revalidando em
+        segundo plano), senão da rede (condicional quando há entrada vencida)."""
+        if self.cache is None:
+            return self._request(path, params).json()
+        key = key_for(path, params)
+        entry, state = self.cache.lookup(key)
+        if state == "fresh":
+            return entry["data"]
+        if state == "stale":
+            self._revalidate(key, path, params, entry)
+            return entry["data"]
+        return self._fetch(key, path, params, entry)
+
+    def stream(self, pages_fn, items, stop_event=None):
+        """Gera (item, página) das páginas de pages_fn(item) para todos os itens, com até `workers`
+        em paralelo, na ordem em que chegam; erros vêm como (item, exceção). Parar (stop_event ou
+        fechar o gerador) descarta os itens ainda não iniciados."""
+        items = list(items); closed = threading.Event(); q = queue.Queue()
+        stopped = lambda: closed.is_set() or (stop_event is not None and stop_event.is_set())
+        def _run(item):
+            try:
+                for page in pages_fn(item):
+                    if stopped(): break
+                    q.put((item, page))
+            except Exception as e:
+                q.put((item, e))
+            finally:
+                q.put((item, _DONE))
+        ex = ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(items))), thread_name_prefix="mb")
+        try:
+            for item in items: ex.submit(_run, item)
+            pending = len(items)
+            while pending and not stopped():
+                try:
+                    item, page = q.get(timeout=0.25)
+                except queue.Empty:
+                    continue
+                if page is _DONE: pending -= 1
+                else: yield item, page
+        finally:
+            closed.set()
+            ex.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            s = {"requests": self.requests, "retries": self.retries, "waited_s": round(self.waited_s, 1)}
+        if self.cache is not None:
+            c = self.cache.stats(); s["cache_hits"] = c["hits"] + c["stale_hits"]
+        return s
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_mb_client():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MBClient()
+        return _shared
+
+def configure_cache(ttl_h, stale_ok=True):
+    """Liga/ajusta o cache em disco do cliente compartilhado (ttl_h <= 0 desliga)."""
+    client = get_mb_client()
+    try:
+        client.cache = get_mb_cache(ttl_h, stale_ok) if ttl_h and ttl_h > 0 else None
+    except Exception:
+        client.cache = None
+    return client.cache
+
+def _mb_get(path, params):
+    """Índice local (mb_local, se importado) primeiro; sem resultado local, o cliente de rede."""
+    local = get_local_index()
+    if local is not None:
+        try:
+            data = local.get(path, params)
+        except Exception:
+            data = None  # índice corrompido/em importação: segue pela rede
+        if data is not None:
+            return data
+    return get_mb_client().get(path, params)
+
+def iter_search(entity, query, limit, stop_event=None):
+    """Páginas (listas de resultados brutos) da busca `entity` (artist, recording...) até `limit`
+    resultados, paginando por offset de MB_PAGE_MAX em MB_PAGE_MAX; para no fim dos resultados
+    ou quando stop_event é acionado."""
+    offset = 0; key = entity + "s"
+    while offset < limit and not (stop_event is not None and stop_event.is_set()):
+        n = min(MB_PAGE_MAX, limit - offset)
+        data = _mb_get(entity, {"query": query, "fmt": "json", "limit": n, "offset": offset})
+        page = data.get(key) or []
+        if page: yield page
+        offset += len(page)
+        if len(page) < n or offset >= int(data.get("count") or 0):
+            break
+
+def iter_artists_by_genre(genre: str, limit: int = 10, stop_event=None, with_ids=False):
+    """Páginas de nomes de artistas (ou (nome, MBID) com with_ids)."""
+    for page in iter_search("artist", f'tag:"{genre}"', limit, stop_event):
+        yield [(a["name"], a.get("id")) if with_ids else a["name"] for a in page if "name" in a]
+
+def mb_resolve_artist(name: str):
+    """(MBID, nome) do artista cujo nome (ou alias) coincide com `name` ignorando caixa, acentos e
+    pontuação — o de maior pontuação na busca —, ou None."""
+    want = normalize_query(name)
+    data = _mb_get("artist", {"query": f'artist:"{name}"', "fmt": "json", "limit": 5})
+    for a in data.get("artists") or []:
+        names = [a.get("name")] + [al.get("name") for al in a.get("aliases") or []]
+        if a.get("id") and any(normalize_query(n) == want for n in names if n):
+            return a["id"], a["name"]
+    return None
+
+def song_title(title):
+    """Título sem complementos de versão ("(Live)", "[Demo]", " - 2011 Remaster")."""
+    return _TITLE_EXTRA.sub("", title or "").strip() or (title or "").strip()
+
+def _recording_keys(rec):
+    """Chaves que identificam a música de uma gravação: título normalizado e obras (work-rels)."""
+    keys = {"t:" + normalize_query(song_title(rec.get("title")))}
+    for rel in rec.get("relations") or []:
+        if rel.get("type") == "performance" and isinstance(rel.get("work"), dict) and rel["work"].get("id"):
+            keys.add("w:" + rel["work"]["id"])
+    return keys
+
+def _is_variant(rec):
+    title = rec.get("title") or ""
+    return bool(rec.get("video") or _VARIANT.search(rec.get("disambiguation") or "") or _VARIANT.search(" ".join(_TITLE_EXTRA.findall(title))))
+
+def iter_artist_recordings(artist: str, limit: int = 10, stop_event=None, mbid=None):
+    """Páginas de pares (artista, música) distintos: resolve o MBID (se não vier) e percorre
+    /recording?artist=<MBID>&inc=work-rels, juntando gravações da mesma música (título normalizado
+    ou mesma obra). Gravações de estúdio saem na hora; ao vivo/demo/remix/remaster/vídeo só no fim,
+    se a música não apareceu em versão limpa (a mais antiga pela data de lançamento). Sem MBID
+    (nome não encontrado), cai na busca textual de iter_recordings_by_artist."""
+    if mbid is None:
+        hit = mb_resolve_artist(artist)
+        if hit is None:
+            yield from iter_recordings_by_artist(artist, limit, stop_event); return
+        mbid = hit[0]
+    seen = set(); held = []; emitted = 0; offset = 0; complete = False
+    while emitted < limit and not (stop_event is not None and stop_event.is_set()):
+        data = _mb_get("recording", {"artist": mbid, "inc": "work-rels", "fmt": "json", "limit": MB_PAGE_MAX, "offset": offset})
+        page = data.get("recordings") or []; offset += len(page); out = []
+        for rec in page:
+            if not rec.get("title"): continue
+            keys = _recording_keys(rec)
+            if keys & seen:
+                seen |= keys; continue
+            if _is_variant(rec):
+                held.append((rec.get("first-release-date") or "9999", keys, rec)); continue
+            seen |= keys; out.append((artist, song_title(rec["title"]))); emitted += 1
+            if emitted >= limit: break
+        if out: yield out
+        if len(page) < MB_PAGE_MAX or offset >= int(data.get("count") or 0):
+            complete = True; break
+    if not complete or emitted >= limit:
+        return
+    out = []
+    for _, keys, rec in sorted(held, key=lambda h: h[0]):
+        if emitted >= limit: break
+        if keys & seen: continue
+        seen |= keys; out.append((artist, song_title(rec["title"]))); emitted += 1
+    if out: yield out
+
+def iter_recordings_by_artist(artist: str, limit: int = 10, stop_event=None):
+    for page in iter_search("recording", f'artist:"{artist}"', limit, stop_event):
+        yield [(artist, rec["title"]) for rec in page if rec.get("title")]
+
+def iter_recordings_by_title(title: str, limit: int = 10, stop_event=None):
+    for page in iter_search("recording", f'recording:"{title}"', limit, stop_event):
+        out = []
+        for rec in page:
+            artist_credit = rec.get("artist-credit", [])
+            artist_name = None
+            if artist_credit and isinstance(artist_credit, list):
+                ac0 = artist_credit[0]
+                if isinstance(ac0, dict):
+                    artist_name = ac0.get("name") or artist_name
+            out.append((artist_name or "Desconhecido", rec.get("title")))
+        yield out
+
+def iter_recordings_by_artists(artists, limit: int = 10, stop_event=None):
+    """(artista, página de pares) das músicas distintas (iter_artist_recordings) de vários artistas —
+    nomes ou (nome, MBID) —, em paralelo no ritmo do agendador e na ordem de chegada; página é a
+    exceção quando a busca daquele artista falha."""
+    def _pages(a):
+        name, mbid = a if isinstance(a, tuple) else (a, None)
+        return iter_artist_recordings(name, limit, stop_event, mbid)
+    return get_mb_client().stream(_pages, artists, stop_event)
 
 def mb_search_artists_by_genre(genre: str, limit: int = 10):
-    q = f'tag:"{genre}"'
-    params = {"query": q, "fmt": "json", "limit": limit}
-    r = requests.get(f"{MB_BASE}/artist", params=params, headers=MB_HEADERS, timeout=MB_TIMEOUT)
-    r.raise_for_status()
-    data = r.json()
-    return [a["name"] for a in data.get("artists", []) if "name" in a]
+    return [a for page in iter_artists_by_genre(genre, limit) for a in page]
 
 def mb_search_recordings_by_artist(artist: str, limit: int = 10):
-    q = f'artist:"{artist}"'
-    params = {"query": q, "fmt": "json", "limit": limit}
-    r = requests.get(f"{MB_BASE}/recording", params=params, headers=MB_HEADERS, timeout=MB_TIMEOUT)
-    r.raise_for_status()
-    data = r.json()
-    out = []
-    for rec in data.get("recordings", []):
-        title = rec.get("title")
-        if title: out.append((artist, title))
-    return out
+    return [p for page in iter_artist_recordings(artist, limit) for p in page]
 
 def mb_search_recordings_by_title(title: str, limit: int = 10):
-    q = f'recording:"{title}"'
-    params = {"query": q, "fmt": "json", "limit": limit}
-    r = requests.get(f"{MB_BASE}/recording", params=params, headers=MB_HEADERS, timeout=MB_TIMEOUT)
-    r.raise_for_status()
-    data = r.json()
-    out = []
-    for rec in data.get("recordings", []):
-        t = rec.get("title")
-        artist_credit = rec.get("artist-credit", [])
-        artist_name = None
-        if artist_credit and isinstance(artist_credit, list):
-            ac0 = artist_credit[0]
-            if isinstance(ac0, dict):
-                artist_name = ac0.get("name") or artist_name
-        out.append((artist_name or "Desconhecido", t))
-    return out
+    return [p for page in iter_recordings_by_title(title, limit) for p in page]
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistente das respostas do MusicBrainz, por endpoint + parâmetros (consulta, limite...).
+Dentro do TTL a resposta sai do disco sem rede. Vencida (até STALE_MAX_H), pode ser devolvida na
+hora enquanto o cliente revalida em segundo plano (stale-while-revalidate), com If-None-Match /
+If-Modified-Since quando o servidor informou ETag / Last-Modified (304 só renova a validade).
+"""
+import os, threading
+from urllib.parse import urlencode
+from .disk_cache import DiskCache
+from .constants import MB_CACHE_TTL_H, MB_CACHE_STALE_OK
+from .util import app_data_dir
+
+DEFAULT_MAX_MB = 64
+STALE_MAX_H = 30 * 24   # além disso a entrada vencida não é mais mostrada (vira consulta normal)
+
+def key_for(path, params):
+    return path + "?" + urlencode(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+
+class MBCache:
+    def __init__(self, path=None, ttl_h=MB_CACHE_TTL_H, max_mb=DEFAULT_MAX_MB, stale_ok=MB_CACHE_STALE_OK):
+        path = path or os.path.join(app_data_dir(), "mb_cache.sqlite3")
+        self.cache = DiskCache(path, ttl=float(ttl_h) * 3600, max_bytes=int(max_mb) * 1024 * 1024,
+                               grace=STALE_MAX_H * 3600)
+        self.stale_ok = bool(stale_ok)
+        self._lock = threading.Lock()
+        self.hits = 0; self.stale_hits = 0; self.misses = 0; self.hit_bytes = 0
+        self.revalidated = 0; self.not_modified = 0
+
+    @property
+    def ttl_h(self):
+        return self.cache.ttl / 3600.0
+
+    @ttl_h.setter
+    def ttl_h(self, v):
+        self.cache.ttl = float(v) * 3600
+
+    def lookup(self, key):
+        """(entrada, estado): estado "fresh" (dentro do TTL), "stale" (vencida, pode ser mostrada
+        e revalidada) ou "miss"; em "miss" a entrada vencida ainda vem para a consulta condicional."""
+        entry, age = self.cache.get_entry(key)
+        with self._lock:
+            if entry is None or not isinstance(entry, dict) or "data" not in entry:
+                self.misses += 1
+                return None, "miss"
+            if age <= self.cache.ttl:
+                self.hits += 1; self.hit_bytes += entry.get("size", 0)
+                return entry, "fresh"
+            if self.stale_ok and age <= STALE_MAX_H * 3600:
+                self.stale_hits += 1; self.hit_bytes += entry.get("size", 0)
+                return entry, "stale"
+            self.misses += 1
+            return entry, "miss"
+
+    @staticmethod
+    def validators(entry):
+        """Cabeçalhos da consulta condicional para a entrada (vazio sem ETag/Last-Modified)."""
+        h = {}
+        if entry and entry.get("etag"): h["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"): h["If-Modified-Since"] = entry["last_modified"]
+        return h
+
+    def store(self, key, data, response=None, revalidation=False):
+        entry = {"data": data, "size": len(response.content) if response is not None else 0}
+        if response is not None:
+            entry["etag"] = response.headers.get("ETag"); entry["last_modified"] = response.headers.get("Last-Modified")
+        self.cache.set(key, entry)
+        if revalidation:
+            with self._lock: self.revalidated += 1
+        return entry
+
+    def renew(self, key, entry, revalidation=False):
+        """304 Not Modified: a mesma entrada volta a valer por um TTL inteiro."""
+        self.cache.set(key, entry)
+        with self._lock:
+            self.not_modified += 1; self.revalidated += int(revalidation)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        s = self.cache.stats()
+        with self._lock:
+            s.update(hits=self.hits, stale_hits=self.stale_hits, misses=self.misses, hit_bytes=self.hit_bytes,
+                     revalidated=self.revalidated, not_modified=self.not_modified)
+        s["ttl_h"] = self.ttl_h; s["stale_ok"] = self.stale_ok
+        return s
+
+    def summary(self):
+        s = self.stats(); n = s["hits"] + s["stale_hits"] + s["misses"]
+        return ("%d entradas, %.1f MB em disco | %d acertos (%d vencidos revalidados em segundo plano), %d consultas à rede"
+                " (%.0f%% do cache) | %.1f MB servidos do cache | %d revalidações (%d sem mudança) | TTL %.0f h") % (
+            s["entries"], s["bytes"] / 1048576.0, s["hits"] + s["stale_hits"], s["stale_hits"], s["misses"],
+            100.0 * (s["hits"] + s["stale_hits"]) / n if n else 0.0, s["hit_bytes"] / 1048576.0,
+            s["revalidated"], s["not_modified"], s["ttl_h"])
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_mb_cache(ttl_h=None, stale_ok=None):
+    """Instância compartilhada; `ttl_h` / `stale_ok` (se informados) ajustam a configuração."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = MBCache(ttl_h=MB_CACHE_TTL_H if ttl_h is None else ttl_h)
+        elif ttl_h is not None:
+            _shared.ttl_h = ttl_h
+        if stale_ok is not None:
+            _shared.stale_ok = bool(stale_ok)
+        return _shared
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Índice local (offline) do MusicBrainz em SQLite FTS5, montado a partir dos dumps JSON
+(https://data.metabrainz.org/pub/musicbrainz/data/json-dumps/: um objeto por linha, no mesmo
+formato da API) ou de um recorte deles: artistas (nome, aliases, tags) e gravações (título,
+créditos, obras). Quando o índice existe, mb_api responde dele antes de ir à rede — as mesmas
+consultas (tag:"…", artist:"…", recording:"…" e /recording?artist=<MBID>) em milissegundos.
+Consultas sem nenhum resultado local seguem para o musicbrainz.org.
+
+    python -m app.mb_local import mbdump/artist mbdump/recording      (ou artist.tar.xz, .jsonl, .gz, .bz2, .xz)
+    python -m app.mb_local stats | search artist|tag|recording "<texto>" | clear
+"""
+import os, re, sys, bz2, gzip, json, lzma, time, sqlite3, tarfile, threading, argparse
+from .util import app_data_dir
+
+DB_NAME = "mb_local.sqlite3"
+BATCH = 5000
+_TOKENIZE = "unicode61 remove_diacritics 2"
+_QUERY = re.compile(r'^\s*(tag|artist|recording):"(.*)"\s*$', re.S)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS artists (id INTEGER PRIMARY KEY, mbid TEXT NOT NULL UNIQUE, name TEXT NOT NULL,"
+    " sort_name TEXT, aliases TEXT NOT NULL DEFAULT '')",
+    "CREATE TABLE IF NOT EXISTS artist_tags (artist INTEGER NOT NULL, tag TEXT NOT NULL, count INTEGER NOT NULL,"
+    " PRIMARY KEY (tag, artist)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS recordings (id INTEGER PRIMARY KEY, mbid TEXT NOT NULL UNIQUE, title TEXT NOT NULL,"
+    " artist TEXT NOT NULL, disambiguation TEXT, first_release TEXT, video INTEGER NOT NULL DEFAULT 0, works TEXT NOT NULL DEFAULT '')",
+    "CREATE TABLE IF NOT EXISTS recording_artists (artist_mbid TEXT NOT NULL, recording INTEGER NOT NULL,"
+    " PRIMARY KEY (artist_mbid, recording)) WITHOUT ROWID",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS artist_fts USING fts5(name, aliases, content='artists', content_rowid='id', tokenize='%s')" % _TOKENIZE,
+    "CREATE VIRTUAL TABLE IF NOT EXISTS recording_fts USING fts5(title, artist, content='recordings', content_rowid='id', tokenize='%s')" % _TOKENIZE,
+)
+
+def default_path():
+    return os.path.join(app_data_dir(), DB_NAME)
+
+def _phrase(text, columns):
+    """Consulta FTS5: a frase inteira (como o "…" da busca Lucene) restrita às colunas."""
+    return "{%s} : \"%s\"" % (" ".join(columns), (text or "").replace('"', '""'))
+
+def _credit_name(credits):
+    return "".join((c.get("name") or (c.get("artist") or {}).get("name") or "") + (c.get("joinphrase") or "")
+                   for c in credits or [] if isinstance(c, dict)).strip()
+
+class LocalMB:
+    def __init__(self, path=None):
+        self.path = path or default_path()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        for sql in _SCHEMA: self._db.execute(sql)
+
+    # --- importação -------------------------------------------------------------------------
+    def _add_artists(self, rows):
+        for a in rows:
+            aliases = " | ".join(al.get("name") for al in a.get("aliases") or [] if al.get("name"))
+            rid = self._db.execute("INSERT INTO artists (mbid, name, sort_name, aliases) VALUES (?,?,?,?)"
+                                   " ON CONFLICT(mbid) DO UPDATE SET name=excluded.name, sort_name=excluded.sort_name,"
+                                   " aliases=excluded.aliases RETURNING id",
+                                   (a["id"], a["name"], a.get("sort-name"), aliases)).fetchone()[0]
+            self._db.execute("DELETE FROM artist_tags WHERE artist=?", (rid,))
+            tags = {}
+            for t in (a.get("tags") or []) + (a.get("genres") or []):
+                name = (t.get("name") or "").strip().lower()
+                if name: tags[name] = max(tags.get(name, 0), int(t.get("count") or 0))
+            self._db.executemany("INSERT INTO artist_tags (artist, tag, count) VALUES (?,?,?)", [(rid, k, v) for k, v in tags.items()])
+
+    def _add_recordings(self, rows):
+        for r in rows:
+            credits = r.get("artist-credit") or []
+            works = " ".join(rel["work"]["id"] for rel in r.get("relations") or []
+                             if rel.get("type") == "performance" and isinstance(rel.get("work"), dict) and rel["work"].get("id"))
+            rid = self._db.execute("INSERT INTO recordings (mbid, title, artist, disambiguation, first_release, video, works)"
+                                   " VALUES (?,?,?,?,?,?,?) ON CONFLICT(mbid) DO UPDATE SET title=excluded.title,"
+                                   " artist=excluded.artist, disambiguation=excluded.disambiguation,"
+                                   " first_release=excluded.first_release, video=excluded.video, works=excluded.works RETURNING id",
+                                   (r["id"], r["title"], _credit_name(credits), r.get("disambiguation") or "",
+                                    r.get("first-release-date") or "", int(bool(r.get("video"))), works)).fetchone()[0]
+            self._db.execute("DELETE FROM recording_artists WHERE recording=?", (rid,))
+            self._db.executemany("INSERT OR IGNORE INTO recording_artists (artist_mbid, recording) VALUES (?,?)",
+                                 [(c["artist"]["id"], rid) for c in credits if isinstance(c, dict) and (c.get("artist") or {}).get("id")])
+
+    def import_lines(self, lines, kind=None, progress=None):
+        """Importa objetos JSON (um por linha). kind "artist"/"recording" ou None para detectar por
+        linha (gravações têm "video", artistas "sort-name"); outras entidades são ignoradas.
+        Devolve {"artist": n, "recording": n, "skipped": n}."""
+        counts = {"artist": 0, "recording": 0, "skipped": 0}; batch = {"artist": [], "recording": []}
+        def _flush():
+            with self._lock:
+                self._db.execute("BEGIN")
+                try:
+                    self._add_artists(batch["artist"]); self._add_recordings(batch["recording"])
+                    self._db.execute("COMMIT")
+                except Exception:
+                    self._db.execute("ROLLBACK"); raise
+            batch["artist"].clear(); batch["recording"].clear()
+            if progress: progress(counts)
+        for line in lines:
+            line = line.strip()
+            if not line: continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                counts["skipped"] += 1; continue
+            k = kind or ("recording" if "video" in obj and "title" in obj else "artist" if "sort-name" in obj else None)
+            if k not in batch or not obj.get("id") or not (obj.get("name") if k == "artist" else obj.get("title")):
+                counts["skipped"] += 1; continue
+            batch[k].append(obj); counts[k] += 1
+            if len(batch["artist"]) + len(batch["recording"]) >= BATCH: _flush()
+        _flush()
+        return counts
+
+    def rebuild(self):
+        """Reconstrói os índices FTS (depois das importações) e grava a data da importação."""
+        with self._lock:
+            self._db.execute("INSERT INTO artist_fts(artist_fts) VALUES('rebuild')")
+            self._db.execute("INSERT INTO recording_fts(recording_fts) VALUES('rebuild')")
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported', ?)", (time.strftime("%Y-%m-%dT%H:%M:%S"),))
+            self._db.execute("PRAGMA optimize")
+
+    def clear(self):
+        with self._lock:
+            for t in ("artist_tags", "recording_artists", "artists", "recordings", "meta"):
+                self._db.execute("DELETE FROM %s" % t)
+        self.rebuild()
+
+    # --- consultas no formato da API --------------------------------------------------------
+    def get(self, path, params):
+        """Resposta no formato JSON da API para as consultas que mb_api faz, ou None quando a
+        consulta não é suportada ou não tem resultado local (segue para a rede)."""
+        limit = int(params.get("limit") or 25); offset = int(params.get("offset") or 0)
+        if path == "recording" and params.get("artist"):
+            where, args = "r.id IN (SELECT recording FROM recording_artists WHERE artist_mbid=?)", (params["artist"],)
+            return self._recordings(where, args, "r.id", limit, offset)
+        m = _QUERY.match(params.get("query") or "")
+        if not m:
+            return None
+        field, text = m.group(1), m.group(2).replace('\\"', '"')
+        if path == "artist" and field == "tag":
+            return self._artists_by_tag(text.strip().lower(), limit, offset)
+        if path == "artist" and field == "artist":
+            return self._artists_by_name(text, limit, offset)
+        if path == "recording" and field in ("artist", "recording"):
+            fts = _phrase(text, ["artist"] if field == "artist" else ["title"])
+            where = "r.id IN (SELECT rowid FROM recording_fts WHERE recording_fts MATCH ?)"
+            return self._recordings(where, (fts,), "r.id", limit, offset)
+        return None
+
+    def _artists_by_tag(self, tag, limit, offset):
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM artist_tags WHERE tag=?", (tag,)).fetchone()[0]
+            rows = self._db.execute("SELECT a.mbid, a.name, a.sort_name, t.count FROM artist_tags t JOIN artists a ON a.id=t.artist"
+                                    " WHERE t.tag=? ORDER BY t.count DESC, a.name LIMIT ? OFFSET ?", (tag, limit, offset)).fetchall()
+        if not n:
+            return None
+        return {"count": n, "offset": offset, "artists": [{"id": r[0], "name": r[1], "sort-name": r[2], "score": 100,
+                                                           "tags": [{"name": tag, "count": r[3]}]} for r in rows]}
+
+    def _artists_by_name(self, name, limit, offset):
+        fts = _phrase(name, ["name", "aliases"])
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM artist_fts WHERE artist_fts MATCH ?", (fts,)).fetchone()[0]
+            rows = self._db.execute("SELECT a.mbid, a.name, a.sort_name, a.aliases FROM artist_fts f JOIN artists a ON a.id=f.rowid"
+                                    " WHERE artist_fts MATCH ? ORDER BY bm25(artist_fts), length(a.name) LIMIT ? OFFSET ?",
+                                    (fts, limit, offset)).fetchall()
+        if not n:
+            return None
+        return {"count": n, "offset": offset, "artists": [{"id": r[0], "name": r[1], "sort-name": r[2], "score": 100,
+                                                           "aliases": [{"name": x} for x in r[3].split(" | ") if x]} for r in rows]}
+
+    def _recordings(self, where, args, order, limit, offset):
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM recordings r WHERE " + where, args).fetchone()[0]
+            rows = self._db.execute("SELECT r.mbid, r.title, r.artist, r.disambiguation, r.first_release, r.video, r.works"
+                                    " FROM recordings r WHERE %s ORDER BY %s LIMIT ? OFFSET ?" % (where, order),
+                                    args + (limit, offset)).fetchall()
+        if not n:
+            return None
+        return {"count": n, "offset": offset, "recordings": [{
+            "id": r[0], "title": r[1], "artist-credit": [{"name": r[2]}], "disambiguation": r[3],
+            "first-release-date": r[4], "video": bool(r[5]), "score": 100,
+            "relations": [{"type": "performance", "work": {"id": w}} for w in r[6].split()]} for r in rows]}
+
+    def stats(self):
+        with self._lock:
+            a = self._db.execute("SELECT COUNT(*) FROM artists").fetchone()[0]
+            r = self._db.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+            t = self._db.execute("SELECT COUNT(DISTINCT tag) FROM artist_tags").fetchone()[0]
+            imp = self._db.execute("SELECT value FROM meta WHERE key='imported'").fetchone()
+        return {"artists": a, "recordings": r, "tags": t, "imported": imp[0] if imp else None,
+                "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def _open_text(path):
+    if path.endswith(".gz"): return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".bz2"): return bz2.open(path, "rt", encoding="utf-8")
+    if path.endswith(".xz"): return lzma.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def _kind_from_name(name):
+    base = os.path.basename(name).split(".")[0]
+    return base if base in ("artist", "recording") else None
+
+def import_path(idx, path, progress=None):
+    """Importa um arquivo de dump: JSON por linha (opcionalmente .gz/.bz2/.xz) ou o tar dos dumps
+    oficiais (membros mbdump/artist, mbdump/recording; o tar é lido em streaming)."""
+    if ".tar" in os.path.basename(path):
+        total = {"artist": 0, "recording": 0, "skipped": 0}
+        with tarfile.open(path, "r|*") as tar:
+            for member in tar:
+                kind = _kind_from_name(member.name) if member.isfile() and "mbdump/" in member.name else None
+                if kind is None: continue
+                with tar.extractfile(member) as f:
+                    c = idx.import_lines((line.decode("utf-8") for line in f), kind, progress)
+                for k in total: total[k] += c[k]
+        return total
+    with _open_text(path) as f:
+        return idx.import_lines(f, _kind_from_name(path), progress)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_local_index():
+    """Índice local compartilhado, ou None se ainda não foi importado (não cria o arquivo)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None and os.path.exists(default_path()):
+            _shared = LocalMB()
+        return _shared
+
+def _main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m app.mb_local", description="Índice local do MusicBrainz (SQLite FTS5)")
+    ap.add_argument("--db", help="arquivo do índice (padrão: %s)" % default_path())
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help="importar dumps JSON (artist, recording)"); p.add_argument("files", nargs="+")
+    sub.add_parser("stats", help="contagens do índice")
+    sub.add_parser("clear", help="apagar todo o conteúdo")
+    p = sub.add_parser("search", help="consultar como o mb_api consultaria")
+    p.add_argument("field", choices=("artist", "tag", "recording", "by-artist")); p.add_argument("text"); p.add_argument("--limit", type=int, default=10)
+    args = ap.parse_args(argv)
+    idx = LocalMB(args.db)
+    if args.cmd == "import":
+        t0 = time.monotonic()
+        def _progress(c):
+            print("\r  artistas %d | gravações %d | ignorados %d" % (c["artist"], c["recording"], c["skipped"]), end="", file=sys.stderr, flush=True)
+        for path in args.files:
+            print("%s:" % path, file=sys.stderr)
+            try:
+                c = import_path(idx, path, _progress)
+            except (OSError, tarfile.TarError, EOFError, lzma.LZMAError) as e:
+                print("\nErro lendo %s: %s" % (path, e), file=sys.stderr); return 1
+            print("\n  %s" % c, file=sys.stderr)
+        idx.rebuild()
+        print("Índice pronto em %.1fs: %s" % (time.monotonic() - t0, idx.stats()))
+    elif args.cmd == "stats":
+        print(idx.stats())
+    elif args.cmd == "clear":
+        idx.clear(); print(idx.stats())
+    else:
+        path, params = ("recording", {"artist": args.text}) if args.field == "by-artist" else \
+            ("artist" if args.field in ("artist", "tag") else "recording", {"query": '%s:"%s"' % (args.field, args.text)})
+        t0 = time.perf_counter(); data = idx.get(path, dict(params, limit=args.limit)) or {}
+        for row in data.get("artists") or data.get("recordings") or []:
+            print("%s\t%s%s" % (row["id"], row.get("name") or row.get("title"),
+                                "\t" + row["artist-credit"][0]["name"] if row.get("artist-credit") else ""))
+        print("%d resultados (%d no total) em %.2f ms" % (len(data.get("artists") or data.get("recordings") or []),
+                                                         data.get("count", 0), (time.perf_counter() - t0) * 1000), file=sys.stderr)
+    idx.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline em estágios (resolver → baixar → pós-processar) ligados por filas limitadas.
+Cada estágio tem seu próprio pool de threads e contadores (processados, falhas,
+descartados, tempo ocioso e tempo bloqueado por contrapressão da fila seguinte).
+Durante fn(item), `current.stage` e `current.queue_wait` informam o estágio e quanto
+tempo o item esperou na fila de entrada.
+"""
+import queue, threading, time
+
+_END = object()
+current = threading.local()
+
+class Stage:
+    def __init__(self, name, fn, workers=1, maxsize=4, stop_event=None, logger=None, on_error=None):
+        self.name = name; self.fn = fn; self.workers = max(1, int(workers or 1)); self.on_error = on_error
+        self.inbox = queue.Queue(maxsize=max(1, int(maxsize or 1)))
+        self.outbox = None  # definida pelo Pipeline (entrada do próximo estágio)
+        self.stop_event = stop_event or threading.Event(); self.logger = logger
+        self._lock = threading.Lock(); self._threads = []; self._alive = 0
+        self.processed = 0; self.failed = 0; self.dropped = 0; self.busy = 0
+        self.blocked_s = 0.0; self.idle_s = 0.0; self.max_depth = 0; self.queue_wait_s = 0.0
+
+    def start(self):
+        self._alive = self.workers
+        for n in range(self.workers):
+            t = threading.Thread(target=self._loop, name=f"{self.name}-{n+1}", daemon=True)
+            t.start(); self._threads.append(t)
+
+    def put(self, item):
+        """Coloca um item na entrada do estágio; bloqueia enquanto a fila estiver cheia."""
+        t0 = time.monotonic()
+        while True:
+            if self.stop_event.is_set() and item is not _END:
+                return False
+            try:
+                self.inbox.put((item, time.monotonic()) if item is not _END else item, timeout=0.2); break
+            except queue.Full:
+                continue
+        with self._lock:
+            self.max_depth = max(self.max_depth, self.inbox.qsize())
+        return time.monotonic() - t0
+
+    def _loop(self):
+        try:
+            while True:
+                t0 = time.monotonic()
+                item = self.inbox.get()
+                with self._lock: self.idle_s += time.monotonic() - t0
+                if item is _END:
+                    self.inbox.put(_END)  # repassa o marcador para as outras threads do estágio
+                    return
+                item, t_put = item
+                current.stage = self.name; current.queue_wait = time.monotonic() - t_put
+                with self._lock: self.queue_wait_s += current.queue_wait
+                if self.stop_event.is_set():
+                    with self._lock: self.dropped += 1
+                    continue
+                with self._lock: self.busy += 1
+                try:
+                    res = self.fn(item)
+                except Exception as e:
+                    with self._lock: self.failed += 1
+                    if callable(self.on_error):
+                        self.on_error(item, e)
+                    elif self.logger:
+                        self.logger.exception("[%s] Falha: %s", self.name, e)
+                    continue
+                finally:
+                    with self._lock: self.busy -= 1
+                with self._lock: self.processed += 1
+                if res is not None and self.outbox is not None:
+                    waited = self.outbox.put(res)
+                    if waited is False:
+                        with self._lock: self.dropped += 1
+                    else:
+                        with self._lock: self.blocked_s += waited
+        finally:
+            with self._lock:
+                self._alive -= 1; last = self._alive == 0
+            if last and self.outbox is not None:
+                self.outbox.put(_END)
+
+    def join(self, timeout=None):
+        end = None if timeout is None else time.monotonic() + timeout
+        for t in self._threads:
+            t.join(None if end is None else max(0.0, end - time.monotonic()))
+        return not any(t.is_alive() for t in self._threads)
+
+    def stats(self):
+        with self._lock:
+            return {"stage": self.name, "workers": self.workers, "processed": self.processed,
+                    "failed": self.failed, "dropped": self.dropped, "busy": self.busy,
+                    "queued": self.inbox.qsize(), "max_queued": self.max_depth,
+                    "blocked_s": round(self.blocked_s, 2), "idle_s": round(self.idle_s, 2),
+                    "queue_wait_s": round(self.queue_wait_s, 2)}
+
+class Pipeline:
+    def __init__(self, stages, stop_event=None):
+        self.stages = list(stages); self.stop_event = stop_event or threading.Event()
+        for a, b in zip(self.stages, self.stages[1:]):
+            a.outbox = b
+
+    def run(self, items, report_fn=None, report_every=30.0):
+        """Alimenta o primeiro estágio com `items` (iterável) e espera todos os estágios terminarem.
+        Se `report_fn` for informado, recebe o resumo dos estágios a cada `report_every` segundos."""
+        for st in self.stages:
+            st.start()
+        first = self.stages[0]; last_report = time.monotonic()
+        try:
+            for it in items:
+                if self.stop_event.is_set() or first.put(it) is False:
+                    break
+                if report_fn and time.monotonic() - last_report >= report_every:
+                    report_fn(self.summary()); last_report = time.monotonic()
+        finally:
+            first.put(_END)
+            for st in self.stages:
+                while not st.join(timeout=report_every if report_fn else None):
+                    report_fn(self.summary())
+
+    def stats(self):
+        return [st.stats() for st in self.stages]
+
+    def summary(self):
+        return " | ".join("%s: ok=%s falhas=%s desc=%s fila_max=%s bloqueado=%.1fs ocioso=%.1fs" % (
+            s["stage"], s["processed"], s["failed"], s["dropped"], s["max_queued"], s["blocked_s"], s["idle_s"])
+            for s in self.stats())
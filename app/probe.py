@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Camada de decisão "probe-then-decide": identifica codecs, resolução e fps do formato
+escolhido (pelo info_dict do yt-dlp ou, se faltar, por ffprobe com cache) e decide se o
+item precisa de remux, só de transcodificação do áudio ou de transcodificação completa.
+"""
+import os, json, subprocess
+from functools import lru_cache
+
+REMUX = "remux"          # vídeo e áudio já compatíveis: só troca o contêiner (+faststart)
+AUDIO_ONLY = "audio"     # vídeo H.264 compatível: copia o vídeo e converte só o áudio
+FULL = "full"            # reencode completo (escala, fps, CRF)
+COPY = "copy"            # áudio: MP3 já no perfil, sem reamostragem
+TRANSCODE = "transcode"  # áudio: converte para MP3
+
+CREATE_NO_WINDOW = 0x08000000
+
+def norm_codec(c):
+    """Normaliza nomes de codec do yt-dlp/ffprobe (avc1.4d401f → h264, mp4a.40.2 → aac)."""
+    c = (c or "").lower().strip()
+    if not c or c == "none":
+        return None
+    if c.startswith(("avc", "h264", "x264")): return "h264"
+    if c.startswith(("hev", "hvc", "h265")): return "hevc"
+    if c.startswith(("vp09", "vp9")): return "vp9"
+    if c.startswith("av01"): return "av1"
+    if c.startswith(("mp3", "mp4a.6b", "mp4a.40.34")): return "mp3"
+    if c.startswith(("mp4a", "aac")): return "aac"
+    return c.split(".", 1)[0]
+
+def _num(v):
+    try: return float(v) if v not in (None, "", "none") else None
+    except (TypeError, ValueError): return None
+
+def profile_from_info(info):
+    """Perfil {vcodec, acodec, height, fps, asr, channels} a partir do info_dict baixado."""
+    fmts = info.get("requested_formats") or [info]
+    p = {"vcodec": None, "acodec": None, "height": None, "fps": None, "asr": None, "channels": None}
+    for f in fmts:
+        vc = norm_codec(f.get("vcodec")); ac = norm_codec(f.get("acodec"))
+        if vc and p["vcodec"] is None:
+            p.update(vcodec=vc, height=_num(f.get("height")), fps=_num(f.get("fps")))
+        if ac and p["acodec"] is None:
+            p.update(acodec=ac, asr=_num(f.get("asr")), channels=_num(f.get("audio_channels")))
+    return p
+
+@lru_cache(maxsize=512)
+def _ffprobe_cached(ffprobe_path, path, size, mtime):
+    kw = {"creationflags": CREATE_NO_WINDOW} if os.name == "nt" else {}
+    out = subprocess.run([ffprobe_path, "-v", "error", "-show_streams", "-of", "json", path],
+                         capture_output=True, text=True, errors="ignore", timeout=60, **kw).stdout
+    p = {"vcodec": None, "acodec": None, "height": None, "fps": None, "asr": None, "channels": None}
+    for st in (json.loads(out or "{}").get("streams") or []):
+        if st.get("codec_type") == "video" and p["vcodec"] is None and not (st.get("disposition") or {}).get("attached_pic"):
+            fps = None
+            try:
+                n, d = (st.get("avg_frame_rate") or "0/0").split("/")
+                fps = float(n) / float(d) if float(d) else None
+            except (ValueError, ZeroDivisionError):
+                pass
+            p.update(vcodec=norm_codec(st.get("codec_name")), height=_num(st.get("height")), fps=fps)
+        elif st.get("codec_type") == "audio" and p["acodec"] is None:
+            p.update(acodec=norm_codec(st.get("codec_name")), asr=_num(st.get("sample_rate")), channels=_num(st.get("channels")))
+    return p
+
+def ffprobe_profile(ffprobe_path, path):
+    """Perfil via ffprobe, em cache por (caminho, tamanho, mtime)."""
+    st = os.stat(path)
+    return dict(_ffprobe_cached(ffprobe_path, path, st.st_size, int(st.st_mtime)))
+
+def resolve_profile(info, path=None, ffprobe_path=None, need_video=True):
+    """Usa o info_dict; recorre ao ffprobe só quando faltam codec/altura/fps."""
+    p = profile_from_info(info)
+    missing = p["acodec"] is None or (need_video and (p["vcodec"] is None or p["height"] is None or p["fps"] is None))
+    if missing and path and ffprobe_path and os.path.isfile(ffprobe_path) and os.path.isfile(path):
+        try:
+            probed = ffprobe_profile(ffprobe_path, path)
+            p.update({k: v for k, v in probed.items() if p.get(k) is None and v is not None})
+        except Exception:
+            pass
+    return p
+
+def decide_video(p, max_h, max_fps):
+    """remux / audio / full para o perfil H.264 + AAC até max_h e max_fps."""
+    if p.get("vcodec") != "h264" or p.get("height") is None or p.get("fps") is None:
+        return FULL
+    if p["height"] > int(max_h) or p["fps"] > float(max_fps) + 0.5:
+        return FULL
+    return REMUX if p.get("acodec") == "aac" else AUDIO_ONLY
+
+def decide_audio(p, sr, channels):
+    """copy quando a fonte já é MP3 na taxa de amostragem e nº de canais pedidos."""
+    if p.get("acodec") == "mp3" and p.get("asr") == float(sr) and p.get("channels") == float(channels):
+        return COPY
+    return TRANSCODE
+
+def describe(p):
+    return "v=%s %sp@%s a=%s %sHz/%sch" % (p.get("vcodec") or "-", int(p["height"]) if p.get("height") else "?",
+                                          ("%.0f" % p["fps"]) if p.get("fps") else "?", p.get("acodec") or "-",
+                                          int(p["asr"]) if p.get("asr") else "?", int(p["channels"]) if p.get("channels") else "?")
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilamento opcional (desligado por padrão): cProfile das threads do worker e das buscas da
+interface, e snapshots do tracemalloc entre itens para achar crescimento de memória em filas
+longas. Liga pela caixa "Perfilar execução" ou pela variável de ambiente DOWNLOADSFB_PROFILE=1.
+
+Arquivos gravados na pasta de logs, com o mesmo carimbo de hora:
+    profile_<ts>_<nome>.prof       estatísticas do cProfile (pstats / snakeviz)
+    profile_<ts>_<nome>_top.txt    funções mais caras (tempo acumulado e próprio)
+    profile_<ts>_<nome>_mem.txt    memória rastreada por snapshot e maiores crescimentos desde o início
+"""
+import os, io, threading, time, tracemalloc  # cProfile/pstats só quando um perfil é criado (a GUI importa este módulo)
+
+ENV_VAR = "DOWNLOADSFB_PROFILE"
+TOP_FUNCS = 40
+TOP_ALLOCS = 15
+SNAPSHOT_MIN_S = 5.0   # snapshots entre itens no máximo a cada N s (o snapshot percorre todo o heap rastreado)
+
+_enabled = False
+# tracemalloc é global no processo: perfis simultâneos (worker + buscas) contam referências e só o
+# último a sair para o rastreamento — e só se foi um deles que o ligou
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_started = False
+
+def _trace_acquire():
+    global _trace_users, _trace_started
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(); _trace_started = True
+        _trace_users += 1
+
+def _trace_release():
+    global _trace_users, _trace_started
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and _trace_started:
+            tracemalloc.stop(); _trace_started = False
+
+def set_enabled(flag):
+    global _enabled
+    _enabled = bool(flag)
+
+def enabled():
+    return _enabled or os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "sim", "on")
+
+class RunProfile:
+    """Perfil de uma execução. `with RunProfile(...)` perfila a thread atual; `wrap(fn)` perfila
+    as chamadas de fn em qualquer thread (um cProfile por thread, somados no final)."""
+    def __init__(self, name, out_dir, logger=None, memory=True):
+        os.makedirs(out_dir, exist_ok=True)
+        self.prefix = os.path.join(out_dir, "profile_%s_%s" % (time.strftime("%Y%m%d_%H%M%S"), name))
+        self.logger = logger; self.memory = memory
+        self._lock = threading.Lock(); self._local = threading.local(); self._profiles = []
+        self._base = None; self._last_snap = 0.0; self._tracing = False; self._refused = 0
+
+    def _profile(self):
+        p = getattr(self._local, "p", None)
+        if p is None:
+            import cProfile
+            p = self._local.p = cProfile.Profile()
+            with self._lock: self._profiles.append(p)
+        return p
+
+    def _enable(self):
+        try:
+            self._profile().enable(); return True
+        except ValueError:
+            # Python 3.12+: só um cProfile ativo por vez no processo; esta chamada fica de fora
+            with self._lock: self._refused += 1
+            return False
+
+    def wrap(self, fn):
+        def _profiled(*a, **k):
+            on = self._enable()
+            try:
+                return fn(*a, **k)
+            finally:
+                if on: self._profile().disable()
+        return _profiled
+
+    def __enter__(self):
+        if self.memory:
+            _trace_acquire(); self._tracing = True
+            self._base = tracemalloc.take_snapshot(); self._last_snap = time.monotonic()
+            self._write_mem("início", None)
+        self._local.on = self._enable()
+        return self
+
+    def __exit__(self, *exc):
+        if getattr(self._local, "on", False): self._profile().disable()
+        try:
+            self.snapshot("fim", force=True)
+            self.dump()
+        except Exception as e:
+            if self.logger: self.logger.warning("[Perfil] falha ao gravar: %s", e)
+        finally:
+            if self._tracing: self._tracing = False; _trace_release()
+        return False
+
+    def snapshot(self, label, force=False):
+        """Snapshot do tracemalloc comparado ao do início (chamado entre itens, de qualquer thread)."""
+        if not self.memory or self._base is None or not tracemalloc.is_tracing():
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_snap < SNAPSHOT_MIN_S:
+                return
+            self._last_snap = now
+        snap = tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+        self._write_mem(label, snap.compare_to(self._base, "lineno")[:TOP_ALLOCS])
+
+    def _write_mem(self, label, diffs):
+        cur, peak = tracemalloc.get_traced_memory()
+        lines = ["[%s] %s: rastreado %.1f MB (pico %.1f MB)" % (time.strftime("%H:%M:%S"), label, cur / 1048576.0, peak / 1048576.0)]
+        lines += ["    %s" % d for d in diffs or []]
+        with self._lock, open(self.prefix + "_mem.txt", "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def dump(self):
+        import pstats
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = None
+        for p in profiles:
+            try:
+                if stats is None: stats = pstats.Stats(p)
+                else: stats.add(p)
+            except TypeError:
+                pass  # perfil sem nenhuma chamada registrada
+        if stats is None:
+            return
+        stats.dump_stats(self.prefix + ".prof")
+        out = io.StringIO(); stats.stream = out
+        out.write("%d threads perfiladas%s\n" % (len(profiles), " | %d chamadas sem perfil (outro cProfile ativo)" % self._refused if self._refused else ""))
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCS)
+        stats.sort_stats("tottime").print_stats(TOP_FUNCS)
+        with open(self.prefix + "_top.txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        if self.logger: self.logger.info("[Perfil] %s.prof (+ _top.txt%s)", self.prefix, ", _mem.txt" if self.memory else "")
+
+def profiled(fn, name, out_dir, logger=None):
+    """fn perfilada quando o perfilamento está ligado (avaliado na chamada); senão, fn como está."""
+    def _run(*a, **k):
+        if not enabled():
+            return fn(*a, **k)
+        with RunProfile(name, out_dir, logger):
+            return fn(*a, **k)
+    return _run
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Barramento de progresso entre as threads de download e a interface Tk.
+As threads só publicam eventos (deque: append/popleft atômicos, sem lock no caminho quente);
+o loop do Tk drena a fila numa taxa fixa, consolida por item (último evento vence) e
+calcula o progresso geral de todos os itens ativos.
+"""
+from collections import deque
+
+FPS = 10
+
+class ProgressBus:
+    def __init__(self):
+        self._q = deque()
+        self.items = {}            # chave → (pct, speed, eta, stage, title)
+        self.total = 0; self.finished = 0
+        self.last = None; self._dirty = False
+        self.posted = 0; self.drawn = 0
+
+    def post(self, key, pct, speed, eta, stage, title):
+        """Chamado de qualquer thread. stage == 'finished' encerra o item `key`."""
+        self._q.append((key, pct, speed, eta, stage, title))
+
+    def __call__(self, pct, speed, eta, stage, title, key=None):
+        """Compatível com a assinatura antiga de progress_fn (um único item)."""
+        self.post(key, pct, speed, eta, stage, title)
+
+    def set_counts(self, total=None, finished=None):
+        """Totais da fila (itens) para a consolidação geral; pode ser chamado de qualquer thread."""
+        self._q.append((None, total, finished, None, "_counts", None))
+
+    def reset(self):
+        self._q.clear(); self.items.clear(); self.total = self.finished = 0; self.last = None
+
+    def drain(self):
+        """Chamado só pela thread do Tk. Retorna (pct, speed, eta, stage, title) consolidado, ou None se nada mudou."""
+        q = self._q; changed = False
+        while True:
+            try:
+                key, a, b, c, stage, title = q.popleft()
+            except IndexError:
+                break
+            self.posted += 1; changed = True
+            if stage == "_counts":
+                if a is not None: self.total = a
+                if b is not None: self.finished = b
+            elif stage == "finished":
+                self.items.pop(key, None); self.last = (100.0, 0.0, 0, stage, title)
+            else:
+                self.items[key] = (a, b, c, stage, title); self.last = (a, b, c, stage, title)
+        if not changed:
+            return None
+        self.drawn += 1
+        return self.rollup()
+
+    def rollup(self):
+        active = list(self.items.values())
+        if not self.total:
+            return self.last if len(active) <= 1 else self._merge(active, sum(a[0] for a in active) / len(active))
+        overall = (self.finished + sum(a[0] for a in active) / 100.0) / self.total * 100.0
+        if not active:
+            return (overall, 0.0, 0, (self.last or (0, 0, 0, "", ""))[3], (self.last or (0, 0, 0, "", ""))[4])
+        return self._merge(active, overall)
+
+    def _merge(self, active, pct):
+        stage, title = (self.last or active[-1])[3:5]
+        if len(active) > 1:
+            title = "[%d ativos] %s" % (len(active), title or "")
+        return (min(100.0, pct), sum(a[1] or 0 for a in active), max(a[2] or 0 for a in active), stage, title)
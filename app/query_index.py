@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Índice persistente consulta → ID de vídeo para entradas "ytsearch1:".
+A chave é a consulta normalizada (canonical.normalize_query), de modo que
+'ytsearch1:<artista> - <música> official' e o par (artista, música) coincidem.
+
+Inspeção/manutenção pela linha de comando:
+    python -m app.query_index stats | list [N] | prune DIAS | forget "<consulta>"
+"""
+import os, sqlite3, sys, threading, time
+from .canonical import normalize_query, search_count, pair_key
+from .util import app_data_dir
+
+WATCH_URL = "https://www.youtube.com/watch?v=%s"
+
+class QueryIndex:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(app_data_dir(), "query_index.sqlite3")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS queries (key TEXT PRIMARY KEY, raw TEXT NOT NULL,"
+                         " video_id TEXT NOT NULL, title TEXT, created REAL NOT NULL, last_used REAL NOT NULL,"
+                         " hits INTEGER NOT NULL DEFAULT 0)")
+
+    @staticmethod
+    def indexable(raw):
+        """Só buscas de um único resultado são mapeáveis para um vídeo."""
+        return search_count(raw) == 1 and bool(normalize_query(raw))
+
+    def lookup(self, raw):
+        if not self.indexable(raw):
+            return None
+        return self.lookup_key(normalize_query(raw))
+
+    def lookup_pair(self, artist, title, video=False, touch=True):
+        return self.lookup_key(pair_key(artist, title, video), touch)
+
+    def lookup_key(self, key, touch=True):
+        with self._lock:
+            row = self._db.execute("SELECT video_id FROM queries WHERE key=?", (key,)).fetchone()
+            if row and touch:
+                self._db.execute("UPDATE queries SET hits=hits+1, last_used=? WHERE key=?", (time.time(), key))
+        return row[0] if row else None
+
+    def record(self, raw, video_id, title=None):
+        if not video_id or not self.indexable(raw):
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT INTO queries (key, raw, video_id, title, created, last_used) VALUES (?,?,?,?,?,?)"
+                             " ON CONFLICT(key) DO UPDATE SET raw=excluded.raw, video_id=excluded.video_id,"
+                             " title=excluded.title, last_used=excluded.last_used",
+                             (normalize_query(raw), raw, video_id, title, now, now))
+
+    def forget(self, raw):
+        with self._lock:
+            return self._db.execute("DELETE FROM queries WHERE key=?", (normalize_query(raw),)).rowcount
+
+    def prune(self, max_age_days=None, max_entries=None):
+        """Remove mapeamentos não usados há `max_age_days` dias e/ou além dos `max_entries` mais recentes."""
+        removed = 0
+        with self._lock:
+            if max_age_days is not None:
+                removed += self._db.execute("DELETE FROM queries WHERE last_used < ?",
+                                            (time.time() - float(max_age_days) * 86400,)).rowcount
+            if max_entries is not None:
+                removed += self._db.execute("DELETE FROM queries WHERE key NOT IN (SELECT key FROM queries"
+                                            " ORDER BY last_used DESC LIMIT ?)", (int(max_entries),)).rowcount
+        return removed
+
+    def entries(self, limit=100):
+        with self._lock:
+            return self._db.execute("SELECT key, raw, video_id, title, hits, last_used FROM queries"
+                                    " ORDER BY last_used DESC LIMIT ?", (int(limit),)).fetchall()
+
+    def stats(self):
+        with self._lock:
+            n, hits = self._db.execute("SELECT COUNT(*), COALESCE(SUM(hits),0) FROM queries").fetchone()
+        return {"entries": n, "hits": hits}
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_query_index():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = QueryIndex()
+        return _shared
+
+def _main(argv):
+    idx = get_query_index()
+    cmd = argv[0] if argv else "stats"
+    if cmd == "stats":
+        print(idx.stats())
+    elif cmd == "list":
+        for key, raw, vid, title, hits, used in idx.entries(int(argv[1]) if len(argv) > 1 else 100):
+            print("%s\t%s\t%s\t%s\t%s" % (vid, hits, time.strftime("%Y-%m-%d", time.localtime(used)), key, title or ""))
+    elif cmd == "prune" and len(argv) > 1:
+        print("removidos: %s" % idx.prune(max_age_days=float(argv[1])))
+    elif cmd == "forget" and len(argv) > 1:
+        print("removidos: %s" % idx.forget(argv[1]))
+    else:
+        print(__doc__); return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(_main(sys.argv[1:]))
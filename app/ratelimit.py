@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Limitador global (token bucket) compartilhado por todo o processo: bytes/s dos downloads
+do worker e requisições/s das extrações (worker, busca geral) e do MusicBrainz.
+Os limites podem ser alterados durante a execução (0 = sem limite).
+"""
+import threading, time
+from collections import deque
+
+class TokenBucket:
+    """Bucket com "débito": consumir mais do que há disponível deixa o saldo negativo e o
+    chamador espera o tempo necessário para quitá-lo (funciona com blocos de qualquer tamanho)."""
+    def __init__(self, rate=0.0, burst_s=1.0):
+        self._lock = threading.Lock(); self.burst_s = burst_s
+        self.rate = 0.0; self.tokens = 0.0; self.last = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self.rate = max(0.0, float(rate or 0)); self.tokens = min(self.tokens, self.rate * self.burst_s)
+            self.last = time.monotonic()
+
+    def consume(self, n=1.0, stop_event=None):
+        """Retira `n` fichas; bloqueia o necessário (ou até `stop_event`)."""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            now = time.monotonic()
+            self.tokens = min(self.rate * self.burst_s, self.tokens + (now - self.last) * self.rate)
+            self.last = now; self.tokens -= n
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        end = time.monotonic() + wait
+        while wait > 0:
+            if stop_event is not None and stop_event.is_set():
+                break
+            time.sleep(min(wait, 0.25)); wait = end - time.monotonic()
+
+class RateLimiter:
+    WINDOW_S = 5.0
+
+    def __init__(self, bytes_per_s=0, requests_per_s=0):
+        self.bytes = TokenBucket(bytes_per_s); self.requests = TokenBucket(requests_per_s, burst_s=2.0)
+        self._lock = threading.Lock(); self._hist = deque()  # (t, bytes, requests)
+        self.total_bytes = 0; self.total_requests = 0; self.waited_s = 0.0
+
+    def set_limits(self, bytes_per_s=None, requests_per_s=None):
+        if bytes_per_s is not None: self.bytes.set_rate(bytes_per_s)
+        if requests_per_s is not None: self.requests.set_rate(requests_per_s)
+
+    def _account(self, nbytes, nreq, waited):
+        now = time.monotonic()
+        with self._lock:
+            self._hist.append((now, nbytes, nreq)); self.total_bytes += nbytes; self.total_requests += nreq
+            self.waited_s += waited
+            while self._hist and self._hist[0][0] < now - self.WINDOW_S:
+                self._hist.popleft()
+
+    def acquire_bytes(self, n, stop_event=None):
+        if n <= 0: return 0.0
+        t0 = time.monotonic(); self.bytes.consume(n, stop_event)
+        waited = time.monotonic() - t0; self._account(n, 0, waited)
+        return waited
+
+    def acquire_request(self, stop_event=None):
+        t0 = time.monotonic(); self.requests.consume(1, stop_event)
+        waited = time.monotonic() - t0; self._account(0, 1, waited)
+        return waited
+
+    def usage(self):
+        """Uso atual (média da janela de WINDOW_S segundos) e limites configurados."""
+        now = time.monotonic()
+        with self._lock:
+            while self._hist and self._hist[0][0] < now - self.WINDOW_S:
+                self._hist.popleft()
+            b = sum(h[1] for h in self._hist); r = sum(h[2] for h in self._hist)
+            return {"bytes_per_s": b / self.WINDOW_S, "requests_per_s": r / self.WINDOW_S,
+                    "limit_bytes_per_s": self.bytes.rate, "limit_requests_per_s": self.requests.rate,
+                    "total_bytes": self.total_bytes, "total_requests": self.total_requests, "waited_s": round(self.waited_s, 1)}
+
+    def summary(self):
+        u = self.usage()
+        lim_b = "%.0f KB/s" % (u["limit_bytes_per_s"] / 1024) if u["limit_bytes_per_s"] else "sem limite"
+        lim_r = "%.1f/s" % u["limit_requests_per_s"] if u["limit_requests_per_s"] else "sem limite"
+        return "banda: %.0f KB/s (limite %s) | requisições: %.1f/s (limite %s)" % (
+            u["bytes_per_s"] / 1024, lim_b, u["requests_per_s"], lim_r)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RateLimiter()
+        return _shared
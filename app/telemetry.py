@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Telemetria estruturada por item (JSONL, um arquivo por execução) e relatório da execução:
+vazão, p50/p95 por estágio (espera na fila, extração, download, pós-processamento) e itens
+mais lentos. Eventos:
+    {"ev": "run", ...}                                     início (modo, pasta, itens, opções)
+    {"ev": "resolve", "i", "q", "wait_s", "dur_s", "cached", "indexed"}
+    {"ev": "download", "i", "wait_s", "dur_s", "bytes", "files"}
+    {"ev": "postprocess", "i", "wait_s", "dur_s", "decision"}
+    {"ev": "skip", "i", "reason"}                           estático / já baixado / nada baixado
+    {"ev": "error", "i", "stage", "err"}
+    {"ev": "item", "i", "q", "result", "total_s"}           fim do item
+    {"ev": "end", "dur_s", "stopped"}
+
+Relatório de um arquivo antigo: python -m app.telemetry <arquivo.jsonl>
+"""
+import os, sys, json, threading, time
+from .util import app_data_dir
+
+STAGES = (("fila", "wait_s"), ("resolve", "dur_s"), ("download", "dur_s"), ("postprocess", "dur_s"))
+
+def telemetry_dir():
+    return app_data_dir("telemetry")
+
+class RunTelemetry:
+    def __init__(self, mode, outdir, path=None, **info):
+        self.path = path or os.path.join(telemetry_dir(), "%s-%s.jsonl" % (time.strftime("%Y%m%d-%H%M%S"), mode))
+        self._lock = threading.Lock(); self._t0 = time.monotonic()
+        self._f = open(self.path, "a", encoding="utf-8")
+        self.event("run", mode=mode, outdir=outdir, started=time.time(), **info)
+
+    def event(self, ev, **fields):
+        rec = {"ts": round(time.time(), 3), "ev": ev}
+        rec.update({k: (round(v, 3) if isinstance(v, float) else v) for k, v in fields.items() if v is not None})
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            if not self._f.closed:
+                self._f.write(line + "\n")
+
+    def close(self, stopped=False):
+        self.event("end", dur_s=time.monotonic() - self._t0, stopped=bool(stopped))
+        with self._lock:
+            if not self._f.closed: self._f.close()
+
+def _pct(values, p):
+    if not values:
+        return None
+    v = sorted(values); k = (len(v) - 1) * p / 100.0; lo = int(k); hi = min(lo + 1, len(v) - 1)
+    return v[lo] + (v[hi] - v[lo]) * (k - lo)
+
+def summarize(path, slowest=10):
+    """Lê o JSONL (em streaming) e calcula o relatório da execução."""
+    stages = {name: [] for name, _ in STAGES}
+    items = []; results = {}; skips = {}; errors = {}; total_bytes = 0; dl_time = 0.0
+    run = {}; end = {}
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            try: e = json.loads(line)
+            except ValueError: continue
+            ev = e.get("ev")
+            if ev == "run": run = e
+            elif ev == "end": end = e
+            elif ev in ("resolve", "download", "postprocess"):
+                stages[ev].append(e.get("dur_s") or 0.0)
+                if e.get("wait_s") is not None: stages["fila"].append(e["wait_s"])
+                if ev == "download":
+                    total_bytes += e.get("bytes") or 0; dl_time += e.get("dur_s") or 0.0
+            elif ev == "skip": skips[e.get("reason")] = skips.get(e.get("reason"), 0) + 1
+            elif ev == "error": errors[e.get("stage") or "?"] = errors.get(e.get("stage") or "?", 0) + 1
+            elif ev == "item":
+                results[e.get("result")] = results.get(e.get("result"), 0) + 1
+                if e.get("total_s") is not None: items.append((e["total_s"], e.get("q") or e.get("i")))
+    dur = end.get("dur_s") or ((end.get("ts") or 0) - (run.get("ts") or 0)) or 0.0
+    n = sum(results.values())
+    return {
+        "mode": run.get("mode"), "items": n, "results": results, "skips": skips, "errors": errors,
+        "dur_s": dur, "stopped": end.get("stopped"), "bytes": total_bytes,
+        "items_per_h": n / dur * 3600.0 if dur else None,
+        "mb_per_s": total_bytes / 1048576.0 / dur if dur else None,
+        "download_mb_per_s": total_bytes / 1048576.0 / dl_time if dl_time else None,
+        "stages": {name: {"n": len(v), "p50": _pct(v, 50), "p95": _pct(v, 95), "total": sum(v)}
+                   for name, v in stages.items()},
+        "slowest": sorted(items, key=lambda t: t[0], reverse=True)[:slowest],
+    }
+
+def format_report(r):
+    f = lambda v, fmt="%.1f": (fmt % v) if v is not None else "-"
+    lines = ["Execução (%s): %d itens em %s s%s" % (r.get("mode") or "-", r["items"], f(r["dur_s"]), " (interrompida)" if r.get("stopped") else ""),
+             "Resultados: " + (", ".join("%s=%d" % kv for kv in sorted(r["results"].items())) or "-"),
+             "Ignorados: " + (", ".join("%s=%d" % kv for kv in sorted(r["skips"].items())) or "-"),
+             "Falhas por estágio: " + (", ".join("%s=%d" % kv for kv in sorted(r["errors"].items())) or "-"),
+             "Vazão: %s itens/h | %s MB baixados | %s MB/s (execução) | %s MB/s (durante downloads)" % (
+                 f(r["items_per_h"]), f(r["bytes"] / 1048576.0), f(r["mb_per_s"], "%.2f"), f(r["download_mb_per_s"], "%.2f")),
+             "", "%-12s %6s %9s %9s %10s" % ("estágio", "n", "p50 (s)", "p95 (s)", "total (s)")]
+    for name, _ in STAGES:
+        s = r["stages"][name]
+        lines.append("%-12s %6d %9s %9s %10s" % (name, s["n"], f(s["p50"], "%.2f"), f(s["p95"], "%.2f"), f(s["total"])))
+    if r["slowest"]:
+        lines += ["", "Itens mais lentos:"] + ["  %8.1f s  %s" % (t, q) for t, q in r["slowest"]]
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__); sys.exit(2)
+    print(format_report(summarize(sys.argv[1])))
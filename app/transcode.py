@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço de transcodificação: executa os jobs do ffmpeg como processos separados, com
+número de slots calculado a partir dos núcleos e do preset do x264, limite de threads
+por job e prioridade reduzida (para a interface Tk continuar responsiva).
+"""
+import os, subprocess, threading, time, itertools
+
+# Presets rápidos escalam mal com muitas threads; presets lentos aproveitam mais núcleos por job.
+PRESET_THREADS = {
+    "ultrafast": 2, "superfast": 2, "veryfast": 2,
+    "faster": 3, "fast": 3, "medium": 4,
+    "slow": 6, "slower": 8, "veryslow": 8,
+}
+
+BELOW_NORMAL_PRIORITY_CLASS = 0x00004000
+CREATE_NO_WINDOW = 0x08000000
+
+def plan_slots(preset="medium", cores=None):
+    """Retorna (slots, threads_por_job) para a máquina atual."""
+    cores = max(1, int(cores or os.cpu_count() or 1))
+    tpj = max(1, min(PRESET_THREADS.get(str(preset or "medium").lower(), 4), cores))
+    return max(1, cores // tpj), tpj
+
+class TranscodeService:
+    def __init__(self, ffmpeg_path, preset="medium", cores=None, logger=None, nice=10):
+        self.ffmpeg_path = ffmpeg_path; self.logger = logger; self.nice = nice
+        self.slots, self.threads_per_job = plan_slots(preset, cores)
+        self._sem = threading.BoundedSemaphore(self.slots)
+        self._lock = threading.Lock(); self._ids = itertools.count(1)
+        self._queued = 0; self._active = {}; self.done = 0; self.failed = 0
+
+    def _popen_kwargs(self):
+        if os.name == "nt":
+            return {"creationflags": BELOW_NORMAL_PRIORITY_CLASS | CREATE_NO_WINDOW}
+        return {}
+
+    def _lower_priority(self, proc):
+        """POSIX: nice do ffmpeg ajustado depois do Popen (preexec_fn não é seguro com threads)."""
+        if os.name != "nt" and self.nice:
+            try: os.setpriority(os.PRIO_PROCESS, proc.pid, os.getpriority(os.PRIO_PROCESS, 0) + self.nice)
+            except Exception: pass
+
+    def transcode(self, src, dst, args, duration=None, stop_event=None, progress_fn=None):
+        """Executa ffmpeg -i src [args] dst. Bloqueia até o fim; retorna True em caso de sucesso.
+        progress_fn(pct, fps) é chamado a cada atualização de `-progress`."""
+        with self._lock: self._queued += 1
+        self._sem.acquire()
+        jid = next(self._ids)
+        with self._lock:
+            self._queued -= 1; self._active[jid] = {"src": src, "fps": 0.0, "started": time.monotonic()}
+        cmd = [self.ffmpeg_path, "-hide_banner", "-loglevel", "error", "-nostdin", "-y", "-i", src, *args,
+               "-threads", str(self.threads_per_job), "-progress", "pipe:1", "-nostats", dst]
+        ok = False
+        try:
+            if self.logger:
+                self.logger.info("[Transcode] #%s (%s threads): %s", jid, self.threads_per_job, os.path.basename(src))
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                    text=True, errors="ignore", **self._popen_kwargs())
+            self._lower_priority(proc)
+            err_tail = []
+            t_err = threading.Thread(target=lambda: err_tail.extend(proc.stderr.read().splitlines()[-15:]), daemon=True)
+            t_err.start()
+            pct = 0.0
+            for line in proc.stdout:
+                if stop_event is not None and stop_event.is_set():
+                    proc.kill(); break
+                k, _, v = line.strip().partition("=")
+                if k == "fps":
+                    try:
+                        with self._lock: self._active[jid]["fps"] = float(v)
+                    except ValueError:
+                        pass
+                elif k == "out_time_us" and duration:
+                    try: pct = min(100.0, int(v) / 1e6 / float(duration) * 100.0)
+                    except (ValueError, ZeroDivisionError): pass
+                elif k == "progress" and callable(progress_fn):
+                    progress_fn(100.0 if v == "end" else pct, self._active[jid]["fps"])
+            proc.wait(); t_err.join(timeout=2)
+            ok = proc.returncode == 0 and not (stop_event is not None and stop_event.is_set())
+            if not ok and self.logger:
+                self.logger.error("[Transcode] #%s falhou (rc=%s): %s", jid, proc.returncode, " / ".join(err_tail[-3:]))
+            return ok
+        finally:
+            with self._lock:
+                self._active.pop(jid, None)
+                if ok: self.done += 1
+                else: self.failed += 1
+            self._sem.release()
+
+    def stats(self):
+        with self._lock:
+            return {"slots": self.slots, "threads_per_job": self.threads_per_job, "queued": self._queued,
+                    "active": len(self._active), "fps": round(sum(a["fps"] for a in self._active.values()), 1),
+                    "done": self.done, "failed": self.failed}
+
+    def summary(self):
+        s = self.stats()
+        return "transcode: slots=%s x %s threads | fila=%s ativos=%s | %.1f fps | ok=%s falhas=%s" % (
+            s["slots"], s["threads_per_job"], s["queued"], s["active"], s["fps"], s["done"], s["failed"])
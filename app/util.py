@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-import os, sys
+import os, sys, shutil
 
 def resource_path(*parts) -> str:
     if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
@@ -8,20 +8,40 @@ def resource_path(*parts) -> str:
         base = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base, *parts)
 
+def _bundled_tool(name: str) -> str:
+    """Executável empacotado em app/bin (Windows); fora dele, o do PATH do sistema."""
+    exe = name + ".exe" if os.name == "nt" else name
+    for p in (resource_path("bin", exe), resource_path(exe)):
+        if os.path.isfile(p):
+            return p
+    return shutil.which(name) or resource_path("bin", exe)
+
 def bundled_ffmpeg_path() -> str:
-    p = resource_path("bin","ffmpeg.exe")
-    return p if os.path.isfile(p) else resource_path("ffmpeg.exe")
+    return _bundled_tool("ffmpeg")
 
 def bundled_ffprobe_path() -> str:
-    p = resource_path("bin","ffprobe.exe")
-    return p if os.path.isfile(p) else resource_path("ffprobe.exe")
+    return _bundled_tool("ffprobe")
 
 def bundled_ffplay_path() -> str:
-    p = resource_path("bin","ffplay.exe")
-    return p if os.path.isfile(p) else resource_path("ffplay.exe")
+    return _bundled_tool("ffplay")
 
 def seconds_to_hms(s: int) -> str:
     try: s = int(s)
     except Exception: return "-"
     h, r = divmod(s, 3600); m, s = divmod(r, 60)
     return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+def default_user_dir(kind: str) -> str:
+    """Pasta padrão em Documentos: kind = "Audio", "Video" ou "Logs"."""
+    return os.path.join(os.path.expanduser("~"), "Documents", "DownloadSFB-" + kind)
+
+def app_data_dir(*parts) -> str:
+    """Pasta de dados persistentes do app (caches, índices); criada se não existir."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        base = os.path.join(base, "DownloadSFB")
+    else:
+        base = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "downloadsfb")
+    p = os.path.join(base, *parts)
+    os.makedirs(p, exist_ok=True)
+    return p
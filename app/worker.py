@@ -1,20 +1,123 @@
 # -*- coding: utf-8 -*-
-import os, threading
-from .util import bundled_ffmpeg_path
+import os, threading, time
+from .util import bundled_ffmpeg_path, bundled_ffprobe_path
 from .logging_utils import YTDLPLogger
+from .pipeline import Stage, Pipeline, current as stage_ctx
+from .transcode import TranscodeService
+from . import probe
+from .info_cache import get_info_cache
+from .query_index import get_query_index, WATCH_URL
+from .archive import get_archive_store
+from .canonical import youtube_video_id, dedupe
+from . import journal as jr
+from .ratelimit import get_rate_limiter
+from .adaptive import get_fragment_tuner, media_host, host_key
+from .progress_bus import ProgressBus
+from .telemetry import RunTelemetry, summarize, format_report
+from . import profiling
 
 class DownloadWorker(threading.Thread):
-    def __init__(self, mode, items, outdir, logger, progress_fn, quality_opts: dict, done_fn=None):
+    def __init__(self, mode, items, outdir, logger, progress_fn, quality_opts: dict, done_fn=None, journal=None):
         super().__init__(daemon=True)
         self.mode = mode; self.items = items; self.outdir = outdir
         self.logger = logger; self.progress_fn = progress_fn
         self.quality = quality_opts or {}; self.done_fn = done_fn
-        self._stop = threading.Event(); self.rc = 0; self._completed_files = []
+        # (_stop_evt: threading.Thread já usa _stop internamente; sobrescrevê-lo quebra join/is_alive)
+        self._stop_evt = threading.Event(); self.rc = 0; self._completed_files = []
+        # Pipeline: resolver → baixar → pós-processar, cada estágio com seu pool
+        # (cada item usa sua própria instância YoutubeDL em cada estágio)
+        self.parallel = max(1, int(self.quality.get("parallel_items", 1) or 1))
+        self.resolve_workers = max(1, int(self.quality.get("resolve_workers", 2) or 1))
+        self.encode_workers = max(1, int(self.quality.get("encode_workers", 1) or 1))
+        self._lock = threading.Lock(); self._active = {}; self._finished_items = 0; self._total = 0
+        self._ok = 0; self._err = 0; self.pipeline = None
+        self.transcoder = None; self._convert_args = []; self._audio_copy_opts = None
+        self.archive = None
+        # Telemetria por item (JSONL) e relatório ao final
+        self.telemetry = None; self.report = None; self.report_text = None; self._t_item = {}
+        # Perfilamento opcional (cProfile + tracemalloc), gravado na pasta de logs
+        self.profile = None
+        # Diário do job (retomada): itens lidos em streaming e estado gravado a cada etapa
+        self.journal = journal; self.retry_failed = bool(self.quality.get("retry_failed", False)); self._n_items = 0
+        self._ffprobe = None; self._target = {}
+        # Limitador global de banda/requisições (compartilhado com a busca e o MusicBrainz)
+        self.limiter = get_rate_limiter(); self._dl_bytes = {}
+        if "rate_limit_kbps" in self.quality or "rate_limit_rps" in self.quality:
+            self.limiter.set_limits(float(self.quality.get("rate_limit_kbps", 0) or 0) * 1024,
+                                    float(self.quality.get("rate_limit_rps", 0) or 0))
+        # Concorrência de fragmentos ajustada pela vazão medida, por host (persistida entre execuções)
+        try:
+            self.tuner = get_fragment_tuner() if self.quality.get("adaptive_fragments", True) else None
+        except Exception as e:
+            self.logger.warning("[Adaptativo] indisponível: %s", e); self.tuner = None
+        # Cache persistente de extract_info (0 h desativa)
+        ttl_h = float(self.quality.get("info_cache_ttl_h", 24) or 0)
+        try:
+            self.info_cache = get_info_cache(ttl_h) if ttl_h > 0 else None
+        except Exception as e:
+            self.logger.warning("[Cache] indisponível: %s", e); self.info_cache = None
+        # Índice consulta → vídeo para entradas ytsearch1: (evita refazer a busca)
+        try:
+            self.query_index = get_query_index() if self.quality.get("query_index", True) else None
+        except Exception as e:
+            self.logger.warning("[Índice] indisponível: %s", e); self.query_index = None
+
+    def stop(self): self._stop_evt.set()
 
-    def stop(self): self._stop.set()
+    def _report_progress(self, pct, speed, eta, stage, title, key=None):
+        """Com mais de um item em paralelo, consolida o progresso de todos os itens ativos.
+        Com um ProgressBus, só publica o evento do item; a consolidação fica com quem drena o barramento."""
+        if isinstance(self.progress_fn, ProgressBus):
+            self.progress_fn.post(key if key is not None else threading.get_ident(), pct, speed, eta, stage, title); return
+        if self.parallel <= 1:
+            self.progress_fn(pct, speed, eta, stage, title); return
+        with self._lock:
+            key = threading.get_ident()
+            if stage == 'finished':
+                self._active.pop(key, None)
+            else:
+                self._active[key] = (pct, speed, eta)
+            active = list(self._active.values())
+            done = self._finished_items; total = self._total or 1
+        overall = (done + sum(a[0] for a in active) / 100.0) / total * 100.0
+        speed_all = sum(a[1] for a in active)
+        eta_all = max([a[2] for a in active] or [0])
+        self.progress_fn(overall, speed_all, eta_all, stage, "[%d ativos] %s" % (len(active), title or ""))
+
+    def _mark(self, i, state, err=None):
+        if self.journal is not None:
+            try: self.journal.mark(i, state, err)
+            except Exception as e: self.logger.warning("[Diário] falha ao gravar estado de %s: %s", i, e)
+
+    def _tm(self, ev, **fields):
+        if self.telemetry is not None:
+            try: self.telemetry.event(ev, **fields)
+            except Exception: pass
+
+    def _item_done(self, result, i=None, err=None):
+        if i is not None:
+            self._mark(i, {"ok": jr.DONE, "err": jr.FAILED, "skip": jr.SKIPPED}[result], err)
+            t = self._t_item.pop(i, None)
+            if t: self._tm("item", i=i, q=t[1], result=result, total_s=time.monotonic() - t[0])
+        with self._lock:
+            self._finished_items += 1; finished = self._finished_items
+            if result == "ok": self._ok += 1
+            elif result == "err": self._err += 1
+        if isinstance(self.progress_fn, ProgressBus):
+            self.progress_fn.set_counts(finished=finished)
+        if self.profile is not None:
+            self.profile.snapshot("item %s (%s concluídos)" % (i, finished))
 
     def _likely_static_video(self, info_dict):
         try:
+            # Busca de 1 resultado: avalia o próprio vídeo; entradas sem formatos vêm do cache
+            entries = info_dict.get("entries")
+            if isinstance(entries, list) and len(entries) == 1 and isinstance(entries[0], dict):
+                info_dict = entries[0]
+            if not info_dict.get("formats") and self.info_cache is not None:
+                cached = self.info_cache.get_by_id(info_dict.get("id"))
+                if cached:
+                    info_dict = {**cached, **info_dict}
             title = (info_dict.get("title") or "").lower()
             channel = (info_dict.get("uploader") or info_dict.get("channel") or "").lower()
             bad_terms = ("official audio","art track","visualizer","audio only","static image")
@@ -39,7 +142,257 @@ class DownloadWorker(threading.Thread):
         except Exception:
             return False
 
+    def _resolve(self, yt_dlp, opts, item):
+        """Estágio 1: extract_info sem download; descarta vídeos estáticos."""
+        i, q = item
+        t0 = time.monotonic(); self._t_item[i] = (t0 - getattr(stage_ctx, "queue_wait", 0.0), q)
+        self.logger.info("[%s/%s] %s", i, self._n_items or self._total, q)
+        vid = self.query_index.lookup(q) if self.query_index is not None else None
+        src = WATCH_URL % vid if vid else q
+        if vid:
+            self.logger.info("[Índice] %s → %s", q, vid)
+        if self._in_archive(src):
+            self.logger.info("Já baixado (histórico): %s", q)
+            self._tm("skip", i=i, reason="historico"); self._item_done("ok", i); return None
+        try:
+            ie, cached = self._cached_or_extract(yt_dlp, opts, src)
+        except Exception as e:
+            if not vid:
+                raise
+            # Vídeo mapeado indisponível: esquece o mapeamento e refaz a busca
+            self.logger.warning("[Índice] %s indisponível (%s); refazendo a busca", vid, e)
+            self.query_index.forget(q); src = q
+            ie, cached = self._cached_or_extract(yt_dlp, opts, src)
+        if not vid:
+            self._index_query(q, ie)
+        self._tm("resolve", i=i, q=q, wait_s=getattr(stage_ctx, "queue_wait", None), dur_s=time.monotonic() - t0,
+                 cached=cached, indexed=bool(vid))
+        if self.mode == "video" and self._likely_static_video(ie):
+            self.logger.info("Ignorando possível vídeo estático (fps baixo/áudio apenas): %s", ie.get("title") or q)
+            self._tm("skip", i=i, reason="estatico", title=ie.get("title")); self._item_done("skip", i); return None
+        self._mark(i, jr.RESOLVED)
+        return (i, q, ie, cached, src)
+
+    def _in_archive(self, src):
+        """Consulta O(1) ao histórico antes de qualquer extract_info (links/IDs do YouTube)."""
+        vid = youtube_video_id(src)
+        if self.archive is None or not vid or "list=" in src:
+            return False
+        try:
+            return self.archive.contains("youtube " + vid, self.mode, self.outdir)
+        except Exception:
+            return False
+
+    def _record_archive(self, yt_dlp, info):
+        if self.archive is None:
+            return
+        try:
+            aid = yt_dlp.utils.make_archive_id(info.get("extractor_key") or info.get("ie_key"), info.get("id"))
+            self.archive.add(aid, self.mode, self.outdir, info.get("filepath"))
+        except Exception as e:
+            self.logger.warning("[Histórico] falha ao registrar %s: %s", info.get("id"), e)
+
+    def _cached_or_extract(self, yt_dlp, opts, src):
+        ie = self.info_cache.get(src, for_download=True) if self.info_cache is not None else None
+        if ie is not None:
+            self.logger.info("[Cache] metadados reaproveitados: %s", src)
+            return ie, True
+        return self._extract(yt_dlp, opts, src), False
+
+    def _index_query(self, q, ie):
+        if self.query_index is None or not self.query_index.indexable(q):
+            return
+        entries = ie.get("entries")
+        e = entries[0] if isinstance(entries, list) and len(entries) == 1 else None
+        if isinstance(e, dict) and e.get("id") and (e.get("extractor_key") or "").lower() == "youtube":
+            try: self.query_index.record(q, e["id"], e.get("title"))
+            except Exception as ex: self.logger.warning("[Índice] falha ao gravar %s: %s", q, ex)
+
+    def _extract(self, yt_dlp, opts, q):
+        self.limiter.acquire_request(self._stop_evt)
+        with yt_dlp.YoutubeDL(opts) as ydl:
+            ie = ydl.extract_info(q, download=False)
+        if not ie:
+            raise yt_dlp.utils.DownloadError("Nenhuma informação obtida para %s" % q)
+        if self.info_cache is not None:
+            try: self.info_cache.put(q, ie)
+            except Exception as e: self.logger.warning("[Cache] falha ao gravar %s: %s", q, e)
+        return ie
+
+    def _all_archived(self, ydl, ie):
+        entries = ie.get("entries")
+        if isinstance(entries, list):
+            return bool(entries) and all(isinstance(e, dict) and ydl.in_download_archive(e) for e in entries)
+        return ydl.in_download_archive(ie)
+
+    def _downloaded_infos(self, res):
+        """Percorre o resultado de process_ie_result (vídeo ou playlist) e devolve os formatos baixados."""
+        if not isinstance(res, dict):
+            return []
+        if res.get("entries") is not None:
+            out = []
+            for e in res.get("entries") or []:
+                out.extend(self._downloaded_infos(e))
+            return out
+        # yt-dlp remove de cada download os campos iguais aos do vídeo (ext, title, ...): recompõe.
+        # O merge de formatos já rodou no download; sem isso o post_process tentaria repeti-lo.
+        base = {k: v for k, v in res.items() if k not in ("requested_downloads", "entries")}
+        return [{k: v for k, v in {**base, **d}.items() if k not in ("__postprocessors", "__files_to_merge")}
+                for d in (res.get("requested_downloads") or []) if d.get("filepath")]
+
+    def _download(self, yt_dlp, opts, item):
+        """Estágio 2: download (e merge de formatos); sem pós-processadores."""
+        i, q, ie, cached, src = item
+        t0 = time.monotonic(); wait = getattr(stage_ctx, "queue_wait", None)
+        opts, ctx = self._tuned_opts(opts, ie)
+        try:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                ctx["ydl"] = ydl
+                res = ydl.process_ie_result(ie, download=True)
+                infos = self._downloaded_infos(res)
+                if not infos and cached and not self._stop_evt.is_set() and not self._all_archived(ydl, ie):
+                    # Metadados do cache não serviram para baixar (URLs vencidas?): extrai de novo
+                    self.logger.info("[Cache] metadados vencidos, extraindo novamente: %s", src)
+                    self.info_cache.invalidate(src)
+                    res = ydl.process_ie_result(self._extract(yt_dlp, opts, src), download=True)
+                    infos = self._downloaded_infos(res)
+        finally:
+            with self._lock: self._active.pop(threading.get_ident(), None)
+        size = 0
+        for d in infos:
+            try: size += os.path.getsize(d["filepath"])
+            except OSError: pass
+        self._tm("download", i=i, wait_s=wait, dur_s=time.monotonic() - t0, bytes=size, files=len(infos),
+                 fragments=(opts.get("concurrent_fragment_downloads") if ctx else None))
+        if not infos:
+            self._tm("skip", i=i, reason="nada_baixado"); self._item_done("ok", i); return None
+        self._mark(i, jr.DOWNLOADED)
+        return (i, q, infos)
+
+    def _tuned_opts(self, opts, ie):
+        """Opções do item com concorrência de fragmentos/tentativas do host e um hook que mede a vazão."""
+        if self.tuner is None:
+            return opts, {}
+        host = media_host(ie)
+        ctx = {"host": host, "frag": set()}
+        retries, frag_retries, throttled = self.tuner.retries(host)
+        opts = {**opts, "concurrent_fragment_downloads": self.tuner.concurrency(host),
+                "retries": retries, "fragment_retries": frag_retries,
+                "progress_hooks": list(opts.get("progress_hooks") or []) + [lambda d: self._tune_hook(d, ctx)]}
+        if throttled:
+            backoff = lambda n: min(30.0, 2.0 ** n)
+            opts["retry_sleep_functions"] = {"http": backoff, "fragment": backoff}
+        return opts, ctx
+
+    def _tune_hook(self, d, ctx):
+        """Ao fim de cada download fragmentado, informa a vazão e aplica o novo n ao próximo formato do item."""
+        try:
+            fn = d.get("filename")
+            if d.get("status") == "downloading" and d.get("fragment_count"):
+                ctx["frag"].add(fn)
+            elif d.get("status") == "finished" and fn in ctx["frag"]:
+                ydl = ctx.get("ydl")
+                host = host_key((d.get("info_dict") or {}).get("url")) or ctx["host"]
+                n = ydl.params.get("concurrent_fragment_downloads", 1) if ydl else 1
+                elapsed = d.get("elapsed") or 0
+                bps = (d.get("downloaded_bytes") or d.get("total_bytes") or 0) / elapsed if elapsed else 0
+                new = self.tuner.report(host, n, bps)
+                if ydl is not None: ydl.params["concurrent_fragment_downloads"] = new
+                if new != n:
+                    self.logger.info("[Adaptativo] %s: %.1f MB/s com %s fragmentos simultâneos → %s", host, bps / 1048576.0, n, new)
+        except Exception:
+            pass
+
+    def _postprocess(self, yt_dlp, opts, item):
+        """Estágio 3: pós-processadores ffmpeg (MP3, remux/conversão, metadados)."""
+        i, q, infos = item
+        t0 = time.monotonic(); wait = getattr(stage_ctx, "queue_wait", None); decisions = []
+        for info in infos:
+            pp_opts = opts
+            if self.transcoder is not None:
+                path, args = self._video_args(info); decisions.append(path)
+                info = self._transcode(info, args)
+            elif self.mode == "audio" and self._audio_copy_opts is not None:
+                p = probe.resolve_profile(info, info["filepath"], self._ffprobe, need_video=False)
+                path = probe.decide_audio(p, self._target["audio_sr"], self._target["audio_channels"])
+                self.logger.info("[Decisão] %s: %s (%s)", path, info.get("title") or q, probe.describe(p))
+                decisions.append(path)
+                if path == probe.COPY:
+                    pp_opts = self._audio_copy_opts
+            with yt_dlp.YoutubeDL(pp_opts) as ydl:
+                info = ydl.post_process(info["filepath"], info) or info
+            self._record_archive(yt_dlp, info)
+        self._tm("postprocess", i=i, wait_s=wait, dur_s=time.monotonic() - t0, decision=",".join(decisions) or None)
+        self._item_done("ok", i)
+
+    def _video_args(self, info):
+        """Escolhe remux, conversão só do áudio ou reencode completo conforme o perfil da fonte."""
+        p = probe.resolve_profile(info, info["filepath"], self._ffprobe)
+        path = probe.decide_video(p, self._target["video_max_h"], self._target["video_fps"])
+        self.logger.info("[Decisão] %s: %s (%s)", path, info.get("title") or info["filepath"], probe.describe(p))
+        if path == probe.REMUX:
+            return path, ["-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", "-movflags", "+faststart"]
+        if path == probe.AUDIO_ONLY:
+            return path, ["-map", "0:v:0", "-map", "0:a:0?", "-c:v", "copy",
+                          "-c:a", "aac", "-b:a", "%sk" % self._target["video_audio_k"], "-movflags", "+faststart"]
+        return path, self._convert_args
+
+    def _transcode(self, info, args):
+        """Conversão H.264/AAC fora do yt-dlp, pelo serviço de transcodificação (processos ffmpeg)."""
+        src = info["filepath"]; base, ext = os.path.splitext(src)
+        dst = base + (".conv.mp4" if ext.lower() == ".mp4" else ".mp4")
+        title = info.get("title") or os.path.basename(src)
+        def _prog(pct, fps):
+            self._report_progress(pct, 0.0, 0, "convertendo", "%s (%.0f fps)" % (title, fps), key=src)
+        try:
+            ok = self.transcoder.transcode(src, dst, args, info.get("duration"), self._stop_evt, _prog)
+        finally:
+            self._report_progress(100.0, 0.0, 0, "finished", title, key=src)
+            with self._lock: self._active.pop(threading.get_ident(), None)
+        if not ok:
+            try: os.remove(dst)
+            except OSError: pass
+            raise RuntimeError("Conversão falhou: %s" % src)
+        os.remove(src)
+        if dst.endswith(".conv.mp4"):
+            os.replace(dst, base + ".mp4"); dst = base + ".mp4"
+        info["filepath"] = dst; info["ext"] = "mp4"
+        return info
+
+    def _finish_telemetry(self):
+        """Fecha o JSONL da execução e monta o relatório (self.report / self.report_text)."""
+        tm, self.telemetry = self.telemetry, None
+        if tm is None:
+            return
+        try:
+            tm.close(stopped=self._stop_evt.is_set())
+            self.report = summarize(tm.path); self.report_text = format_report(self.report)
+            self.logger.info("[Telemetria] %s\n%s", tm.path, self.report_text)
+        except Exception as e:
+            self.logger.warning("[Telemetria] falha ao gerar relatório: %s", e)
+
+    def _log_pipeline(self, summary):
+        self.logger.info("[Pipeline] %s", summary)
+        if self.transcoder is not None:
+            self.logger.info("[Pipeline] %s", self.transcoder.summary())
+
+    def _on_item_error(self, item, e):
+        self.logger.exception("Falha: %s -> %s", item[1], e)
+        self._tm("error", i=item[0], stage=getattr(stage_ctx, "stage", None), err=str(e)[:300])
+        # Item abortado pela parada continua pendente no diário (a retomada o refaz sem --retry-failed)
+        self._item_done("err", None if self._stop_evt.is_set() else item[0], e)
+        if self.tuner is not None and "429" in str(e) and len(item) > 2 and isinstance(item[2], dict):
+            self.logger.info("[Adaptativo] HTTP 429: reduzindo fragmentos simultâneos para %s", self.tuner.throttled(media_host(item[2])))
+
     def run(self):
+        if not (profiling.enabled() or self.quality.get("profile")):
+            return self._run()
+        log_dir = os.path.dirname(getattr(self.logger, "log_path", "") or "") or self.outdir
+        self.logger.info("[Perfil] perfilando a execução (cProfile + tracemalloc) em %s", log_dir)
+        with profiling.RunProfile("worker-%s" % self.mode, log_dir, self.logger) as self.profile:
+            self._run()
+
+    def _run(self):
         _done_sent = False
         ok = 0; err = 0
         try:
@@ -50,8 +403,19 @@ class DownloadWorker(threading.Thread):
         if not os.path.isfile(ffmpeg_path):
             self.logger.error("ffmpeg não encontrado: %s", ffmpeg_path); self.rc=1; return
 
+        ffprobe_path = bundled_ffprobe_path()
+        self._ffprobe = ffprobe_path if os.path.isfile(ffprobe_path) else None
         os.makedirs(self.outdir, exist_ok=True)
         archive_path = os.path.join(self.outdir, "baixados.txt")
+        # Histórico indexado compartilhado; o yt-dlp só consulta, o registro é feito após o pós-processamento
+        try:
+            self.archive = get_archive_store()
+            n = self.archive.import_legacy(self.outdir, self.mode)
+            if n: self.logger.info("[Histórico] %s registros importados de %s", n, archive_path)
+            archive_opt = self.archive.view(self.mode, self.outdir, record=False)
+        except Exception as e:
+            self.logger.warning("[Histórico] banco indisponível (%s); usando %s", e, archive_path)
+            self.archive = None; archive_opt = archive_path
 
         def hook(d):
             try:
@@ -62,24 +426,33 @@ class DownloadWorker(threading.Thread):
                     speed = d.get('speed') or 0.0; eta = d.get('eta') or 0
                     pct = (done/total*100.0) if total else 0.0
                     title = d.get('info_dict', {}).get('title') or os.path.basename(d.get('filename','') or '')
-                    self.progress_fn(pct, speed, eta, 'downloading', title)
+                    self._report_progress(pct, speed, eta, 'downloading', title, key=d.get('filename'))
+                    key = d.get('filename')  # fragmentos concorrentes chamam o hook de outras threads
+                    with self._lock:
+                        prev = self._dl_bytes.get(key, 0); self._dl_bytes[key] = done
+                    self.limiter.acquire_bytes(done - prev if done >= prev else done, self._stop_evt)
                 elif st == 'finished':
                     fn = d.get('filename','')
-                    if fn: self._completed_files.append(fn)
-                    self.progress_fn(100.0, 0.0, 0, 'finished', os.path.basename(fn))
+                    with self._lock: self._dl_bytes.pop(fn, None)
+                    if fn:
+                        with self._lock: self._completed_files.append(fn)
+                    self._report_progress(100.0, 0.0, 0, 'finished', os.path.basename(fn), key=fn)
                     self.logger.info("Baixado: %s", fn)
             except Exception:
                 pass
-            if self._stop.is_set(): raise yt_dlp.utils.DownloadError("Interrompido pelo usuário.")
+            if self._stop_evt.is_set(): raise yt_dlp.utils.DownloadError("Interrompido pelo usuário.")
 
         ff_dir = os.path.dirname(ffmpeg_path)
+        # Saída detalhada do yt-dlp ([debug]) só com o log DEBUG habilitado; progresso/fragmentos são amostrados
+        log_debug = bool(self.quality.get("log_debug", False))
+        self.ytdlp_logger = YTDLPLogger(self.logger)
         common = {
-            "ffmpeg_location": ff_dir, "progress_hooks":[hook], "logger": YTDLPLogger(self.logger),
+            "ffmpeg_location": ff_dir, "progress_hooks":[hook], "logger": self.ytdlp_logger,
             "restrictfilenames": True, "nocheckcertificate": True, "noplaylist": False,
             "outtmpl": os.path.join(self.outdir, "%(channel,uploader)s", "%(title)s.%(ext)s"),
-            "download_archive": archive_path, "nooverwrites": False, "ignoreerrors": True,
+            "download_archive": archive_opt, "nooverwrites": False, "ignoreerrors": True,
             "ignore_no_formats_error": True,
-            "concurrent_fragment_downloads": 3, "retries": 5, "fragment_retries": 10, "verbose": True,
+            "concurrent_fragment_downloads": 3, "retries": 5, "fragment_retries": 10, "verbose": log_debug,
         }
 
         if self.mode == "audio":
@@ -95,6 +468,9 @@ class DownloadWorker(threading.Thread):
                 ],
                 "postprocessor_args":{"FFmpegExtractAudio":["-ar", a_sr, "-ac", a_ch]}
             }
+            # Fonte já em MP3 no perfil pedido: FFmpegExtractAudio apenas copia o fluxo
+            self._audio_copy_opts = {**opts, "postprocessor_args": {}}
+            self._target = {"audio_sr": a_sr, "audio_channels": a_ch}
         else:
             v_mode = self.quality.get("video_mode","compat")
             v_h = int(self.quality.get("video_max_h",480))
@@ -115,35 +491,69 @@ class DownloadWorker(threading.Thread):
                         "postprocessors":[{"key":"FFmpegVideoRemuxer","preferedformat":"mp4"},{"key":"FFmpegMetadata"}],
                         "postprocessor_args":{"FFmpegVideoRemuxer":["-movflags","+faststart"]}}
             else:
-                # Converte garantindo H.264 + AAC e aplica faststart
+                # Converte garantindo H.264 + AAC e aplica faststart (via TranscodeService, fora do yt-dlp)
+                self._convert_args = [
+                    "-vf", f"scale=-2:{v_h}", "-r", str(v_fps), "-c:v", "libx264",
+                    "-crf", str(v_crf), "-preset", v_preset,
+                    "-c:a", "aac", "-b:a", f"{v_aac_k}k",
+                    "-movflags", "+faststart"
+                ]
+                self._target = {"video_max_h": v_h, "video_fps": v_fps, "video_audio_k": v_aac_k}
+                self.transcoder = TranscodeService(ffmpeg_path, preset=v_preset, logger=self.logger)
+                self.encode_workers = max(self.encode_workers, self.transcoder.slots)
+                self.logger.info("[CFG][Transcode] slots=%s, threads/job=%s, núcleos=%s",
+                                 self.transcoder.slots, self.transcoder.threads_per_job, os.cpu_count())
                 opts = {**common, "format":"bestvideo*+bestaudio/best",
-                        "postprocessors":[{"key":"FFmpegVideoConvertor","preferedformat":"mp4"},{"key":"FFmpegMetadata"}],
-                        "postprocessor_args":{"FFmpegVideoConvertor":[
-                            "-vf", f"scale=-2:{v_h}", "-r", str(v_fps), "-c:v", "libx264",
-                            "-crf", str(v_crf), "-preset", v_preset,
-                            "-c:a", "aac", "-b:a", f"{v_aac_k}k",
-                            "-movflags", "+faststart"
-                        ]}}
+                        "postprocessors":[{"key":"FFmpegMetadata"}]}
         ok = err = 0
+        if self.journal is not None:
+            # Retomada: só os itens não concluídos, lidos do diário sob demanda
+            states = self.journal.states(); c = self.journal.counts(states)
+            total = c[jr.PENDING] + c[jr.RESOLVED] + c[jr.DOWNLOADED] + (c[jr.FAILED] if self.retry_failed else 0)
+            self._n_items = self.journal.total
+            source = self.journal.iter_pending(self.retry_failed, states)
+            self.logger.info("[Diário] %s | itens: %s | concluídos: %s | falhas: %s | a processar: %s",
+                             os.path.basename(self.journal.path), self.journal.total, c[jr.DONE] + c[jr.SKIPPED], c[jr.FAILED], total)
+        else:
+            self.items, dup = dedupe(self.items)
+            if dup: self.logger.info("[Fila] %s entradas duplicadas/vazias removidas antes do início.", dup)
+            total = len(self.items); source = enumerate(self.items, start=1)
+        self._total = total
+        if isinstance(self.progress_fn, ProgressBus): self.progress_fn.set_counts(total, 0)
+        if self.quality.get("telemetry", True):
+            try:
+                self.telemetry = RunTelemetry(self.mode, self.outdir, items=total, resolve_workers=self.resolve_workers,
+                                              parallel=self.parallel, encode_workers=self.encode_workers,
+                                              journal=os.path.basename(self.journal.path) if self.journal is not None else None)
+            except Exception as e:
+                self.logger.warning("[Telemetria] indisponível: %s", e)
+        dl_opts = {**opts, "postprocessors": []}
+        qsize = lambda n: max(2, 2 * n)
+        prof = self.profile.wrap if self.profile is not None else (lambda fn: fn)
+        self.pipeline = Pipeline([
+            Stage("resolver", prof(lambda it: self._resolve(yt_dlp, dl_opts, it)), self.resolve_workers,
+                  qsize(self.resolve_workers), self._stop_evt, self.logger, self._on_item_error),
+            Stage("baixar", prof(lambda it: self._download(yt_dlp, dl_opts, it)), self.parallel,
+                  qsize(self.parallel), self._stop_evt, self.logger, self._on_item_error),
+            Stage("pos-proc", prof(lambda it: self._postprocess(yt_dlp, opts, it)), self.encode_workers,
+                  qsize(self.encode_workers), self._stop_evt, self.logger, self._on_item_error),
+        ], stop_event=self._stop_evt)
         try:
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                total = len(self.items); self.logger.info("Iniciando downloads (%s) — itens: %s", self.mode, total)
-                for i, q in enumerate(self.items, start=1):
-                    if self._stop.is_set(): raise yt_dlp.utils.DownloadError("Interrompido pelo usuário.")
-                    self.logger.info("[%s/%s] %s", i, total, q)
-                    try:
-                        ie = ydl.extract_info(q, download=False)
-                        if self.mode == "video" and self._likely_static_video(ie):
-                            self.logger.info("Ignorando possível vídeo estático (fps baixo/áudio apenas): %s", ie.get("title") or q)
-                            continue
-                        ydl.process_ie_result(ie, download=True)
-                        ok += 1
-                    except Exception as e:
-                        self.logger.exception("Falha: %s -> %s", q, e); err += 1
+            self.logger.info("Iniciando downloads (%s) — itens: %s | resolver=%s baixar=%s pós-proc=%s",
+                             self.mode, total, self.resolve_workers, self.parallel, self.encode_workers)
+            self.pipeline.run(source, report_fn=self._log_pipeline)
+            ok, err = self._ok, self._err
+            self._log_pipeline(self.pipeline.summary())
+            self._finish_telemetry()
+            if self._stop_evt.is_set(): raise yt_dlp.utils.DownloadError("Interrompido pelo usuário.")
         except Exception as e:
             self.logger.exception("Execução interrompida: %s", e); self.rc=1
         else:
             self.logger.info("Concluído (%s). Sucesso: %s | Falhas: %s", self.mode, ok, err)
+            if self.journal is not None:
+                # Com falhas o diário fica em aberto: "Retomar" ainda o encontra para repeti-las
+                if err: self.logger.info("[Diário] %s falha(s); o job pode ser retomado para repeti-las.", err)
+                else: self.journal.finish()
             if callable(self.done_fn):
                 try: self.done_fn(self.mode, list(self._completed_files), ok, err, self.outdir)
                 except Exception: pass
@@ -155,6 +565,15 @@ class DownloadWorker(threading.Thread):
         try:
             pass  # marcador de final
         finally:
+            try: self.ytdlp_logger.summary()
+            except Exception: pass
+            self._finish_telemetry()
+            if self.tuner is not None:
+                try: self.tuner.save(); self.logger.info("[Adaptativo] %s", self.tuner.summary())
+                except Exception: pass
+            if self.journal is not None:
+                self.journal.close()
+                if self.rc: self.logger.info("[Diário] execução pode ser retomada: %s", self.journal.path)
             try:
                 if (not _done_sent) and callable(self.done_fn):
                     self.done_fn(self.mode, list(self._completed_files), ok, err, self.outdir)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark/checagem do índice local do MusicBrainz (app/mb_local.py), sem rede: importa o dump
+de exemplo de bench/fixtures/mbdump (arquivos soltos e o mesmo conteúdo num .tar.xz, como nos
+dumps oficiais) num índice temporário e roda as buscas do mb_api contra ele — qualquer acesso
+ao musicbrainz.org falha o teste. Mede a latência por consulta (mediana de N repetições) contra
+um orçamento em ms e confere os resultados esperados (dedupe por MBID, tags, aliases, paginação).
+
+Uso (na raiz do repositório):
+    python bench/bench_mb_local.py                      # sai com 1 se algo falhar ou estourar o orçamento
+    python bench/bench_mb_local.py --dump /dados/mbdump/artist /dados/mbdump/recording --runs 50
+"""
+import os, sys, json, time, argparse, tarfile, tempfile, platform, statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE = os.path.join(ROOT, "bench", "fixtures", "mbdump")
+sys.path.insert(0, ROOT)
+
+# (nome, chamada, checagem do resultado) — só valem para o dump de exemplo
+CASES = [
+    ("genero", lambda m: m.mb_search_artists_by_genre("grunge", 10),
+     lambda r: r == ["Nirvana", "Pearl Jam", "Soundgarden", "Hole"]),
+    ("artista", lambda m: m.mb_search_recordings_by_artist("nirvana", 10),
+     lambda r: [t for _, t in r] == ["Smells Like Teen Spirit", "Come as You Are", "Lithium", "In Bloom", "Heart-Shaped Box"]),
+    ("artista-alias", lambda m: m.mb_search_recordings_by_artist("Legiao Urbana", 2),
+     lambda r: r == [("Legiao Urbana", "Tempo Perdido"), ("Legiao Urbana", "Pais e Filhos")]),
+    ("titulo", lambda m: m.mb_search_recordings_by_title("black", 10),
+     lambda r: ("Pearl Jam", "Black") in r and ("Soundgarden", "Black Hole Sun") in r),
+    ("paginas", lambda m: [len(p) for p in m.iter_search("artist", 'tag:"rock"', 3)],
+     lambda r: r == [3]),
+    ("resolver", lambda m: m.mb_resolve_artist("PINK FLOYD"),
+     lambda r: r is not None and r[1] == "Pink Floyd"),
+]
+
+def _offline(mb_api):
+    def _refuse(*a, **k):
+        raise AssertionError("acesso à rede durante o teste offline")
+    mb_api.get_mb_client()._request = _refuse
+    mb_api.configure_cache(0)
+
+def build(db_path, dumps, use_tar):
+    from app.mb_local import LocalMB, import_path
+    idx = LocalMB(db_path); t0 = time.perf_counter(); counts = []
+    if use_tar:
+        tar_path = os.path.join(os.path.dirname(db_path), "mbdump.tar.xz")
+        with tarfile.open(tar_path, "w:xz") as tar:
+            for p in dumps: tar.add(p, arcname="mbdump/" + os.path.basename(p))
+        dumps = [tar_path]
+    for p in dumps: counts.append(import_path(idx, p))
+    idx.rebuild()
+    return idx, (time.perf_counter() - t0) * 1000.0, counts
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Índice local do MusicBrainz: importação e latência offline")
+    ap.add_argument("--dump", nargs="+", help="arquivos de dump (padrão: bench/fixtures/mbdump/artist e recording)")
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--budget-ms", type=float, default=20.0, help="orçamento por consulta (mediana)")
+    ap.add_argument("--out", help="arquivo JSON de saída (padrão: stdout)")
+    args = ap.parse_args(argv)
+    dumps = args.dump or [os.path.join(FIXTURE, "artist"), os.path.join(FIXTURE, "recording")]
+    check = not args.dump
+    tmp = tempfile.mkdtemp(prefix="downloadsfb-mblocal-")
+    os.environ["XDG_CACHE_HOME"] = tmp; os.environ["LOCALAPPDATA"] = tmp  # índice e caches só na pasta temporária
+    from app import mb_api, mb_local
+    failed = False; results = {}
+    idx, import_ms, counts = build(mb_local.default_path(), dumps, use_tar=check)
+    print("importação: %.1f ms %s | %s" % (import_ms, counts, idx.stats()), file=sys.stderr)
+    if check and counts[0]["skipped"] != 2:
+        print("esperadas 2 linhas ignoradas (release e JSON truncado): %s" % counts, file=sys.stderr); failed = True
+    idx.close()
+    _offline(mb_api)
+    for name, call, ok in CASES if check else CASES[:0]:
+        times = []
+        for _ in range(max(1, args.runs)):
+            t0 = time.perf_counter(); r = call(mb_api); times.append((time.perf_counter() - t0) * 1000.0)
+        med = statistics.median(times); good = ok(r) and med <= args.budget_ms
+        failed = failed or not good
+        results[name] = {"median_ms": round(med, 3), "max_ms": round(max(times), 3), "ok": good, "result": r}
+        print("%-14s mediana %7.3f ms%s" % (name, med, "" if good else "  ← FALHOU: %r" % (r,)), file=sys.stderr)
+    doc = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+           "import_ms": round(import_ms, 1), "import": counts, "results": results, "budget_ms": args.budget_ms}
+    text = json.dumps(doc, indent=1, ensure_ascii=False, default=str)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de inicialização: tempo de import de app.gui / app.cli (python -X importtime, em
+processos novos, mediana de N execuções) contra um orçamento em ms, e módulos pesados que não
+podem ser carregados na abertura (requests, yt-dlp, worker, storage/ctypes, cProfile...).
+Com tela disponível (Windows ou $DISPLAY), mede também o tempo até a janela principal desenhada.
+
+Uso (na raiz do repositório):
+    python bench/bench_startup.py                       # orçamento padrão, sai com 1 se estourar
+    python bench/bench_startup.py --budget-ms 150 --runs 9 --out startup.json
+"""
+import os, sys, json, time, argparse, platform, statistics, subprocess, compileall
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("requests", "urllib3", "yt_dlp", "sqlite3", "ctypes", "cProfile", "pstats",
+         "app.worker", "app.mb_api", "app.general_search", "app.storage", "app.archive", "app.query_index")
+TARGETS = {
+    "gui": ("app.gui", HEAVY),
+    "cli": ("app.cli", ("tkinter", "requests", "yt_dlp", "app.worker", "app.gui")),
+}
+_WINDOW = """
+import time; t0 = time.perf_counter()
+from app.gui import App
+a = App(); a.update(); t1 = time.perf_counter()
+a.destroy(); print(round((t1 - t0) * 1000.0, 1))
+"""
+
+def import_time(module, forbidden):
+    """(ms cumulativo do import de `module`, módulos proibidos carregados) num processo novo."""
+    code = "import sys, %s; print(' '.join(m for m in %r if m in sys.modules))" % (module, forbidden)
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=ROOT)
+    if p.returncode:
+        raise RuntimeError(p.stderr.strip()[-2000:])
+    us = None
+    for line in p.stderr.splitlines():
+        parts = [x.strip() for x in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            us = int(parts[1])
+    return (us or 0) / 1000.0, p.stdout.split()
+
+def window_time():
+    if os.name != "nt" and not os.environ.get("DISPLAY"):
+        return None
+    p = subprocess.run([sys.executable, "-c", _WINDOW], capture_output=True, text=True, cwd=ROOT)
+    try:
+        return float(p.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark de inicialização do DownloadSFB")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--budget-ms", type=float, default=60.0, help="orçamento do import de app.gui (mediana)")
+    ap.add_argument("--cli-budget-ms", type=float, default=40.0, help="orçamento do import de app.cli (mediana)")
+    ap.add_argument("--out", help="arquivo JSON de saída (padrão: stdout)")
+    args = ap.parse_args(argv)
+    compileall.compile_dir(os.path.join(ROOT, "app"), quiet=1)  # mede o import, não a compilação dos .py
+    budgets = {"gui": args.budget_ms, "cli": args.cli_budget_ms}
+    results = {}; failed = False
+    for name, (module, forbidden) in TARGETS.items():
+        times = []; loaded = set()
+        for _ in range(max(1, args.runs)):
+            ms, mods = import_time(module, forbidden); times.append(ms); loaded.update(mods)
+        med = statistics.median(times)
+        ok = med <= budgets[name] and not loaded
+        failed = failed or not ok
+        results[name] = {"module": module, "median_ms": round(med, 1), "min_ms": round(min(times), 1),
+                         "max_ms": round(max(times), 1), "budget_ms": budgets[name], "heavy_loaded": sorted(loaded), "ok": ok}
+        print("%-4s %-8s mediana %6.1f ms (orçamento %.0f)%s%s" % (name, module, med, budgets[name],
+              "" if not loaded else " | carregados: " + ", ".join(sorted(loaded)), "" if ok else "  ← FALHOU"), file=sys.stderr)
+    win = window_time()
+    if win is not None:
+        print("janela principal em %.1f ms" % win, file=sys.stderr)
+    doc = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+           "platform": platform.platform(), "results": results, "window_ms": win}
+    text = json.dumps(doc, indent=1, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
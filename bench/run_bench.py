@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark offline ponta a ponta do DownloadWorker e da busca geral.
+
+Gera mídia sintética com o ffmpeg, sobe um servidor HTTP local e usa um extrator local
+(plugin do yt-dlp em bench/yt_dlp_plugins) para que o yt-dlp "baixe" de 127.0.0.1, sem
+internet. Cada modo roda num subprocesso isolado (caches/histórico em pasta temporária) e
+mede itens/min, MB/s, segundos de CPU por item (processo + ffmpeg) e pico de RSS.
+
+Uso (na raiz do repositório, com ffmpeg no PATH ou em app/bin):
+    python bench/run_bench.py --items 20 --duration 20 --out bench-results.json
+    python bench/run_bench.py --modes audio,search --compare bench-anterior.json
+"""
+import os, re, sys, json, time, shutil, argparse, tempfile, platform, subprocess, threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH = os.path.dirname(os.path.abspath(__file__))
+MODES = ("audio", "compat", "convert", "search")
+
+def _rusage():
+    """(cpu_s do processo, cpu_s dos filhos, pico de RSS em MB do processo, dos filhos)."""
+    t = os.times()
+    try:
+        import resource
+        k = 1.0 if sys.platform == "darwin" else 1024.0  # macOS reporta bytes; Linux, KB
+        self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * k / 1048576.0
+        child_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * k / 1048576.0
+    except ImportError:
+        self_rss = child_rss = None
+        try:
+            import psutil  # opcional no Windows
+            self_rss = psutil.Process().memory_info().peak_wset / 1048576.0
+        except Exception:
+            pass
+    return t.user + t.system, t.children_user + t.children_system, self_rss, child_rss
+
+def make_media(ffmpeg, d, duration):
+    """Áudio AAC 44.1 kHz, vídeo H.264 480p30 e 720p60 (só vídeo), como formatos separados."""
+    os.makedirs(d, exist_ok=True)
+    jobs = {
+        "audio.m4a": ["-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100:duration=%s" % duration,
+                      "-ac", "2", "-c:a", "aac", "-b:a", "128k"],
+        "v480.mp4": ["-f", "lavfi", "-i", "testsrc2=size=854x480:rate=30:duration=%s" % duration,
+                     "-c:v", "libx264", "-preset", "veryfast", "-b:v", "900k", "-pix_fmt", "yuv420p"],
+        "v720.mp4": ["-f", "lavfi", "-i", "testsrc2=size=1280x720:rate=60:duration=%s" % duration,
+                     "-c:v", "libx264", "-preset", "veryfast", "-b:v", "2500k", "-pix_fmt", "yuv420p"],
+    }
+    for name, args in jobs.items():
+        out = os.path.join(d, name)
+        if not os.path.isfile(out):
+            subprocess.run([ffmpeg, "-hide_banner", "-loglevel", "error", "-y", *args, "-movflags", "+faststart", out], check=True)
+    return {n: os.path.getsize(os.path.join(d, n)) for n in jobs}
+
+class _Handler(SimpleHTTPRequestHandler):
+    def log_message(self, *a):
+        pass
+
+def serve(directory):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), lambda *a, **k: _Handler(*a, directory=directory, **k))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+def _isolate(tmp):
+    """Caches, histórico, diário e telemetria do app numa pasta temporária (app_data_dir)."""
+    os.environ["XDG_CACHE_HOME"] = os.path.join(tmp, "cache"); os.environ["LOCALAPPDATA"] = os.path.join(tmp, "cache")
+    sys.path[:0] = [ROOT, BENCH]  # BENCH: namespace yt_dlp_plugins com o extrator local
+
+def run_worker(mode, items, port, tmp, parallel, encode_workers):
+    from app.logging_utils import Logger
+    from app.worker import DownloadWorker
+    from app.progress_bus import ProgressBus
+    kind = "audio" if mode == "audio" else "video"
+    urls = ["http://127.0.0.1:%d/bench/%s/%04d" % (port, kind, i) for i in range(items)]
+    quality = {"video_mode": "convert" if mode == "convert" else "compat", "video_preset": "veryfast",
+               "parallel_items": parallel, "resolve_workers": 2, "encode_workers": encode_workers,
+               "info_cache_ttl_h": 0, "query_index": False, "adaptive_fragments": False}
+    logger = Logger(os.path.join(tmp, "bench-%s.log" % mode))
+    res = {}
+    w = DownloadWorker("audio" if mode == "audio" else "video", urls, os.path.join(tmp, "out-" + mode), logger,
+                       ProgressBus(), quality, lambda m, files, ok, err, out: res.update(files=len(files), ok=ok, err=err))
+    w.start(); w.join(); logger.close()
+    if "ok" not in res:
+        # done_fn só é chamado quando a execução chega ao fim; sem ele, ok/err ficariam nulos
+        res["reason"] = "execução interrompida antes do fim (rc=%s)" % w.rc
+    if res.get("err") or w.rc or "reason" in res:
+        with open(logger.log_path, "r", encoding="utf-8", errors="ignore") as f:
+            res["log_tail"] = [l.rstrip() for l in f if re.search(r"\|\s*ERRO \|", l)][-5:]
+    out_bytes = 0
+    for base, _, files in os.walk(os.path.join(tmp, "out-" + mode)):
+        out_bytes += sum(os.path.getsize(os.path.join(base, f)) for f in files if not f.endswith(".txt"))
+    res.update(rc=w.rc, out_mb=round(out_bytes / 1048576.0, 2),
+               stages=(w.report or {}).get("stages"), downloaded_mb=round((w.report or {}).get("bytes", 0) / 1048576.0, 2))
+    return res
+
+def run_search(items, tmp):
+    """Busca geral com resultados já em cache (mede cache + ranking, sem rede)."""
+    from app.logging_utils import Logger
+    from app.info_cache import get_info_cache
+    from app.general_search import search_youtube
+    cache = get_info_cache(24); logger = Logger(os.path.join(tmp, "bench-search.log"))
+    for q in range(items):
+        entries = [{"id": "%011d" % (q * 10 + k), "title": "artista %d música %d official video" % (q, k),
+                    "uploader": "canal %d%s" % (k, " - Topic" if k % 3 == 0 else ""), "duration": 200 + k,
+                    "view_count": 1000 * k, "webpage_url": "https://www.youtube.com/watch?v=%011d" % (q * 10 + k),
+                    "extractor_key": "Youtube"} for k in range(10)]
+        cache.put("ytsearch10:consulta %d" % q, {"_type": "playlist", "id": "consulta %d" % q, "entries": entries})
+    n = 0
+    for q in range(items):
+        n += len(search_youtube(logger, "consulta %d" % q, limit=10))
+    logger.close()
+    return {"ok": items, "err": 0, "results": n, "rc": 0}
+
+def child(args):
+    tmp = tempfile.mkdtemp(prefix="dsfb-bench-"); _isolate(tmp)
+    os.environ["DOWNLOADSFB_BENCH_DURATION"] = str(args.duration)
+    from app.util import bundled_ffmpeg_path
+    httpd = None
+    try:
+        sizes = {}
+        if args.child != "search":
+            sizes = make_media(bundled_ffmpeg_path(), args.media_dir, args.duration)
+            httpd = serve(args.media_dir)
+        c0, cc0, _, _ = _rusage(); t0 = time.perf_counter()
+        if args.child == "search":
+            res = run_search(args.items, tmp)
+        else:
+            res = run_worker(args.child, args.items, httpd.server_address[1], tmp, args.parallel, args.encode_workers)
+        wall = time.perf_counter() - t0; c1, cc1, rss, child_rss = _rusage()
+        mb = res.get("downloaded_mb") or 0.0
+        res.update(mode=args.child, items=args.items, wall_s=round(wall, 3),
+                   items_per_min=round(args.items / wall * 60.0, 2) if wall else None,
+                   mb_per_s=round(mb / wall, 2) if wall and mb else None,
+                   cpu_s_per_item=round((c1 - c0 + cc1 - cc0) / args.items, 3),
+                   cpu_s_worker=round(c1 - c0, 3), cpu_s_ffmpeg=round(cc1 - cc0, 3),
+                   peak_rss_mb=round(rss, 1) if rss else None, peak_rss_ffmpeg_mb=round(child_rss, 1) if child_rss else None)
+        print(json.dumps(res))
+    finally:
+        if httpd: httpd.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def _compare(prev, cur):
+    old = {r["mode"]: r for r in prev.get("results", [])}
+    for r in cur["results"]:
+        o = old.get(r["mode"])
+        if not o: continue
+        for k in ("items_per_min", "mb_per_s", "cpu_s_per_item", "peak_rss_mb"):
+            if o.get(k) and r.get(k):
+                print("  %-8s %-15s %10s → %-10s (%+.1f%%)" % (r["mode"], k, o[k], r[k], (r[k] - o[k]) / o[k] * 100.0))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark offline do DownloadSFB")
+    ap.add_argument("--modes", default=",".join(MODES), help="lista entre: %s" % ", ".join(MODES))
+    ap.add_argument("--items", type=int, default=10)
+    ap.add_argument("--duration", type=int, default=20, help="duração (s) da mídia sintética")
+    ap.add_argument("--parallel", type=int, default=3)
+    ap.add_argument("--encode-workers", type=int, default=2)
+    ap.add_argument("--media-dir", default=os.path.join(tempfile.gettempdir(), "dsfb-bench-media"))
+    ap.add_argument("--out", help="arquivo JSON de saída (padrão: stdout)")
+    ap.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    ap.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.child:
+        return child(args)
+    results = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode not in MODES:
+            ap.error("modo desconhecido: %s" % mode)
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", mode, "--items", str(args.items),
+               "--duration", str(args.duration), "--parallel", str(args.parallel),
+               "--encode-workers", str(args.encode_workers), "--media-dir", args.media_dir]
+        p = subprocess.run(cmd, capture_output=True, text=True)
+        line = (p.stdout.strip().splitlines() or [""])[-1]
+        try:
+            r = json.loads(line)
+        except ValueError:
+            r = {"mode": mode, "rc": p.returncode, "error": (p.stderr or p.stdout).strip()[-2000:]}
+        print("%-8s %s%s" % (mode, json.dumps({k: r.get(k) for k in ("ok", "err", "items_per_min", "mb_per_s", "cpu_s_per_item", "peak_rss_mb")}),
+              "  ← " + r["reason"] if r.get("reason") else ""), file=sys.stderr)
+        results.append(r)
+    try:
+        import yt_dlp; ytv = yt_dlp.version.__version__
+    except Exception:
+        ytv = None
+    try:
+        rev = subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        rev = None
+    doc = {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "git": rev, "python": platform.python_version(),
+           "platform": platform.platform(), "cpus": os.cpu_count(), "yt_dlp": ytv,
+           "params": {"items": args.items, "duration": args.duration, "parallel": args.parallel,
+                      "encode_workers": args.encode_workers}, "results": results}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            _compare(json.load(f), doc)
+    text = json.dumps(doc, indent=1, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text + "\n")
+    else:
+        print(text)
+    return 1 if any(r.get("rc") or r.get("err") for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Extrator local do benchmark (plugin do yt-dlp): URLs http://127.0.0.1:<porta>/bench/<tipo>/<n>
+viram info_dicts com formatos servidos pelo servidor HTTP local do bench (sem internet).
+"""
+import os
+from yt_dlp.extractor.common import InfoExtractor
+
+class DownloadSFBBenchIE(InfoExtractor):
+    IE_NAME = "downloadsfb:bench"
+    _VALID_URL = r"https?://127\.0\.0\.1:(?P<port>\d+)/bench/(?P<kind>audio|video)/(?P<id>\w+)"
+
+    def _real_extract(self, url):
+        port, kind, vid = self._match_valid_url(url).group("port", "kind", "id")
+        base = "http://127.0.0.1:%s/" % port
+        audio = {"format_id": "140", "url": base + "audio.m4a?i=" + vid, "ext": "m4a", "vcodec": "none",
+                 "acodec": "mp4a.40.2", "asr": 44100, "audio_channels": 2, "abr": 128}
+        formats = [audio]
+        if kind == "video":
+            formats += [
+                {"format_id": "134", "url": base + "v480.mp4?i=" + vid, "ext": "mp4", "acodec": "none",
+                 "vcodec": "avc1.4d401e", "height": 480, "width": 854, "fps": 30, "tbr": 900},
+                {"format_id": "298", "url": base + "v720.mp4?i=" + vid, "ext": "mp4", "acodec": "none",
+                 "vcodec": "avc1.4d4020", "height": 720, "width": 1280, "fps": 60, "tbr": 2500},
+            ]
+        return {"id": "bench-%s-%s" % (kind, vid), "title": "bench %s %s" % (kind, vid), "uploader": "bench",
+                "duration": float(os.environ.get("DOWNLOADSFB_BENCH_DURATION") or 0) or None, "formats": formats}